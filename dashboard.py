@@ -1718,7 +1718,7 @@ def fill_name_dropdown(value):
     elif value == 'monitoring':
         temp = list(monitor.metrics.metrics.keys())  # todo adjust for cache
     else:
-        temp = ['connection', 'execution', 'datatransfer', 'run', 'session']
+        temp = ['connection', 'execution', 'datatransfer', 'commit', 'run', 'session']
 
     return [{'label': x, 'value': x} for x in temp]
 
@@ -2017,7 +2017,7 @@ def process_settings_input(type, name, query_aggregate, total_aggregate, connect
         # update only the value that changed
         if callback_context == ['dd_type.value']:
             # adjust name too when type is monitoring
-            if type == 'monitoring' or name not in ['connection', 'execution', 'datatransfer', 'run', 'session', None]:
+            if type == 'monitoring' or name not in ['connection', 'execution', 'datatransfer', 'commit', 'run', 'session', None]:
                 store_data['name'] = None
             store_data['type'] = type
 
@@ -1,5 +1,5 @@
 """
 The dbmsbenchmarker module
 """
-__all__ = ["benchmarker","reporter","tools","parameter","inspector","monitor","evaluator","layout"]
+__all__ = ["benchmarker","reporter","tools","parameter","inspector","monitor","evaluator","layout","tracer","store","distributed","nulldbms","selfbenchmark"]
 from .__version__ import __version__
@@ -38,7 +38,7 @@ import multiprocessing as mp
 from timeit import default_timer
 import random
 from operator import add
-from dbmsbenchmarker import tools, reporter, parameter, monitor, evaluator, inspector
+from dbmsbenchmarker import tools, reporter, parameter, monitor, evaluator, inspector, tracer, store, distributed
 import dbmsbenchmarker
 import pprint
 # for query timeout
@@ -54,6 +54,12 @@ BENCHMARKER_VERBOSE_PROCESS = False
 BENCHMARKER_VERBOSE_NONE = False
 BENCHMARKER_VERBOSE_EXPLAIN = False
 BENCHMARKER_STORE_EXPLAIN = False
+BENCHMARKER_TRACE = None
+BENCHMARKER_RUN_LOG = False
+BENCHMARKER_OVERHEAD = False
+BENCHMARKER_CHECKPOINT = False
+BENCHMARKER_STORAGE = 'files'
+BENCHMARKER_START_BARRIER_TIMEOUT = 600
 
 logger = mp.log_to_stderr(logging.WARNING)
 
@@ -61,10 +67,12 @@ class singleRunInput:
     """
     Class for collecting info about a benchmark run
     """
-    def __init__(self, numRun, queryString, queryConfig):
+    def __init__(self, numRun, queryString, queryConfig, parameters=None):
         self.numRun = numRun
         self.queryString = queryString
         self.queryConfig = queryConfig
+        # values of bind variables, None if queryString is not a prepared statement
+        self.parameters = parameters
 
 
 
@@ -76,16 +84,40 @@ class singleRunOutput:
         self.durationConnect = 0.0
         self.durationExecute = None#0.0
         self.durationTransfer = None#0.0
+        self.durationCommit = 0.0
         self.error = ''
         self.data = []
         self.columnnames = []
         self.size = 0
         self.explain = ''
+        # list of [number of rows, duration in ms] per batch
+        self.batches = []
+        # list of [phase, start, end], wall clock timestamps in seconds
+        self.events = []
+        self.pid = 0
+        # aggregates of overhead of the benchmarker per phase, see tools.overhead
+        self.overhead = {}
         pass
 
 
 
-def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, path=None, activeConnections = [], BENCHMARKER_VERBOSE_QUERIES=False, BENCHMARKER_VERBOSE_RESULTS=False, BENCHMARKER_VERBOSE_PROCESS=True, BENCHMARKER_VERBOSE_NONE=False, BENCHMARKER_VERBOSE_EXPLAIN=False, BENCHMARKER_STORE_EXPLAIN=False):
+def pinWorker(counter, cores):
+    """
+    Initializer for worker processes of a pool: pins each worker to a dedicated core.
+    Workers take the cores in the order they start.
+
+    :param counter: Shared counter (multiprocessing.Value) of started workers
+    :param cores: List of cores, one per worker
+    :return: returns nothing
+    """
+    with counter.get_lock():
+        i = counter.value
+        counter.value += 1
+    os.sched_setaffinity(0, {cores[i % len(cores)]})
+
+
+
+def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, path=None, activeConnections = [], BENCHMARKER_VERBOSE_QUERIES=False, BENCHMARKER_VERBOSE_RESULTS=False, BENCHMARKER_VERBOSE_PROCESS=True, BENCHMARKER_VERBOSE_NONE=False, BENCHMARKER_VERBOSE_EXPLAIN=False, BENCHMARKER_STORE_EXPLAIN=False, BENCHMARKER_RUN_LOG=False, BENCHMARKER_OVERHEAD=False, reuseCursor=False):
     """
     Function for running an actual benchmark run
 
@@ -95,6 +127,9 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
     :param connectionname: Name of the connection
     :param numQuery: Number of the query, 1...
     :param path: Result path, for optional storing received data
+    :param BENCHMARKER_RUN_LOG: Flush recorded run events to a log file per worker (in path/runlog/)
+    :param BENCHMARKER_OVERHEAD: Measure overhead of the benchmarker per phase
+    :param reuseCursor: Keep one cursor of the connection for all runs of the batch
     :return: returns object of class singleRunOutput
     """
     #global activeConnections
@@ -106,6 +141,16 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
     #logger.setLevel(logging.INFO)
     # init list of results
     results = []
+    # offset to convert timer values into wall clock timestamps for tracing
+    epoch_offset = time.time() - default_timer()
+    pid = os.getpid()
+    eventsConnect = []
+    # events of the runs are recorded instead of printed inside of the loop
+    if BENCHMARKER_RUN_LOG and path is not None:
+        makedirs(path+'/runlog', exist_ok=True)
+        runlog = tracer.recorder(capacity=4*len(numRuns)+1, filename=tracer.recorder.getFilename(path, connectionname, pid))
+    else:
+        runlog = tracer.recorder(capacity=4*len(numRuns)+1)
     #print("HELLO!")
     # compute number of (parallel) connection
     # example: 5/6/7/8 yields number 1 (i.e. the second one)
@@ -122,7 +167,7 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
         durationConnect = 0.0
     else:
         # look at first run to determine if there should be sleeping
-        query = tools.query(inputConfig[numRuns[0]].queryConfig)
+        query = tools.query.fromDict(inputConfig[numRuns[0]].queryConfig)
         if query.delay_connect > 0:
             if BENCHMARKER_VERBOSE_PROCESS:
                 print("Delay Connection by "+str(query.delay_connect)+" seconds")
@@ -133,15 +178,18 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
         connection.connect()
         end = default_timer()
         durationConnect = 1000.0*(end - start)
+        eventsConnect = [['connect', start+epoch_offset, end+epoch_offset]]
+        runlog.record(numQuery, numRuns[0], 'connect', start+epoch_offset, end+epoch_offset)
     if BENCHMARKER_VERBOSE_PROCESS:
         print(("singleRun batch size %i: " % len(numRuns)))
-    if durationConnect > 0:
-        if not BENCHMARKER_VERBOSE_NONE:
-            print(("numRun %s: " % ("/".join([str(i+1) for i in numRuns])))+"connection [ms]: "+str(durationConnect))
+    if reuseCursor:
+        # a single cursor for all runs of the batch, opened outside of the timers
+        connection.openCursor()
     # normalize EXPLAIN templates configured for this connection (once per batch)
     explainTemplates = []
-    if (BENCHMARKER_VERBOSE_EXPLAIN or BENCHMARKER_STORE_EXPLAIN) and 'JDBC' in connectiondata and 'explain' in connectiondata['JDBC']:
-        explainTemplates = connectiondata['JDBC']['explain']
+    driverdata = connectiondata['JDBC'] if 'JDBC' in connectiondata else connectiondata.get('DBAPI', connectiondata.get('NULL', {}))
+    if (BENCHMARKER_VERBOSE_EXPLAIN or BENCHMARKER_STORE_EXPLAIN) and 'explain' in driverdata:
+        explainTemplates = driverdata['explain']
         if isinstance(explainTemplates, str):
             explainTemplates = [explainTemplates]
     def explainValueToText(value):
@@ -158,47 +206,97 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
                 except Exception:
                     pass
         return str(value)
+    def endTransaction():
+        # end the open transaction as configured for the query
+        if query.transaction['end'] == 'rollback':
+            connection.rollback()
+        else:
+            connection.commit()
     # perform runs for this connection
     for numRun in numRuns:
         workername = "numRun %i: " % (numRun+1)
         queryString = inputConfig[numRun].queryString
+        parameters = getattr(inputConfig[numRun], 'parameters', None)
         #print(workername+queryString)
-        query = tools.query(inputConfig[numRun].queryConfig)
+        harness = tools.overhead(BENCHMARKER_OVERHEAD)
+        token = harness.start()
+        query = tools.query.fromDict(inputConfig[numRun].queryConfig)
+        harness.stop('query_object', token)
         if query.delay_run > 0:
             if BENCHMARKER_VERBOSE_PROCESS:
                 print(workername+"Delay Run by "+str(query.delay_run)+" seconds")
             time.sleep(query.delay_run)
         error = ""
+        events = []
+        # number of rows and duration per batch
+        l_batches = []
+        durationCommit = 0.0
+        inTransaction = False
         try:
             #start = default_timer()
             if BENCHMARKER_VERBOSE_QUERIES:
                 #logger.info(type(queryString))
                 if isinstance(queryString, list):
-                    for queryPart in queryString:
-                        print(workername+queryPart)
+                    for i, queryPart in enumerate(queryString):
+                        print(workername+queryPart+("" if parameters is None else " "+str(parameters[i])))
                 else:
-                    print(workername+queryString)
-            connection.openCursor()
+                    print(workername+queryString+("" if parameters is None else " "+str(parameters)))
+            if not reuseCursor:
+                connection.openCursor()
             #end = default_timer()
             #durationConnect += 1000.0*(end - start)
             start = default_timer()
             # if query is given as list of strings
-            if isinstance(queryString, list):
+            if query.batch is not None:
+                # rows are sent in batches
+                batches = connection.executeBatch(queryString, parameters, int(query.batch['size']), query.batch['commit'])
+                for rows, batch_start, batch_end in batches:
+                    events.append(['batch', batch_start+epoch_offset, batch_end+epoch_offset])
+                    l_batches.append([rows, 1000.0*(batch_end - batch_start)])
+            elif query.transaction is not None:
+                # statements of a run are sent in transactions of a fixed number of statements
+                statementParts = queryString if isinstance(queryString, list) else [queryString]
+                parametersParts = parameters if isinstance(queryString, list) and parameters is not None else [parameters]*len(statementParts)
+                numStatements = int(query.transaction['statements'])
+                connection.setAutoCommit(False)
+                inTransaction = True
+                for k, (queryPart, parametersPart) in enumerate(zip(statementParts, parametersParts)):
+                    if parametersPart is None:
+                        connection.executeQuery(queryPart)
+                    else:
+                        connection.executeStatement(queryPart, parametersPart)
+                    # the last transaction ends after the result set has been fetched
+                    if numStatements > 0 and (k+1) % numStatements == 0 and k+1 < len(statementParts):
+                        commit_start = default_timer()
+                        endTransaction()
+                        commit_end = default_timer()
+                        durationCommit += 1000.0*(commit_end - commit_start)
+                        events.append(['commit', commit_start+epoch_offset, commit_end+epoch_offset])
+            elif parameters is not None:
+                # prepared statements are reused in all runs of this connection
+                if isinstance(queryString, list):
+                    for queryPart, parametersPart in zip(queryString, parameters):
+                        connection.executeStatement(queryPart, parametersPart)
+                else:
+                    connection.executeStatement(queryString, parameters)
+            elif isinstance(queryString, list):
                 for queryPart in queryString:
                     connection.executeQuery(queryPart)
             else:
                 connection.executeQuery(queryString)
             #print(connection.getName())
             end = default_timer()
-            durationExecute = 1000.0*(end - start)
-            if not BENCHMARKER_VERBOSE_NONE:
-                print(workername+"execution [ms]: "+str(durationExecute))
+            # commits of a run are not part of its execution
+            durationExecute = 1000.0*(end - start) - durationCommit
+            events.append(['execute', start+epoch_offset, end+epoch_offset])
+            runlog.record(numQuery, numRun, 'execute', start+epoch_offset, end+epoch_offset)
             # transfer
             data = []
             columnnames = []
             size = 0
             durationTransfer = 0
-            if query.withData:
+            # batches do not have result sets
+            if query.withData and query.batch is None:
                 if len(queryString) != 0:
                     start = default_timer()
                     # CHANGE: List of queries also receives 1 result (last query)
@@ -211,12 +309,12 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
                         data=connection.fetchResult()
                         end = default_timer()
                         durationTransfer = 1000.0*(end - start)
-                        if not BENCHMARKER_VERBOSE_NONE:
-                            print(workername+"transfer [ms]: "+str(durationTransfer))
+                        events.append(['fetch', start+epoch_offset, end+epoch_offset])
+                        token = harness.start()
                         data = [[str(item).strip() for item in sublist] for sublist in data]
+                        harness.stop('result_str', token)
                         size = sys.getsizeof(data)
-                        if not BENCHMARKER_VERBOSE_NONE:
-                            print(workername+"Size of result list retrieved: "+str(size)+" bytes")
+                        runlog.record(numQuery, numRun, 'fetch', start+epoch_offset, end+epoch_offset, size)
                         #self.logger.debug(data)
                         #pprint.pprint(connection.cursor.__dict__)
                         #pprint.pprint(connection.cursor.description)
@@ -245,19 +343,40 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
                             data = []
                             columnnames = []
                         #self.logger.debug(columnnames)
+            if inTransaction:
+                # end of the last transaction of the run
+                commit_start = default_timer()
+                endTransaction()
+                commit_end = default_timer()
+                durationCommit += 1000.0*(commit_end - commit_start)
+                events.append(['commit', commit_start+epoch_offset, commit_end+epoch_offset])
+                inTransaction = False
+                connection.setAutoCommit(True)
         except Exception as e:
             print(workername+'Caught an error: %s' % str(e))
             error = '{workername}: {exception}'.format(workername=workername, exception=e)
+            if inTransaction:
+                # the transaction has failed
+                try:
+                    connection.rollback()
+                    connection.setAutoCommit(True)
+                except Exception as rollbackException:
+                    print(workername+'Rollback failed: %s' % str(rollbackException))
+                inTransaction = False
+            now = default_timer()+epoch_offset
+            runlog.record(numQuery, numRun, 'error', now, now)
             durationConnect = 0
             durationExecute = 0
             durationTransfer = 0
+            durationCommit = 0
             data = []
             columnnames = []
             size = 0
         finally:
             #start = default_timer()
             #print("close")
-            connection.closeCursor()
+            if not reuseCursor:
+                connection.closeCursor()
             #end = default_timer()
             #durationExecute += 1000.0*(end - start)
         # EXPLAIN: run configured EXPLAIN templates against the literal query just executed.
@@ -266,15 +385,18 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
         explainText = ""
         # EXPLAIN plans are constant across immediate repetitions of the same query, so
         # storing (as opposed to printing) only ever runs it once, on the very first run.
-        runExplainNow = explainTemplates and error == "" and (BENCHMARKER_VERBOSE_EXPLAIN or (BENCHMARKER_STORE_EXPLAIN and numRun == 0))
+        runExplainNow = explainTemplates and error == "" and query.batch is None and (BENCHMARKER_VERBOSE_EXPLAIN or (BENCHMARKER_STORE_EXPLAIN and numRun == 0))
         if runExplainNow:
             queryParts = queryString if isinstance(queryString, list) else [queryString]
-            for queryPart in queryParts:
+            # statements with bind variables are explained with the values of this run
+            parametersParts = parameters if isinstance(queryString, list) and parameters is not None else [parameters]*len(queryParts)
+            for queryPart, parametersPart in zip(queryParts, parametersParts):
                 for explainTemplate in explainTemplates:
                     try:
                         explainQuery = explainTemplate.format(query=queryPart)
-                        connection.openCursor()
-                        connection.executeQuery(explainQuery)
+                        if not reuseCursor:
+                            connection.openCursor()
+                        connection.executeQuery(explainQuery, parametersPart)
                         explainData = connection.fetchResult()
                         if BENCHMARKER_VERBOSE_EXPLAIN:
                             print(workername+"EXPLAIN: "+explainQuery)
@@ -289,28 +411,43 @@ def singleRun(connectiondata, inputConfig, numRuns, connectionname, numQuery, pa
                         if BENCHMARKER_STORE_EXPLAIN and numRun == 0:
                             explainText += "EXPLAIN failed: {}\n".format(explainException)
                     finally:
-                        connection.closeCursor()
+                        if not reuseCursor:
+                            connection.closeCursor()
         result = singleRunOutput()
         # connection time is valid only for first run (making the connection)
         if numRun==numRuns[0] and query.withConnect:
             result.durationConnect = durationConnect
+            result.events = eventsConnect + events
         else:
             result.durationConnect = 0.0
+            result.events = events
+        result.pid = pid
+        result.overhead = harness.phases
         result.durationExecute = durationExecute
         result.durationTransfer = durationTransfer
+        result.durationCommit = durationCommit
         result.error = error
         result.data = data
         result.size = size
         result.columnnames = columnnames
         result.explain = explainText
+        result.batches = l_batches
         #result.size = size
         results.append(result)
+        # console output is a consumer of the recorded events, printed after each run outside of the timers
+        if not BENCHMARKER_VERBOSE_NONE:
+            tracer.recorder.printRecords(runlog.consume())
+    if reuseCursor:
+        connection.closeCursor()
     if not len(activeConnections) > numActiveConnection:
         #start = default_timer()
         #print("disconnect")
         connection.disconnect()
         #end = default_timer()
         #durationConnect += 1000.0*(end - start)
+    if not BENCHMARKER_VERBOSE_NONE:
+        tracer.recorder.printRecords(runlog.consume())
+    runlog.flush()
     return results
 
 
@@ -327,7 +464,7 @@ class singleResultInput:
 
 
 
-def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery, path=None):
+def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery, path=None, BENCHMARKER_OVERHEAD=False):
     """
     Function for treating result sets
 
@@ -337,6 +474,7 @@ def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery,
     :param connectionname: Name of the connection
     :param numQuery: Number of the query, 1...
     :param path: Result path, for optional storing received data
+    :param BENCHMARKER_OVERHEAD: Measure overhead of the benchmarker per phase
     :return: returns object of class singleRunOutput
     """
     import logging
@@ -347,10 +485,16 @@ def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery,
     results = []
     # info about dbms
     connection = tools.dbms(connectiondata)
+    # offset to convert timer values into wall clock timestamps for tracing
+    epoch_offset = time.time() - default_timer()
     # perform runs for this connection
     for numRun in numRuns:
         workername = "numRun %i: " % (numRun+1)
-        query = tools.query(inputConfig[numRun].queryConfig)
+        start = default_timer()
+        harness = tools.overhead(BENCHMARKER_OVERHEAD)
+        token = harness.start()
+        query = tools.query.fromDict(inputConfig[numRun].queryConfig)
+        harness.stop('query_object', token)
         error = ""
         try:
             # transfer
@@ -359,7 +503,9 @@ def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery,
             size = 0
             #print(data)
             if query.result:
+                token = harness.start()
                 data = [[str(item).strip() for item in sublist] for sublist in data]
+                harness.stop('result_str', token)
                 #if query.restrict_precision is not None:
                     #data = [[round(float(item), int(query.restrict_precision)) if tools.convertToFloat(item) == float else item for item in sublist] for sublist in data]
                     #data = [[tools.convert_to_rounded_float(item, int(query.restrict_precision)) for item in sublist] for sublist in data]
@@ -370,9 +516,11 @@ def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery,
                     precision = 10
                 if query.sorted and len(data) > 0:
                     logger.debug(workername+"Begin sorting")
+                    token = harness.start()
                     #data = sorted(data, key=itemgetter(*list(range(0,len(data[0])))))
                     data = [[tools.convert_to_rounded_float_2(item, int(precision)) for item in sublist] for sublist in data]
                     data = sorted(data, key=lambda sublist: tools.sort_key_rounded(sublist, precision))
+                    harness.stop('result_sort', token)
                     #print(data, precision)
                     logger.debug(workername+"Finished sorting")
                 logger.debug(workername+"Size of processed result list retrieved: "+str(sys.getsizeof(data))+" bytes")
@@ -429,10 +577,14 @@ def singleResult(connectiondata, inputConfig, numRuns, connectionname, numQuery,
         finally:
             pass
         logger.debug(workername+'Done processing result')
+        end = default_timer()
         result = singleRunOutput()
         result.error = error
         result.data = data
         result.size = size
+        result.events = [['result', start+epoch_offset, end+epoch_offset]]
+        result.pid = os.getpid()
+        result.overhead = harness.phases
         results.append(result)
     return results
 
@@ -489,6 +641,10 @@ class benchmarker():
         self.fixedAlias = fixedAlias        # what alias is in connection file
         self.fixed_database = ""
         self.fixed_schema = ""
+        # durations [ms] of queries in a previous experiment, for longest-processing-time-first scheduling
+        self.schedule_durations = None
+        # compiled query plans by fingerprint
+        self.query_plans = {}
         # for connections staying active for all benchmarks
         self.activeConnections = []
         #self.runsPerConnection = 4
@@ -501,6 +657,14 @@ class benchmarker():
         self.pool = None
         # store number of cpu cores
         self.num_cpu = mp.cpu_count()
+        # max number of client processes, where client host has not been saturated (autoProcesses)
+        self.client_process_cap = None
+        # cores the client may use, for pinning processes
+        if hasattr(os, 'sched_getaffinity'):
+            self.client_cores = sorted(os.sched_getaffinity(0))
+        else:
+            self.client_cores = []
+        self.client_pinned = False
         # printer is first and fixed reporter
         self.reporter = [reporter.printer(self)]
         # store is fixed reporter and cannot be removed
@@ -531,7 +695,7 @@ class benchmarker():
                     # result folder exists and contains results
                     self.code = path.basename(path.normpath(result_path))
                     self.path = result_path
-                    if path.isfile(result_path+'/protocol.json'):
+                    if path.isfile(result_path+'/protocol.json') or path.isfile(result_path+'/protocol.journal'):
                         self.continuing = True
                 else:
                     # result path is not a folder for existing results
@@ -572,6 +736,9 @@ class benchmarker():
             if path.isfile(self.resultfolder_base+'/protocol.json'):
                 copyfile(self.resultfolder_base+'/protocol.json', self.path+'/protocol.json')
                 self.continuing = True
+            if path.isfile(self.resultfolder_base+'/protocol.journal'):
+                copyfile(self.resultfolder_base+'/protocol.journal', self.path+'/protocol.journal')
+                self.continuing = True
         #print("Results in folder {}".format(self.path))
         self.logger.debug("Results in folder {}".format(self.path))
         # querywise or connectionwise
@@ -600,12 +767,13 @@ class benchmarker():
         self.timerExecution = tools.timer("execution")
         self.timerTransfer = tools.timer("datatransfer")
         self.timerConnect = tools.timer("connection")
+        self.timerCommit = tools.timer("commit")
         self.timerSession = tools.timer("session")
         self.timerSession.stackable = False
         self.timerSession.perRun = False
         self.timerRun = tools.timer("run")
         self.timerRun.stackable = False
-        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect]
+        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit]
     def store_ordering(self, ordering):
         #print("store_ordering", ordering)
         if self.stream_id is not None:
@@ -678,6 +846,8 @@ class benchmarker():
                     with open(self.path+'/queries.config','w') as outp:
                         pprint.pprint(self.queryconfig, outp)
             self.queries = self.queryconfig["queries"].copy()
+            # query objects of a previous query file are not needed anymore
+            tools.query.clearCache()
             # default for all queries is being 'active'
             for numQuery in range(len(self.queries)):
                 if not 'active' in self.queries[numQuery]:
@@ -893,7 +1063,7 @@ class benchmarker():
         for t in self.timers:
             for numQuery in range(1, len(self.queries)+1):
                 if t.checkForSuccessfulBenchmarks(numQuery):
-                    queryObject = tools.query(self.queries[numQuery-1])
+                    queryObject = tools.query.fromDict(self.queries[numQuery-1])
                     # is timer active for this query?
                     if not queryObject.timer[t.name]['active']:
                         continue
@@ -938,21 +1108,11 @@ class benchmarker():
         :return: String of (SQL) query
         """
         q = self.queries[numQuery-1]
-        query = tools.query(q)
+        query = tools.query.fromDict(q)
         if len(query.queryList) > 0 and len(self.protocol['query'][str(numQuery)]['runs']) > 0:
             queryString = self.getQueryString(query.queryList[numRun % len(query.queryList)], connectionname, self.protocol['query'][str(numQuery)]['runs'][numRun])
             return queryString
-        queryString = query.query
-        # overwrite default query string with dialect
-        if connectionname is not None and len(query.DBMS) > 0 and 'dialect' in self.dbms[connectionname].connectiondata:
-            for c, q in query.DBMS.items():
-                if self.dbms[connectionname].connectiondata['dialect'] == c:
-                    queryString = q
-        # overwrite default query string with variant matching the beginning of the name of connection
-        if connectionname is not None and len(query.DBMS) > 0:
-            for c, q in query.DBMS.items():
-                if connectionname.startswith(c):
-                    queryString = q
+        queryString = self.getQueryTemplate(query, connectionname)
         def parametrize(queryTemplate, numQuery, numRun):
             params = self.protocol['query'][str(numQuery)]['parameter'][numRun]
             params['numRun'] = numRun
@@ -983,9 +1143,132 @@ class benchmarker():
         #else:
         #   bParametrized = False
         return queryString
+    def getQueryTemplate(self, query, connectionname=None):
+        """
+        Returns the query template valid for a connection, i.e. resolves dialects.
+
+        :param query: Query object
+        :param connectionname: Name of connection
+        :return: String of (SQL) query template, or list of strings
+        """
+        queryString = query.query
+        # overwrite default query string with dialect
+        if connectionname is not None and len(query.DBMS) > 0 and 'dialect' in self.dbms[connectionname].connectiondata:
+            for c, q in query.DBMS.items():
+                if self.dbms[connectionname].connectiondata['dialect'] == c:
+                    queryString = q
+        # overwrite default query string with variant matching the beginning of the name of connection
+        if connectionname is not None and len(query.DBMS) > 0:
+            for c, q in query.DBMS.items():
+                if connectionname.startswith(c):
+                    queryString = q
+        return queryString
+    def getQueryPlanFolder(self):
+        """
+        Returns the folder of compiled query plans.
+        Streams writing to subfolders keep their plans in their subfolder, so the result folder contains stream subfolders only.
+
+        :return: Name of folder
+        """
+        return self.path+'/plans'
+    def getQueryPlan(self, numQuery, connectionname):
+        """
+        Returns the final query strings of all runs of a query for a connection (the compiled query plan).
+        Dialects and query lists are resolved once and templates are formatted once per run.
+        Plans are identified by a fingerprint of template and parameters.
+        They are kept in memory and stored in the folder plans, so continue and other streams reuse them.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :return: List of query strings (or lists of strings), one per run. For queries with bind variables a dict of statement and parameters per run.
+        """
+        query = tools.query.fromDict(self.queries[numQuery-1])
+        protocol_query = self.protocol['query'][str(numQuery)]
+        if len(query.queryList) > 0 and len(protocol_query['runs']) > 0:
+            # runs of a query list are runs of the queries in the list
+            plans = {}
+            plan = []
+            for numRun in range(query.numRun):
+                numQueryList = query.queryList[numRun % len(query.queryList)]
+                if not numQueryList in plans:
+                    plans[numQueryList] = self.getQueryPlan(numQueryList, connectionname)
+                plan.append(plans[numQueryList][protocol_query['runs'][numRun]])
+            return plan
+        template = self.getQueryTemplate(query, connectionname)
+        parameters = protocol_query['parameter']
+        if len(parameters) == 0:
+            # not parametrized
+            if query.bind:
+                # statement is prepared once per connection
+                # in batch mode a single statement is a single row, a list of statements is a row per statement
+                if isinstance(template, list):
+                    parameters_run = [[]]*len(template)
+                elif query.batch is not None:
+                    parameters_run = [[]]
+                else:
+                    parameters_run = []
+                return [{'statement': template, 'parameters': parameters_run}]*query.numRun
+            return [template]*query.numRun
+        for numRun in range(len(parameters)):
+            parameters[numRun]['numRun'] = numRun
+        fingerprint = hashlib.sha224(json.dumps([template, parameters, parameter.defaultParameters, query.bind], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        if fingerprint in self.query_plans:
+            return self.query_plans[fingerprint]
+        filename = self.getQueryPlanFolder()+'/query_{}_{}.json'.format(numQuery, fingerprint)
+        if path.isfile(filename):
+            try:
+                with open(filename, 'r') as f:
+                    plan = json.load(f)
+                self.query_plans[fingerprint] = plan
+                return plan
+            except Exception as e:
+                self.logger.warning("Could not read query plan {}: {}".format(filename, e))
+        def bind(template, params):
+            # values are bound as they are, NumPy values are converted to Python values
+            statement, names = tools.bindTemplate(template)
+            return statement, [params[name].item() if hasattr(params[name], 'item') else params[name] for name in names]
+        def bindRows(template, params):
+            # in batch mode a parameter NAME of size k yields k rows, row j binds NAMEj
+            statement, names = tools.bindTemplate(template)
+            sized = [name for name in names if not name in params and name+'1' in params]
+            numRows = 1
+            if len(sized) > 0:
+                numRows = min([len([j for j in range(1, len(params)+1) if name+str(j) in params]) for name in sized])
+            rows = []
+            for j in range(1, numRows+1):
+                row = {name: params[name+str(j)] if name in sized else params[name] for name in names}
+                rows.append(bind(template, row)[1])
+            return statement, rows
+        plan = []
+        for numRun in range(query.numRun):
+            params = tools.joinDicts(parameters[numRun], parameter.defaultParameters)
+            if query.bind:
+                # statement with bind variables and their values
+                if query.batch is not None and not isinstance(template, list):
+                    statement, rows = bindRows(template, params)
+                    plan.append({'statement': statement, 'parameters': rows})
+                elif isinstance(template, list):
+                    bound = [bind(t, params) for t in template]
+                    plan.append({'statement': [b[0] for b in bound], 'parameters': [b[1] for b in bound]})
+                else:
+                    statement, values = bind(template, params)
+                    plan.append({'statement': statement, 'parameters': values})
+            elif isinstance(template, list):
+                plan.append([t.format(**params) for t in template])
+            else:
+                plan.append(template.format(**params))
+        self.query_plans[fingerprint] = plan
+        if len(self.path) > 0:
+            makedirs(self.getQueryPlanFolder(), exist_ok=True)
+            # streams may write the same plan concurrently
+            filename_tmp = filename+'.{}.tmp'.format(os.getpid())
+            with open(filename_tmp, 'w') as f:
+                json.dump(plan, f)
+            os.replace(filename_tmp, filename)
+        return plan
     def getRandomRun(self, numQuery):#, connectionname, numRun=None):
         q = self.queries[numQuery-1]
-        query = tools.query(q)
+        query = tools.query.fromDict(q)
         numRun = math.floor(random.uniform(0,query.numRun))
         #queryString = self.getQueryString(numQuery, connectionname=connectionname, numRun=numRun)
         #print(queryString)
@@ -995,7 +1278,7 @@ class benchmarker():
         # connection management for parallel connections
         q = self.queries[numQuery-1]
         # prepare query object
-        query = tools.query(q)
+        query = tools.query.fromDict(q)
         #print(self.connectionmanagement)
         numProcesses = self.connectionmanagement['numProcesses']#self.numProcesses
         batchsize = self.connectionmanagement['runsPerConnection']#self.runsPerConnection
@@ -1040,8 +1323,22 @@ class benchmarker():
                 timeout = connectionmanagement['timeout']
             if('singleConnection' in connectionmanagement):# and connectionmanagement['timeout'] != 0):
                 singleConnection = connectionmanagement['singleConnection']
+        # further options, overwritten in the same order
+        options = {'clientMonitoring': False, 'autoProcesses': False, 'clientUtilizationThreshold': 0.9, 'pinning': False, 'pinningReserved': 1, 'reuseCursor': False}
+        for connectionmanagement in [self.connectionmanagement, self.queryconfig.get('connectionmanagement', {}), self.dbms[connectionname].connectiondata.get('connectionmanagement', {}), q.get('connectionmanagement', {})]:
+            for option in options:
+                if option in connectionmanagement:
+                    options[option] = connectionmanagement[option]
         if numProcesses == 0 or numProcesses is None:
             numProcesses = 1
+        if options['autoProcesses']:
+            # numProcesses is an upper bound, capped where the client host has been saturated
+            client = self.protocol['query'][str(numQuery)].get('client', {})
+            if connectionname in client and 'numProcesses' in client[connectionname]:
+                # we have already run with a cap
+                numProcesses = client[connectionname]['numProcesses']
+            elif self.client_process_cap is not None:
+                numProcesses = min(numProcesses, self.client_process_cap)
         if timeout == 0:
             timeout = None
         if batchsize == 0 or batchsize is None:
@@ -1049,7 +1346,135 @@ class benchmarker():
         # unless pickling of java objects is possible
         # we cannot have global connections
         #singleConnection = False
-        return {'numProcesses': numProcesses, 'runsPerConnection': batchsize, 'timeout': timeout, 'singleConnection': singleConnection}
+        return {'numProcesses': numProcesses, 'runsPerConnection': batchsize, 'timeout': timeout, 'singleConnection': singleConnection, **options}
+    def getPinningLayout(self, numProcesses, reserved=1):
+        """
+        Computes the layout of cores for pinning processes.
+        The first cores are reserved for the main process, i.e. post-processing of results and writing reports.
+        Each worker process gets a dedicated core of the remaining cores.
+        If there are more workers than remaining cores, cores are shared round robin.
+
+        :param numProcesses: Number of worker processes
+        :param reserved: Number of cores reserved for the main process
+        :return: Dict {'main': list of cores, 'workers': list of one core per worker}, empty if pinning is not possible
+        """
+        cores = self.client_cores
+        if len(cores) == 0:
+            self.logger.warning("Pinning of processes is not supported on this client")
+            return {}
+        reserved = max(1, min(reserved, len(cores)-1)) if len(cores) > 1 else 1
+        cores_main = cores[:reserved]
+        cores_workers = cores[reserved:]
+        if len(cores_workers) == 0:
+            cores_workers = cores
+            self.logger.warning("Not enough cores to separate main process and workers")
+        elif len(cores_workers) < numProcesses:
+            self.logger.warning("Not enough cores to pin {} workers to dedicated cores, {} are shared".format(numProcesses, numProcesses-len(cores_workers)))
+        return {'main': cores_main, 'workers': [cores_workers[i % len(cores_workers)] for i in range(numProcesses)]}
+    def getCheckpointFilename(self, numQuery, connectionname):
+        """
+        Returns name of the checkpoint file of a query and connection.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :return: Name of file
+        """
+        return self.path+'/checkpoint/query_{}_{}.jsonl'.format(numQuery, connectionname)
+    def writeCheckpoint(self, numQuery, connectionname, numRuns, results, storeData=True):
+        """
+        Appends a finished batch of runs to the checkpoint of a query and connection as a single JSON line.
+        This contains timings, errors and a fingerprint of the result set per run.
+        Result sets are only contained if the query stores data.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :param numRuns: List of numbers of runs of the batch
+        :param results: List of singleRunOutput of the batch
+        :param storeData: Store result sets of runs
+        :return: returns nothing
+        """
+        batch = []
+        for numRun, result in zip(numRuns, results):
+            run = {
+                'numRun': numRun,
+                'connect': result.durationConnect,
+                'execute': result.durationExecute,
+                'transfer': result.durationTransfer,
+                'commit': result.durationCommit,
+                'error': result.error,
+                'size': result.size,
+                'explain': result.explain,
+                'fingerprint': hashlib.sha224(json.dumps([result.columnnames, result.data]).encode()).hexdigest(),
+            }
+            if storeData:
+                run['columnnames'] = result.columnnames
+                run['data'] = result.data
+            batch.append(run)
+        with open(self.getCheckpointFilename(numQuery, connectionname), 'a') as f:
+            f.write(json.dumps(batch)+'\n')
+    def readCheckpoint(self, numQuery, connectionname):
+        """
+        Reads the checkpoint of a query and connection, i.e. runs finished before an abort.
+        Runs with a result set not matching its fingerprint are skipped, so they will be run again.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :return: Dict of number of run -> singleRunOutput
+        """
+        results = {}
+        filename = self.getCheckpointFilename(numQuery, connectionname)
+        if not path.isfile(filename):
+            return results
+        with open(filename, 'r') as f:
+            for line in f:
+                try:
+                    batch = json.loads(line)
+                except ValueError:
+                    # incomplete last line of an aborted run
+                    break
+                for run in batch:
+                    # result sets are missing if the query does not store data
+                    run.setdefault('columnnames', [])
+                    run.setdefault('data', [])
+                    if hashlib.sha224(json.dumps([run['columnnames'], run['data']]).encode()).hexdigest() != run['fingerprint']:
+                        self.logger.warning("Checkpoint of run {} of Q{} at dbms {} does not match fingerprint".format(run['numRun'], numQuery, connectionname))
+                        continue
+                    result = singleRunOutput()
+                    result.durationConnect = run['connect']
+                    result.durationExecute = run['execute']
+                    result.durationTransfer = run['transfer']
+                    result.durationCommit = run.get('commit', 0.0)
+                    result.error = run['error']
+                    result.size = run['size']
+                    result.explain = run['explain']
+                    result.columnnames = run['columnnames']
+                    result.data = run['data']
+                    results[run['numRun']] = result
+        return results
+    def removeCheckpoint(self, numQuery, connectionname):
+        """
+        Removes the checkpoint of a query and connection, if there is any.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :return: returns nothing
+        """
+        filename = self.getCheckpointFilename(numQuery, connectionname)
+        if path.isfile(filename):
+            os.remove(filename)
+    def getCheckpointCallback(self, numQuery, connectionname, numRuns, storeData=True):
+        """
+        Returns callback for a batch of runs sent to a pool, that checkpoints the batch as soon as it is finished.
+
+        :param numQuery: Number of query
+        :param connectionname: Name of connection
+        :param numRuns: List of numbers of runs of the batch
+        :param storeData: Store result sets of runs
+        :return: Callback, None if checkpointing is not active
+        """
+        if not BENCHMARKER_CHECKPOINT:
+            return None
+        return lambda results: self.writeCheckpoint(numQuery, connectionname, numRuns, results, storeData)
     def runSingleBenchmarkRun(self, numQuery, connectionname, numRun=0):
         """
         Runs a single benchmark run.
@@ -1149,6 +1574,7 @@ class benchmarker():
                     self.timerExecution.skipTimer(numQuery, numQuery, connectionname)
                     self.timerTransfer.skipTimer(numQuery, numQuery, connectionname)
                     self.timerConnect.skipTimer(numQuery, numQuery, connectionname)
+                    self.timerCommit.skipTimer(numQuery, numQuery, connectionname)
                     return False
         # prepare basic setting
         self.logger.debug("Starting benchmarks of Q"+str(numQuery)+" at dbms "+connectionname)
@@ -1161,8 +1587,11 @@ class benchmarker():
         logger = mp.log_to_stderr()
         logger.setLevel(logging.WARNING)
         # prepare query object
-        query = tools.query(q)
+        query = tools.query.fromDict(q)
         # connection management for parallel connections
+        if 'client' in self.protocol['query'][str(numQuery)]:
+            # forget about client saturation of previous run
+            self.protocol['query'][str(numQuery)]['client'].pop(c, None)
         connectionmanagement = self.getConnectionManager(numQuery, c)
         numProcesses = connectionmanagement['numProcesses']#self.numProcesses
         batchsize = connectionmanagement['runsPerConnection']#self.runsPerConnection
@@ -1210,6 +1639,9 @@ class benchmarker():
         # prepare protocol for explain
         if c not in self.protocol['query'][str(numQuery)]['explain']:
             self.protocol['query'][str(numQuery)]['explain'][c] = ""
+        # prepare protocol for events (tracing)
+        if BENCHMARKER_TRACE and not 'events' in self.protocol['query'][str(numQuery)]:
+            self.protocol['query'][str(numQuery)]['events'] = {}
         # skip query if not active
         if not query.active:
             self.logger.info("Benchmarks of Q"+str(numQuery)+" at dbms "+connectionname+" is not active")
@@ -1217,6 +1649,7 @@ class benchmarker():
             self.timerExecution.skipTimer(numQuery, query, connectionname)
             self.timerTransfer.skipTimer(numQuery, query, connectionname)
             self.timerConnect.skipTimer(numQuery, query, connectionname)
+            self.timerCommit.skipTimer(numQuery, query, connectionname)
             self.stopBenchmarkingQuery(numQuery)
             return False
         # skip connection if not active
@@ -1226,12 +1659,29 @@ class benchmarker():
             self.timerExecution.skipTimer(numQuery, query, connectionname)
             self.timerTransfer.skipTimer(numQuery, query, connectionname)
             self.timerConnect.skipTimer(numQuery, query, connectionname)
+            self.timerCommit.skipTimer(numQuery, query, connectionname)
             self.stopBenchmarkingQuery(numQuery)
             return False
         # always reset parts of protocol
         self.protocol['query'][str(numQuery)]['resultSets'][c] = []
         self.protocol['query'][str(numQuery)]['errors'][c] = ""
         self.protocol['query'][str(numQuery)]['warnings'][c] = ""
+        # resume runs of an aborted benchmark
+        checkpoint = {}
+        if self.timerExecution.checkForSuccessfulBenchmarks(numQuery, connectionname):
+            # rerun, so checkpoint is outdated
+            self.removeCheckpoint(numQuery, c)
+        elif BENCHMARKER_CHECKPOINT:
+            checkpoint = self.readCheckpoint(numQuery, c)
+        runs_missing = [i for i in runs if not i in checkpoint]
+        numBatches = math.ceil(len(runs_missing)/batchsize)
+        numRunsResumed = len(checkpoint)
+        if numRunsResumed > 0:
+            self.logger.info("Resume Q{} at dbms {}: {} runs found in checkpoint, {} runs missing".format(numQuery, c, numRunsResumed, len(runs_missing)))
+        if BENCHMARKER_CHECKPOINT:
+            makedirs(self.path+'/checkpoint', exist_ok=True)
+            # persist parameters of runs, so a resumed benchmark uses the same
+            self.reporterStore.writeJournal(numQuery)
         # dump settings
         if BENCHMARKER_VERBOSE_PROCESS:
             self.logger.info("runsPerConnection: "+str(batchsize))
@@ -1248,6 +1698,32 @@ class benchmarker():
                 self.activeConnections.append(tools.dbms(self.dbms[connectionname].connectiondata))
                 self.logger.info("Establish global connection #"+str(i))
                 self.activeConnections[i].connect()
+        # pin processes to cores
+        pinning = {}
+        if connectionmanagement['pinning'] and not singleConnection and self.pool is None:
+            pinning = self.getPinningLayout(numProcesses, connectionmanagement['pinningReserved'])
+        if len(pinning) > 0:
+            os.sched_setaffinity(0, pinning['main'])
+            self.client_pinned = True
+            if not 'pinning' in self.protocol['query'][str(numQuery)]:
+                self.protocol['query'][str(numQuery)]['pinning'] = {}
+            self.protocol['query'][str(numQuery)]['pinning'][c] = pinning
+            pool_pinning = {'initializer': pinWorker, 'initargs': (mp.Value('i', 0), pinning['workers'])}
+        else:
+            if self.client_pinned:
+                # release main process, otherwise workers inherit reserved cores
+                os.sched_setaffinity(0, self.client_cores)
+                self.client_pinned = False
+            if 'pinning' in self.protocol['query'][str(numQuery)]:
+                self.protocol['query'][str(numQuery)]['pinning'].pop(c, None)
+            pool_pinning = {}
+        # reusing cursors changes what the execution timer measures
+        if connectionmanagement['reuseCursor']:
+            if not 'reuseCursor' in self.protocol['query'][str(numQuery)]:
+                self.protocol['query'][str(numQuery)]['reuseCursor'] = {}
+            self.protocol['query'][str(numQuery)]['reuseCursor'][c] = True
+        elif 'reuseCursor' in self.protocol['query'][str(numQuery)]:
+            self.protocol['query'][str(numQuery)]['reuseCursor'].pop(c, None)
         # do we want to keep result sets? (because of mismatch)
         keepResultsets = False
         # do we want to cancel / abort loop over benchmarks?
@@ -1256,6 +1732,10 @@ class benchmarker():
             # start connecting
             self.timerExecution.startTimer(numQuery, query, connectionname)
             self.timerTransfer.startTimer(numQuery, query, connectionname)
+            if query.transaction is not None:
+                self.timerCommit.startTimer(numQuery, query, connectionname)
+            else:
+                self.timerCommit.skipTimer(numQuery, query, connectionname)
             if singleConnection and len(self.activeConnections):
                 # we have a global connection
                 self.timerConnect.skipTimer(numQuery, query, connectionname)
@@ -1282,22 +1762,35 @@ class benchmarker():
             else:
                 range_runs = tqdm(range(0, query.numRun))
             # prepare input data for processes
+            harness = tools.overhead(BENCHMARKER_OVERHEAD)
+            # query strings of all runs are compiled once
+            token = harness.start()
+            plan = self.getQueryPlan(numQuery, c)
+            overhead_query_string = harness.stop('query_string', token)
+            l_overhead_query_string = [overhead_query_string//query.numRun]*query.numRun if query.numRun > 0 else []
             inputConfig = []
             for i in range(query.numRun):
-                #print(self.protocol['query'][str(numQuery)]['runs'])
-                # replace parameter in query template
-                #if len(self.protocol['query'][str(numQuery)]['runs']) > 0:
-                #   queryString = self.getQueryString(query.queryList[i % len(query.queryList)], c, self.protocol['query'][str(numQuery)]['runs'][i])
-                #else:
-                #   queryString = self.getQueryString(numQuery, c, i)
-                queryString = self.getQueryString(numQuery, c, i)
-                #print(queryString)
-                #self.logger.debug(queryString) # shown by singleRun?
-                inputConfig.append(singleRunInput(i, queryString, self.queries[numQuery-1]))
+                if isinstance(plan[i], dict):
+                    # prepared statement and values of bind variables
+                    inputConfig.append(singleRunInput(i, plan[i]['statement'], self.queries[numQuery-1], plan[i]['parameters']))
+                else:
+                    inputConfig.append(singleRunInput(i, plan[i], self.queries[numQuery-1]))
+            if harness.active and not singleConnection and numBatches > 0:
+                # estimate: the pool pickles the arguments of singleRun once per batch in a background thread,
+                # batches differ in their runs only, so the arguments of the first batch are pickled once more and counted per batch
+                token = harness.start()
+                pickle.dumps((self.dbms[c].connectiondata, inputConfig, runs_missing[0:batchsize], connectionname, numQuery, self.path, [], BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN, BENCHMARKER_RUN_LOG, BENCHMARKER_OVERHEAD, connectionmanagement['reuseCursor']))
+                if token is not None:
+                    wall_ns = time.perf_counter_ns() - token[0]
+                    cpu_ns = time.process_time_ns() - token[1]
+                    harness.add('pickle_input', wall_ns*numBatches, cpu_ns*numBatches, count=numBatches, max_wall_ns=wall_ns)
             lists = []
+            # sample utilization of client host
+            client = tools.clientmonitor(connectionmanagement['clientMonitoring'] or connectionmanagement['autoProcesses'], threshold=connectionmanagement['clientUtilizationThreshold'])
             # perform required number of warmup and benchmark runs of query
             durationBenchmark = 0.0
             start = default_timer()
+            client.start()
             # store start time for query / connection
             self.protocol['query'][str(numQuery)]['starts'][c] = str(datetime.datetime.now())
             # pooling
@@ -1305,8 +1798,8 @@ class benchmarker():
                 if self.pool is not None:
                     self.logger.info("POOL of query senders (global pool)")
                     #multiple_results = [self.pool.apply_async(singleRun, (self.dbms[c].connectiondata, inputConfig, runs[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, JPickler.dumps(self.activeConnections))) for i in range(numBatches)]
-                    multiple_results = [self.pool.apply_async(singleRun, (self.dbms[c].connectiondata, inputConfig, runs[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, [], BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN)) for i in range(numBatches)]
-                    lists = [res.get(timeout=timeout) for res in multiple_results]
+                    multiple_results = [self.pool.apply_async(singleRun, (self.dbms[c].connectiondata, inputConfig, runs_missing[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, [], BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN, BENCHMARKER_RUN_LOG, BENCHMARKER_OVERHEAD, connectionmanagement['reuseCursor']), callback=self.getCheckpointCallback(numQuery, c, runs_missing[i*batchsize:(i+1)*batchsize], query.storeData)) for i in range(numBatches)]
+                    lists = [client.wait(res, timeout) for res in multiple_results]
                     lists = [i for j in lists for i in j]
                 else:
                     """
@@ -1318,12 +1811,17 @@ class benchmarker():
                         lists = [i for j in lists for i in j]
                         pool.close()
                     """
-                    with mp.Pool(processes=numProcesses) as pool:
+                    with mp.Pool(processes=numProcesses, **pool_pinning) as pool:
                         self.logger.info("POOL of query senders (local pool starmap {} workers)".format(numProcesses))
                         #multiple_results = [pool.apply_async(singleRun, (self.dbms[c].connectiondata, inputConfig, runs[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, JPickler.dumps(self.activeConnections))) for i in range(numBatches)]
-                        args = [(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, [], BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN) for i in range(numBatches)]
-                        multiple_results = pool.starmap_async(singleRun, args)
-                        lists = multiple_results.get(timeout=timeout)
+                        args = [(self.dbms[c].connectiondata, inputConfig, runs_missing[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, [], BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN, BENCHMARKER_RUN_LOG, BENCHMARKER_OVERHEAD, connectionmanagement['reuseCursor']) for i in range(numBatches)]
+                        if BENCHMARKER_CHECKPOINT:
+                            # batches are checkpointed as soon as they are finished
+                            multiple_results = [pool.apply_async(singleRun, args[i], callback=self.getCheckpointCallback(numQuery, c, runs_missing[i*batchsize:(i+1)*batchsize], query.storeData)) for i in range(numBatches)]
+                            lists = [client.wait(res, timeout) for res in multiple_results]
+                        else:
+                            multiple_results = pool.starmap_async(singleRun, args)
+                            lists = client.wait(multiple_results, timeout)
                         #lists = [res.get(timeout=timeout) for res in multiple_results]
                         lists = [i for j in lists for i in j]
                         pool.close()
@@ -1336,15 +1834,18 @@ class benchmarker():
                 start_time_queries = default_timer()
                 lists = []
                 for i in range(numBatches):
-                    lists_batch = singleRun(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, self.activeConnections, BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN)
+                    lists_batch = singleRun(self.dbms[c].connectiondata, inputConfig, runs_missing[i*batchsize:(i+1)*batchsize], connectionname, numQuery, self.path, self.activeConnections, BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN, BENCHMARKER_RUN_LOG, BENCHMARKER_OVERHEAD, connectionmanagement['reuseCursor'])
                     lists.extend(lists_batch)
+                    if BENCHMARKER_CHECKPOINT:
+                        self.writeCheckpoint(numQuery, c, runs_missing[i*batchsize:(i+1)*batchsize], lists_batch, query.storeData)
+                    client.sample()
                     end_time_queries = default_timer()
                     duration_queries = (end_time_queries - start_time_queries)
                     if query.maxTime is not None and query.maxTime < duration_queries:
                         # fill with zero? affects statistics
                         self.logger.info("Reached maxTime={}s after {}s".format(query.maxTime, duration_queries))
-                        self.logger.info("We have received {} query results, so {} are missing and will be filled up".format(len(lists), query.numRun-len(lists)))
-                        lists_empty = [singleRunOutput() for i in range(query.numRun-len(lists))]
+                        self.logger.info("We have received {} query results, so {} are missing and will be filled up".format(len(lists), len(runs_missing)-len(lists)))
+                        lists_empty = [singleRunOutput() for i in range(len(runs_missing)-len(lists))]
                         lists.extend(lists_empty)
                         break
                 # we do not close connections per query but per workload
@@ -1355,7 +1856,31 @@ class benchmarker():
             # store end time for query / connection
             end = default_timer()
             durationBenchmark = 1000.0*(end - start)
+            client_summary = client.stop()
+            if len(client_summary) > 0:
+                if not 'client' in self.protocol['query'][str(numQuery)]:
+                    self.protocol['query'][str(numQuery)]['client'] = {}
+                client_summary['numProcesses'] = connectionmanagement['numProcesses']
+                self.protocol['query'][str(numQuery)]['client'][c] = client_summary
+                if client_summary['saturated']:
+                    self.logger.warning("Client saturated at Q{} and dbms {}: CPU utilization {:.0%}, run queue {:.1f} at {} cores - measurements may reflect client throughput".format(numQuery, c, client_summary['cpu_utilization_mean'], client_summary['runqueue_mean'], client_summary['num_cpu']))
+                    if connectionmanagement['autoProcesses'] and not singleConnection:
+                        cap = tools.clientmonitor.getProcessCap(numProcesses, client_summary)
+                        if cap is not None and (self.client_process_cap is None or cap < self.client_process_cap):
+                            self.client_process_cap = cap
+                            self.logger.warning("Client processes are capped to {} from now on".format(cap))
             self.protocol['query'][str(numQuery)]['ends'][c] = str(datetime.datetime.now())
+            if numRunsResumed > 0:
+                # merge runs of checkpoint and runs performed now, ordered by number of run
+                for numRun, result in zip(runs_missing, lists):
+                    checkpoint[numRun] = result
+                lists = [checkpoint[i] if i in checkpoint else singleRunOutput() for i in runs]
+                # duration covers the resumed part only
+                if not 'resumedRuns' in self.protocol['query'][str(numQuery)]:
+                    self.protocol['query'][str(numQuery)]['resumedRuns'] = {}
+                self.protocol['query'][str(numQuery)]['resumedRuns'][c] = numRunsResumed
+            elif 'resumedRuns' in self.protocol['query'][str(numQuery)]:
+                self.protocol['query'][str(numQuery)]['resumedRuns'].pop(c, None)
             #pool.close()
             #pool.join()
             #lists = [res.get() for res in multiple_results]
@@ -1373,11 +1898,39 @@ class benchmarker():
                     explainText = l_explain[i]
                     break
             self.protocol['query'][str(numQuery)]['explain'][c] = explainText
+            if query.batch is not None:
+                # timings of batches and rows
+                l_batches = [getattr(l, 'batches', []) for l in lists]
+                numRows = sum([rows for batches in l_batches for rows, duration in batches])
+                numBatches = sum([len(batches) for batches in l_batches])
+                durationBatches = sum([duration for batches in l_batches for rows, duration in batches])
+                if not 'batch' in self.protocol['query'][str(numQuery)]:
+                    self.protocol['query'][str(numQuery)]['batch'] = {}
+                self.protocol['query'][str(numQuery)]['batch'][c] = {
+                    'size': query.batch['size'],
+                    'commit': query.batch['commit'],
+                    'batches': numBatches,
+                    'rows': numRows,
+                    'ms_per_batch': durationBatches/numBatches if numBatches > 0 else 0,
+                    'ms_per_row': durationBatches/numRows if numRows > 0 else 0,
+                    'rows_per_second': 1000.0*numRows/durationBatches if durationBatches > 0 else 0,
+                    'runs': l_batches,
+                }
             self.timerConnect.time_c = l_connect
             self.timerExecution.time_c = l_execute
             self.timerTransfer.time_c = l_transfer
+            if query.transaction is not None:
+                self.timerCommit.time_c = [getattr(l, 'durationCommit', 0.0) for l in lists]
             self.protocol['query'][str(numQuery)]['durations'][c] = durationBenchmark
             self.protocol['query'][str(numQuery)]['errors'][c] = error
+            # collect events of runs for tracing
+            l_events = [[[i, phase, event_start, event_end, l.pid] for phase, event_start, event_end in l.events] for i, l in enumerate(lists)]
+            # collect overhead of runs
+            l_overhead = [tools.overhead() for l in lists]
+            for i, l in enumerate(lists):
+                l_overhead[i].merge(l.overhead)
+                if i < len(l_overhead_query_string):
+                    l_overhead[i].add('query_string', l_overhead_query_string[i], 0)
             # prepare input data for processing result sets
             inputConfig = []
             for i in range(query.numRun):
@@ -1395,7 +1948,7 @@ class benchmarker():
                     if BENCHMARKER_VERBOSE_PROCESS:
                         self.logger.info("Process {} runs in {} batches of size {} within this processes".format(query.numRun, numBatches_data, batchsize_data, numProcesses_data))
                     i = 0
-                    lists = singleResult(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize_data:(i+1)*batchsize_data], connectionname, numQuery, self.path)
+                    lists = singleResult(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize_data:(i+1)*batchsize_data], connectionname, numQuery, self.path, BENCHMARKER_OVERHEAD)
                 else:
                     # several result sets
                     # process sequentially
@@ -1403,7 +1956,7 @@ class benchmarker():
                         self.logger.info("Process {} runs in {} batches of size {} within this processes sequentially".format(query.numRun, numBatches_data, batchsize_data))
                     lists = []
                     for i in range(numBatches_data):
-                        lists_batch = singleResult(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize_data:(i+1)*batchsize_data], connectionname, numQuery, self.path)
+                        lists_batch = singleResult(self.dbms[c].connectiondata, inputConfig, runs[i*batchsize_data:(i+1)*batchsize_data], connectionname, numQuery, self.path, BENCHMARKER_OVERHEAD)
                         lists.extend(lists_batch)
                     # process in parallel
                     """
@@ -1415,6 +1968,19 @@ class benchmarker():
                     """
                 l_data = [l.data for l in lists]
                 l_size = [l.size for l in lists]
+                for i, l in enumerate(lists):
+                    if i < len(l_events):
+                        l_events[i].extend([[i, phase, event_start, event_end, l.pid] for phase, event_start, event_end in l.events])
+                    if i < len(l_overhead):
+                        l_overhead[i].merge(l.overhead)
+            if harness.active:
+                for o in l_overhead:
+                    harness.merge({phase: aggregate for phase, aggregate in o.phases.items() if phase != 'query_string'})
+                if not 'overhead' in self.protocol['query'][str(numQuery)]:
+                    self.protocol['query'][str(numQuery)]['overhead'] = {}
+                self.protocol['query'][str(numQuery)]['overhead'][c] = {'phases': harness.phases, 'runs_ns': [o.total() for o in l_overhead]}
+            if BENCHMARKER_TRACE:
+                self.protocol['query'][str(numQuery)]['events'][c] = [event for events in l_events for event in events]
             #print("Size:")
             #print(l_size)
             #print("Data:")
@@ -1489,12 +2055,16 @@ class benchmarker():
             # benchmark is 0 due to error
             self.timerExecution.abortTimerRun()
             self.timerTransfer.abortTimerRun()
+            if query.transaction is not None:
+                self.timerCommit.abortTimerRun()
             if query.withConnect:
                 # we do benchmark connection time, so we connect every run
                 self.timerConnect.abortTimerRun()
             # this means ignore benchmark for this query/connection due to error
             self.timerExecution.cancelTimer()
             self.timerTransfer.cancelTimer()
+            if query.transaction is not None:
+                self.timerCommit.cancelTimer()
             if query.withConnect:
                 # we do benchmark connection time, so we connect every run
                 self.timerConnect.cancelTimer()
@@ -1507,6 +2077,8 @@ class benchmarker():
         finally:
             self.timerExecution.finishTimer()
             self.timerTransfer.finishTimer()
+            if query.transaction is not None:
+                self.timerCommit.finishTimer()
             if query.withConnect and not (singleConnection and len(self.activeConnections)):
                 # we do benchmark connection time, so we connect every run
                 #self.disconnectDBMS(c)
@@ -1521,7 +2093,7 @@ class benchmarker():
     def generateAllParameters(self, overwrite=False):
         for numQuery in range(1, len(self.queries)+1):
             q = self.queries[numQuery-1]
-            query = tools.query(q)
+            query = tools.query.fromDict(q)
             self.logger.debug("generateAllParameters query={}, parameter={}, protocol={}".format(numQuery, query.parameter, self.protocol['query'][str(numQuery)]['parameter']))
             if len(query.parameter) > 0 and (overwrite or len(self.protocol['query'][str(numQuery)]['parameter']) == 0):
                 self.init_random_seed(numQuery)
@@ -1540,7 +2112,7 @@ class benchmarker():
             self.protocol['query'][str(numQuery)]['start'] = str(datetime.datetime.now())
         self.start_query = timer()
         q = self.queries[numQuery-1]
-        query = tools.query(q)
+        query = tools.query.fromDict(q)
         if len(query.parameter) > 0 and len(self.protocol['query'][str(numQuery)]['parameter']) == 0:
             self.logger.debug("generateParameters query={}, parameter={}, protocol={}".format(numQuery, query.parameter, self.protocol['query'][str(numQuery)]))
             self.init_random_seed(numQuery)
@@ -1566,27 +2138,45 @@ class benchmarker():
         # add to protocol
         self.protocol['query'][str(numQuery)]['duration'] += 1000.0*duration_query
         self.protocol['query'][str(numQuery)]['end'] = str(datetime.datetime.now())
-    def runBenchmarksQuery(self):
+    def generateOrdering(self):
         """
-        Performs querywise benchmark runs.
-        Stores results and generates reports immediately after completion of a query (all connections, all runs).
-
-        :return: returns nothing
+        Generates the ordering of queries of the current stream.
+        Default is the order of the query file.
+        If durations of a previous experiment are given, queries are scheduled longest-processing-time first.
+        If shuffling is requested, the ordering is taken from stream_ordering of the query file.
+        stream_ordering is either a dict of stream -> list of queries, or 'balanced' for a Williams design (balanced latin square).
+        Otherwise the queries are shuffled randomly.
+
+        :return: List of numbers of queries
         """
         global BENCHMARKER_VERBOSE_NONE
-        # generate ordering
         ordered_list_of_queries = list(range(1, len(self.queries)+1))
+        if self.schedule_durations is not None:
+            # several streams share the queries, a single stream runs all of them
+            numStreams = int(self.connectionmanagement['numStreams']) if self.stream_id is not None and int(self.stream_id) > 0 else 1
+            stream = int(self.stream_id) if numStreams > 1 else 1
+            ordered_list_of_queries = tools.scheduleLongestFirst(ordered_list_of_queries, self.schedule_durations, numStreams, stream)
+            if not BENCHMARKER_VERBOSE_NONE:
+                print("Longest processing time first:", ordered_list_of_queries)
+            return ordered_list_of_queries
         if self.stream_shuffle is not None and int(self.stream_shuffle) > 0:
             if not BENCHMARKER_VERBOSE_NONE:
                 print("User wants shuffling")
-            if 'stream_ordering' in self.queryconfig and len(self.queryconfig['stream_ordering']) > 0 and self.stream_id is not None and int(self.stream_id) > 0:
+            stream_ordering = self.queryconfig.get('stream_ordering', {})
+            if stream_ordering == 'balanced' and self.stream_id is not None and int(self.stream_id) > 0:
+                if not BENCHMARKER_VERBOSE_NONE:
+                    print("We use balanced ordering on stream {}".format(int(self.stream_id)))
+                ordered_list_of_queries = tools.balancedOrdering(len(self.queries), int(self.stream_id))
+                if not BENCHMARKER_VERBOSE_NONE:
+                    print("Ordering:", ordered_list_of_queries)
+            elif isinstance(stream_ordering, dict) and len(stream_ordering) > 0 and self.stream_id is not None and int(self.stream_id) > 0:
                 if not BENCHMARKER_VERBOSE_NONE:
                     print("Query file provides shuffling")
                     print("We are on stream {}".format(int(self.stream_id)))
-                num_total_streams = len(self.queryconfig['stream_ordering'])
+                num_total_streams = len(stream_ordering)
                 # stream ids start at 1 and are limited by the number of streams in the ordering list
                 num_current_stream = (int(self.stream_id)-1)%num_total_streams+1
-                ordered_list_of_queries = self.queryconfig['stream_ordering'][num_current_stream]
+                ordered_list_of_queries = stream_ordering[num_current_stream]
                 if not BENCHMARKER_VERBOSE_NONE:
                     print("Ordering:", ordered_list_of_queries)
             else:
@@ -1597,6 +2187,17 @@ class benchmarker():
                 random.shuffle(ordered_list_of_queries)
                 if not BENCHMARKER_VERBOSE_NONE:
                     print("Ordering:", ordered_list_of_queries)
+        return ordered_list_of_queries
+    def runBenchmarksQuery(self):
+        """
+        Performs querywise benchmark runs.
+        Stores results and generates reports immediately after completion of a query (all connections, all runs).
+
+        :return: returns nothing
+        """
+        global BENCHMARKER_VERBOSE_NONE
+        # generate ordering
+        ordered_list_of_queries = self.generateOrdering()
         self.store_ordering(ordered_list_of_queries)
         # a dict of connections, each carrying a list of connections to the dbms
         connectionpool = dict()
@@ -1645,12 +2246,12 @@ class benchmarker():
                 # if benchmark has been done: store and generate reports
                 if bBenchmarkDoneForThisQuery:
                     # store results
-                    self.reporterStore.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect])
+                    self.reporterStore.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
                     if not self.bBatch:
                         # generate reports
                         for r in self.reporter:
                             r.init()
-                            r.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect])
+                            r.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
         if len(connectionpool):
             # close all connections in pool
             for connectionname in connectionpool.keys():
@@ -1665,28 +2266,7 @@ class benchmarker():
         """
         global BENCHMARKER_VERBOSE_NONE
         # generate ordering
-        ordered_list_of_queries = list(range(1, len(self.queries)+1))
-        if self.stream_shuffle is not None and int(self.stream_shuffle) > 0:
-            if not BENCHMARKER_VERBOSE_NONE:
-                print("User wants shuffling")
-            if 'stream_ordering' in self.queryconfig and len(self.queryconfig['stream_ordering']) > 0 and self.stream_id is not None and int(self.stream_id) > 0:
-                if not BENCHMARKER_VERBOSE_NONE:
-                    print("Query file provides shuffling")
-                    print("We are on stream {}".format(int(self.stream_id)))
-                num_total_streams = len(self.queryconfig['stream_ordering'])
-                # stream ids start at 1 and are limited by the number of streams in the ordering list
-                num_current_stream = (int(self.stream_id)-1)%num_total_streams+1
-                ordered_list_of_queries = self.queryconfig['stream_ordering'][num_current_stream]
-                if not BENCHMARKER_VERBOSE_NONE:
-                    print("Ordering:", ordered_list_of_queries)
-            else:
-                if not BENCHMARKER_VERBOSE_NONE:
-                    print("We shuffle randomly")
-                #ordered_list_of_queries = list(ordered_list_of_queries)
-                self.init_random_seed(self.stream_id)
-                random.shuffle(ordered_list_of_queries)
-                if not BENCHMARKER_VERBOSE_NONE:
-                    print("Ordering:", ordered_list_of_queries)
+        ordered_list_of_queries = self.generateOrdering()
         self.store_ordering(ordered_list_of_queries)
         # work per connection
         for connectionname in sorted(self.dbms.keys()):
@@ -1717,12 +2297,12 @@ class benchmarker():
                 # if benchmark has been done: store and generate reports
                 if bBenchmarkDone:
                     # store results
-                    self.reporterStore.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect])
+                    self.reporterStore.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
                     if not self.bBatch:
                         # generate reports
                         for r in self.reporter:
                             r.init()
-                            r.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect])
+                            r.generate(numQuery, [self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
             # close global connection
             if singleConnection:
                 if not BENCHMARKER_VERBOSE_NONE:
@@ -1743,10 +2323,14 @@ class benchmarker():
         self.logger.debug("### Time start: "+str(self.time_start))
         if not 'total' in self.protocol:
             self.protocol['total'] = {}
+        timestamp_start = time.time()
         for connectionname in sorted(self.dbms.keys()):
             if not connectionname in self.protocol['total']:
                 self.protocol['total'][connectionname] = {}
             self.protocol['total'][connectionname]['time_start'] = self.time_start
+            # precise timestamps for throughput metrics
+            self.protocol['total'][connectionname]['timestamp_start'] = timestamp_start
+            self.protocol['total'][connectionname]['stream_id'] = self.stream_id
         # clean evaluation dict
         evaluator.evaluator.evaluation = {}
         if self.working == 'query':
@@ -1758,8 +2342,10 @@ class benchmarker():
         time_now_int = int(datetime.datetime.timestamp(datetime.datetime.strptime(time_now,'%Y-%m-%d %H:%M:%S.%f')))
         self.time_end = time_now_int
         self.logger.debug("### Time end: "+str(self.time_end))
+        timestamp_end = time.time()
         for connectionname in sorted(self.dbms.keys()):
             self.protocol['total'][connectionname]['time_end'] = self.time_end
+            self.protocol['total'][connectionname]['timestamp_end'] = timestamp_end
         if self.fixedConnection is None:
             if self.stream_id is None:
                 print("DBMSBenchmarker duration: {} [s]".format(self.time_end-self.time_start))
@@ -1793,8 +2379,8 @@ class benchmarker():
         self.logger.debug("Read from "+self.path)
         self.reporterStore.readProtocol(silent)
         for numQuery,q in enumerate(self.queries):
-            query = tools.query(q)
-            loaded = self.reporterStore.load(query, numQuery+1, [self.timerExecution, self.timerTransfer, self.timerConnect])
+            query = tools.query.fromDict(q)
+            loaded = self.reporterStore.load(query, numQuery+1, [self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
             if not loaded:
                 break
         # show finished benchmarks
@@ -1829,7 +2415,7 @@ class benchmarker():
         self.timerRun.stackable = False
         for q,t in enumerate(self.timerExecution.times):
             #print("Q"+str(q+1))
-            query = tools.query(self.queries[q])
+            query = tools.query.fromDict(self.queries[q])
             #print(query.timer['sum']['active'])
             self.timerRun.times.append({})
             self.timerRun.stats.append({})
@@ -1844,12 +2430,14 @@ class benchmarker():
                     l = list(map(addition_no_null, l, self.timerTransfer.times[q][c]))
                 if c in self.timerConnect.times[q]:
                     l = list(map(addition_no_null, l, self.timerConnect.times[q][c]))
+                if q < len(self.timerCommit.times) and c in self.timerCommit.times[q]:
+                    l = list(map(addition_no_null, l, self.timerCommit.times[q][c]))
                 #l = list(map(add, list(map(add, self.timerExecution.times[q][c], self.timerTransfer.times[q][c])), self.timerConnect.times[q][c]))
                 #print(l)
                 self.timerRun.times[q][c] = l
                 self.timerRun.stats[q][c] = self.timerRun.getStats(l[query.numRunBegin:query.numRunEnd])
         #self.timers = [self.timerRun] + self.timers#, self.timerExecution, self.timerTransfer, self.timerConnect]
-        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect]
+        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit]
     def computeTimerSession(self):
         """
         Adds a timer for total time per run.
@@ -1861,7 +2449,7 @@ class benchmarker():
         self.timerSession.perRun = False
         for q,t in enumerate(self.timerExecution.times):
             #print("Q"+str(q+1))
-            query = tools.query(self.queries[q])
+            query = tools.query.fromDict(self.queries[q])
             self.timerSession.times.append({})
             self.timerSession.stats.append({})
             #if query.warmup > 0:
@@ -1877,6 +2465,8 @@ class benchmarker():
                     l = list(map(addition_no_null, l, self.timerTransfer.times[q][c]))
                 if c in self.timerConnect.times[q]:
                     l = list(map(addition_no_null, l, self.timerConnect.times[q][c]))
+                if q < len(self.timerCommit.times) and c in self.timerCommit.times[q]:
+                    l = list(map(addition_no_null, l, self.timerCommit.times[q][c]))
                 #print(l)
                 connectionmanagement = self.getConnectionManager(q+1, c)
                 batchsize = connectionmanagement['runsPerConnection']#self.runsPerConnection
@@ -1893,7 +2483,7 @@ class benchmarker():
                 self.timerSession.times[q][c] = l_agg
                 self.timerSession.stats[q][c] = self.timerSession.getStats(l_agg)
         #self.timers = [self.timerSession] + self.timers#, self.timerExecution, self.timerTransfer, self.timerConnect]
-        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect]
+        self.timers = [self.timerSession, self.timerRun, self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit]
     def generateReportsAll(self):
         """
         Generates all reports.
@@ -1908,7 +2498,7 @@ class benchmarker():
         for r in self.reporter:
             if not BENCHMARKER_VERBOSE_NONE:
                 print("Report "+type(r).__name__)
-            r.generateAll(self.timers)#[self.timerExecution, self.timerTransfer, self.timerConnect])
+            r.generateAll(self.timers)#[self.timerExecution, self.timerTransfer, self.timerConnect, self.timerCommit])
     def continueBenchmarks(self, overwrite=False, recreate_parameter=None):
         """
         Reads data of previous benchmark from folder.
@@ -1934,10 +2524,8 @@ class benchmarker():
             print("No result found")
     def getResultSetDF(self, query, connection):
         filename=self.path+"/query_"+str(query)+"_resultset_"+connection+".pickle"
-        if os.path.isfile(filename):
-            f = open(filename, "rb")
-            result = pickle.load(f)
-            f.close()
+        result = store.experimentstore.readFile(filename)
+        if result is not None:
             return result
         else:
             print("No result found")
@@ -1954,9 +2542,7 @@ class benchmarker():
         return df_t
     def getStatistics(self, query):
         filename=self.path+"/query_"+str(query)+"_execution_statistics.pickle"
-        f = open(filename, "rb")
-        result = pickle.load(f)
-        f.close()
+        result = store.experimentstore.readFile(filename)
         return result
     def listQueriesSuccess(self):
         # find position of execution timer
@@ -2002,21 +2588,21 @@ class benchmarker():
             return self.protocol['query'][str(query)]['explain'][connection]
     def printErrors(self):
         for numQuery in range(1, len(self.queries)+1):
-            queryObject = tools.query(self.queries[numQuery-1])
+            queryObject = tools.query.fromDict(self.queries[numQuery-1])
             if not queryObject.active:
                 continue
             print("Q"+str(numQuery))
             print(self.getError(numQuery))
     def printWarnings(self):
         for numQuery in range(1, len(self.queries)+1):
-            queryObject = tools.query(self.queries[numQuery-1])
+            queryObject = tools.query.fromDict(self.queries[numQuery-1])
             if not queryObject.active:
                 continue
             print("Q"+str(numQuery))
             print(self.getWarning(numQuery))
     def printDataStorageSizes(self):
         for numQuery in range(1, len(self.queries)+1):
-            queryObject = tools.query(self.queries[numQuery-1])
+            queryObject = tools.query.fromDict(self.queries[numQuery-1])
             if not queryObject.active:
                 continue
             print("Q"+str(numQuery))
@@ -2042,7 +2628,7 @@ class benchmarker():
     def readResultSetDict(self, query):
         return self.protocol['query'][str(query)]['resultSets']
     def getQueryObject(self, query):
-        return tools.query(self.queries[query-1])
+        return tools.query.fromDict(self.queries[query-1])
     def runIsolatedQueryMultiple(self, connectionname, queryString, times=1):
         output = [self.runIsolatedQuery(connectionname, queryString) for i in range(times)]
         l_connect, l_execute, l_transfer, l_error, l_data, l_size = self.flattenResult(output)
@@ -2139,6 +2725,131 @@ class inspector(benchmarker):
 
 
 
+def waitStartBarrier(args, subfolder, logger):
+    """
+    Blocks until all streams have reached the start barrier.
+    Streams started by -pp share a multiprocessing barrier (args.barrier).
+    Separately launched streams (-sb) share a file barrier in the result folder.
+    The file barrier is scoped to a launch by the id of the start barrier (-sbid), by default the start time (-st), if given.
+
+    :param args: Parsed arguments of run_cli
+    :param subfolder: Subfolder of the stream, identifies the stream at a file barrier
+    :param logger: Logger
+    :return: returns nothing
+    """
+    barrier = getattr(args, 'barrier', None)
+    parties = getattr(args, 'start_barrier', None)
+    start = time.perf_counter()
+    if barrier is not None:
+        try:
+            barrier.wait(BENCHMARKER_START_BARRIER_TIMEOUT)
+        except Exception as e:
+            # BrokenBarrierError if a stream died before arriving
+            logger.warning("Start barrier broken, starting without: {}".format(e))
+            return
+    elif parties is not None and int(parties) > 1:
+        if args.result_folder is None:
+            logger.warning("Start barrier needs a result folder, starting without")
+            return
+        name = args.connection if args.connection is not None else 'all'
+        token = subfolder if subfolder else None
+        generation = getattr(args, 'start_barrier_id', None)
+        if generation is None:
+            generation = getattr(args, 'start_time', None)
+        b = tools.filebarrier(args.result_folder+'/barrier/'+name, parties, timeout=BENCHMARKER_START_BARRIER_TIMEOUT, generation=generation)
+        if b.wait(token) is None:
+            return
+    else:
+        return
+    logger.debug("Passed start barrier after {:.3f} seconds".format(time.perf_counter()-start))
+
+def runRefreshFunctions(connectiondata, refresh, names):
+    """
+    Runs refresh functions of a throughput test (like RF1 and RF2 of TPC-H) against a DBMS.
+    Each refresh function is a statement or a list of statements.
+
+    :param connectiondata: Dict of connection data as in connections.config
+    :param refresh: Dict of name of refresh function -> statements
+    :param names: List of names of refresh functions to run in this order
+    :return: List of dicts with name, time_start and time_end (timestamps) and error, if any
+    """
+    logger = logging.getLogger('dbmsbenchmarker')
+    log = []
+    connection = tools.dbms(connectiondata)
+    connection.connect()
+    try:
+        for name in names:
+            statements = refresh[name] if isinstance(refresh[name], list) else [refresh[name]]
+            entry = {'name': name, 'time_start': time.time()}
+            try:
+                connection.openCursor()
+                for statement in statements:
+                    connection.executeQuery(statement)
+                connection.closeCursor()
+            except Exception as e:
+                logger.error("Refresh function {} failed: {}".format(name, e))
+                entry['error'] = str(e)
+            entry['time_end'] = time.time()
+            log.append(entry)
+    finally:
+        connection.disconnect()
+    return log
+
+def runThroughputTest(command_args, numStreams, connectiondata, config, manager):
+    """
+    Runs a throughput test of a connection in the style of TPC-H.
+    Power test: refresh function RF1, a single stream 0 in fixed order, refresh function RF2.
+    Throughput test: numStreams concurrent streams, each ordered by stream_ordering of the query file (or shuffled),
+    together with a refresh stream running the pair RF1, RF2 numStreams times.
+    Query streams run as independent processes writing to subfolders <connection>-<stream>.
+    The power stream runs each query once and writes to power/<connection>-0, so it is not merged with the streams of the throughput test.
+
+    :param command_args: Dict of arguments of run_cli for the streams
+    :param numStreams: Number of streams of the throughput test
+    :param connectiondata: Dict of connection data as in connections.config
+    :param config: Dict throughput_test of the query file
+    :param manager: multiprocessing.Manager providing the start barrier
+    :return: Dict of timestamps of phases and refresh functions, for protocol['throughput_test']
+    """
+    logger = logging.getLogger('dbmsbenchmarker')
+    refresh = config.get('refresh', {})
+    pair = [name for name in ['RF1', 'RF2'] if name in refresh]
+    test = {'scale_factor': config.get('scale_factor', 1), 'streams': numStreams, 'power': {'refresh': []}, 'throughput': {'refresh': []}}
+    # power test
+    test['power']['time_start'] = time.time()
+    if 'RF1' in refresh:
+        test['power']['refresh'].extend(runRefreshFunctions(connectiondata, refresh, ['RF1']))
+    stream_args = dict(command_args, stream_id=0, stream_shuffle=None, numStreams=1, barrier=None, num_run=1, result_folder=command_args['result_folder']+'/power')
+    with mp.Pool(processes=1) as pool:
+        pool.starmap(run_cli, [(stream_args,)])
+    # durations of the queries of the power stream in seconds
+    power_connection = command_args['connection']+'-0'
+    try:
+        protocol = tools.loadProtocol(stream_args['result_folder']+'/'+power_connection)
+        test['power']['queries'] = {q: d['durations'][power_connection]/1000.0 for q, d in protocol['query'].items() if 'durations' in d and d['durations'].get(power_connection, 0) > 0}
+    except Exception as e:
+        logger.error("Could not read protocol of power test of {}: {}".format(command_args['connection'], e))
+        test['power']['queries'] = {}
+    if 'RF2' in refresh:
+        test['power']['refresh'].extend(runRefreshFunctions(connectiondata, refresh, ['RF2']))
+    test['power']['time_end'] = time.time()
+    # throughput test, the refresh stream is a party of the start barrier
+    barrier = manager.Barrier(numStreams+1)
+    pool_args = [(dict(command_args, stream_id=i+1, stream_shuffle=1, numStreams=numStreams, barrier=barrier),) for i in range(numStreams)]
+    with mp.Pool(processes=numStreams) as pool:
+        multiple_results = pool.starmap_async(run_cli, pool_args)
+        try:
+            barrier.wait(BENCHMARKER_START_BARRIER_TIMEOUT)
+        except Exception as e:
+            logger.warning("Start barrier broken, starting without: {}".format(e))
+        test['throughput']['time_start'] = time.time()
+        if len(pair) > 0:
+            for i in range(numStreams):
+                test['throughput']['refresh'].extend(runRefreshFunctions(connectiondata, refresh, pair))
+        multiple_results.get()
+    test['throughput']['time_end'] = time.time()
+    return test
+
 def run_cli(parameter):
     # argparse
     """
@@ -2179,7 +2890,7 @@ def run_cli(parameter):
     #parser.add_argument('-pt', '--timeout', help='Parameter: Timeout in seconds', default=0)
     args = parser.parse_args()
     """
-    global BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_STATISTICS, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN
+    global BENCHMARKER_VERBOSE_QUERIES, BENCHMARKER_VERBOSE_STATISTICS, BENCHMARKER_VERBOSE_RESULTS, BENCHMARKER_VERBOSE_PROCESS, BENCHMARKER_VERBOSE_NONE, BENCHMARKER_VERBOSE_EXPLAIN, BENCHMARKER_STORE_EXPLAIN, BENCHMARKER_TRACE, BENCHMARKER_RUN_LOG, BENCHMARKER_OVERHEAD, BENCHMARKER_CHECKPOINT, BENCHMARKER_STORAGE
     #print(parameter)
     args = SimpleNamespace(**parameter)
     #print(args)
@@ -2210,10 +2921,27 @@ def run_cli(parameter):
         BENCHMARKER_VERBOSE_EXPLAIN = True
     if args.store_explain:
         BENCHMARKER_STORE_EXPLAIN = True
+    if getattr(args, 'run_log', False):
+        BENCHMARKER_RUN_LOG = True
+    if getattr(args, 'measure_overhead', False):
+        BENCHMARKER_OVERHEAD = True
+    if getattr(args, 'checkpoint', False):
+        BENCHMARKER_CHECKPOINT = True
+    BENCHMARKER_STORAGE = getattr(args, 'storage', 'files')
+    trace = getattr(args, 'trace', None)
+    if trace is not None:
+        BENCHMARKER_TRACE = trace
     subfolder = None
     rename_connection = ''
     rename_alias = ''
-    if args.mode != 'read' and args.parallel_processes and args.numProcesses is not None:
+    if getattr(args, 'agent', None) is not None:
+        # run streams on behalf of a coordinator
+        numStreams = distributed.agent(args.agent).run(run_cli)
+        if not args.verbose_none:
+            print("Agent has run {} streams".format(numStreams))
+        return None
+    coordinator_address = getattr(args, 'coordinator', None)
+    if args.mode != 'read' and (args.parallel_processes or coordinator_address is not None) and args.numProcesses is not None:
         numProcesses = int(args.numProcesses)
         if not args.verbose_none:
             print("Start {} independent processes".format(numProcesses))
@@ -2240,6 +2968,34 @@ def run_cli(parameter):
             if not args.verbose_none:
                 print(connections)
             #exit()
+        if coordinator_address is not None:
+            # streams are distributed to agents on several hosts
+            numAgents = int(getattr(args, 'num_agents', 1))
+            coordinator = distributed.coordinator(coordinator_address, numAgents)
+            if not args.verbose_none:
+                print("Waiting for {} agents at {}".format(numAgents, coordinator_address))
+            coordinator.waitForAgents()
+            with open(result_folder+"/"+code+'/connections.config', "r") as f:
+                connections_config = f.read()
+            with open(result_folder+"/"+code+'/queries.config', "r") as f:
+                queries_config = f.read()
+            command_args['coordinator'] = None
+            manager = None
+        else:
+            coordinator = None
+            # streams of a connection start synchronized by a barrier, not by sleeping until a wall clock time
+            manager = mp.Manager()
+        throughput_test = getattr(args, 'throughput_test', False)
+        throughput_tests = {}
+        if throughput_test:
+            if coordinator is not None:
+                print("Throughput test is only available for local streams (-pp), running streams without power test")
+                throughput_test = False
+            else:
+                with open(result_folder+"/"+code+'/connections.config', "r") as f:
+                    connections_data = {c['name']: c for c in ast.literal_eval(f.read())}
+                with open(result_folder+"/"+code+'/queries.config', "r") as f:
+                    throughput_config = ast.literal_eval(f.read()).get('throughput_test', {})
         for connection in connections:
             # only neccessary after merge
             #copyfile(args.config_folder+'/connections.config', result_folder+'/connections.config')#args.connection_file)
@@ -2255,12 +3011,15 @@ def run_cli(parameter):
             #if 'generate_evaluation' in command_args:
             #    del command_args['generate_evaluation']
             command_args['generate_evaluation'] = 'no'
-            # Get the current UTC time
-            current_time = datetime.datetime.utcnow()
-            # Add 5 seconds to the current time
-            seconds = 5 if 5 > numProcesses else numProcesses
-            start_time = current_time + datetime.timedelta(seconds=seconds)
-            command_args['start_time'] = start_time.strftime('%Y-%m-%d %H:%M:%S')
+            if coordinator is not None:
+                numResults = coordinator.runStreams(command_args, numProcesses, result_folder+"/"+code, connections_config, queries_config)
+                if not args.verbose_none:
+                    print("Received results of {} streams for {}".format(numResults, connection))
+                continue
+            if throughput_test:
+                throughput_tests[connection] = runThroughputTest(command_args, numProcesses, connections_data[connection], throughput_config, manager)
+                continue
+            command_args['barrier'] = manager.Barrier(numProcesses)
             #command_args['stream_id'] = 1
             pool_args = []#(dict(command_args),)]*numProcesses
             for i in range(numProcesses):
@@ -2289,7 +3048,25 @@ def run_cli(parameter):
             #for stdout, stderr in multiple_results:
             #    print("STDOUT:", stdout)
             #    print("STDERR:", stderr)
+        if coordinator is not None:
+            coordinator.close()
+        else:
+            manager.shutdown()
         tools.merge_partial_results(result_folder+"/", code)
+        if len(throughput_tests) > 0:
+            # phases of throughput tests are known to the parent process only
+            protocol = tools.loadProtocol(result_folder+"/"+code)
+            protocol['throughput_test'] = throughput_tests
+            with open(result_folder+"/"+code+'/protocol.json', 'w') as f:
+                json.dump(protocol, f)
+        if trace is not None:
+            # export trace of all streams
+            filename = tracer.tracer.exportResultfolder(result_folder+"/"+code, trace)
+            if not args.verbose_none:
+                print("Trace written to {}".format(filename))
+        if getattr(args, 'storage', 'files') == 'sqlite':
+            # consolidate merged results into a single file
+            store.experimentstore.convert(result_folder+"/"+code, remove=True)
         if args.generate_evaluation == 'yes':
             #evaluator.evaluation = {}
             #command_args['mode'] = 'read'
@@ -2359,19 +3136,15 @@ def run_cli(parameter):
                     if args.max_subfolders is not None and client > int(args.max_subfolders):
                         exit()
                     resultpath = args.result_folder+'/'+subfolder+'-'+str(client)
-                    if not args.verbose_none:
-                        print("Checking if {} is suitable folder for free job number".format(resultpath))
-                    if path.isdir(resultpath):
-                        client = client + 1
-                        waiting = random.randint(1, 10)
-                        if not args.verbose_none:
-                            print("Sleeping {} seconds before checking for next free job number".format(waiting))
-                        time.sleep(waiting)
-                    else:
-                        if not args.verbose_none:
-                            print("{} is a suitable folder for free job number".format(resultpath))
+                    try:
+                        # creating the folder is atomic, so it claims the job number
                         makedirs(resultpath)
-                        break
+                    except FileExistsError:
+                        client = client + 1
+                        continue
+                    if not args.verbose_none:
+                        print("{} is a suitable folder for free job number".format(resultpath))
+                    break
                 subfolder = subfolder+'-'+str(client)
                 rename_connection = args.connection+'-'+str(client)
                 if not args.verbose_none:
@@ -2386,11 +3159,11 @@ def run_cli(parameter):
                 try:
                     start = datetime.datetime.strptime(args.start_time, '%Y-%m-%d %H:%M:%S')
                     if start > now:
-                        wait = (start-now).seconds
+                        wait = (start-now).total_seconds()
                         now_string = now.strftime('%Y-%m-%d %H:%M:%S')
                         if not args.verbose_none:
-                            print("Sleeping until {} before going to work ({} seconds, it is {} now)".format(args.start_time, wait, now_string))
-                        time.sleep(int(wait))
+                            print("Sleeping until {} before going to work ({:.3f} seconds, it is {} now)".format(args.start_time, wait, now_string))
+                        time.sleep(wait)
                 except Exception as e:
                     print("Invalid format: {}".format(args.start_time))
         # handle parallel streams
@@ -2452,12 +3225,18 @@ def run_cli(parameter):
         if args.fix_schema:
             experiments.fixed_schema = args.fix_schema
             print("Replace schema by {}".format(experiments.fixed_schema))
+        # schedule queries by durations of a previous experiment?
+        if getattr(args, 'longest_first', None) is not None:
+            experiments.schedule_durations = tools.loadDurations(args.longest_first, args.connection)
         # why?
         #if args.result_folder is not None:
         #    config_folder = args.result_folder
         #else:
         #    config_folder = args.config_folder
         experiments.getConfig(args.config_folder, args.connection_file, args.query_file)
+        if args.mode != 'read':
+            # wait for all streams, after the slow parts of startup
+            waitStartBarrier(args, subfolder, logger)
         # switch for args.mode
         if args.mode == 'read':
             experiments.readBenchmarks()
@@ -2483,6 +3262,11 @@ def run_cli(parameter):
                 experiments.continueBenchmarks(overwrite = False)
             else:
                 print("Continue needs result folder")
+        if trace is not None:
+            # export trace of run events (also possible for reading stored protocols)
+            filename = tracer.tracer(experiments.protocol, experiments.code).export(experiments.path, trace)
+            if not BENCHMARKER_VERBOSE_NONE:
+                print("Trace written to {}".format(filename))
         if args.metrics:
             # collect hardware metrics
             experiments.reporter.append(reporter.metricer(experiments))
@@ -2499,13 +3283,18 @@ def run_cli(parameter):
             # building it here too would just repeat the same generate()/load() cycle with
             # nothing in between consuming the first result.
             run_evaluation(experiments, True, skip_component_metrics=skip_component_metrics)
+        if getattr(args, 'storage', 'files') == 'sqlite' and experiments.resultfolder_subfolder is None:
+            # consolidate results into a single file, partial results of streams are merged first
+            numFiles = store.experimentstore.convert(experiments.path, remove=True)
+            if not BENCHMARKER_VERBOSE_NONE:
+                print("Moved {} files into {}".format(numFiles, store.experimentstore.filename))
         return experiments
 
 def run_evaluation(experiments, show_query_statistics=False, skip_component_metrics=False):
         # generate evaluation cube
         experiments.overwrite = True
         # show some evaluations
-        evaluator.evaluator(experiments, load=False, force=True, skip_component_metrics=skip_component_metrics)
+        evaluation = evaluator.evaluator(experiments, load=False, force=True, skip_component_metrics=skip_component_metrics).get_evaluation()
         result_folder = experiments.path #args.result_folder if not args.result_folder is None else "./"
         #num_processes = min(float(args.numProcesses if not args.numProcesses is None else 1), float(args.num_run) if int(args.num_run) > 0 else 1)
         evaluate = dbmsbenchmarker.inspector.inspector(result_folder)
@@ -2707,8 +3496,8 @@ def run_evaluation(experiments, show_query_statistics=False, skip_component_metr
                     #print(q, experiments.protocol['query'][q]['starts'], experiments.protocol['query'][q]['ends'])
                     times = experiments.protocol['query'][q]
                     if "ends" in times and c['name'] in times["ends"]:
-                        time_start = int(datetime.datetime.timestamp(datetime.datetime.strptime(times["starts"][c['name']],'%Y-%m-%d %H:%M:%S.%f')))
-                        time_end = int(datetime.datetime.timestamp(datetime.datetime.strptime(times["ends"][c['name']],'%Y-%m-%d %H:%M:%S.%f')))
+                        time_start = datetime.datetime.timestamp(datetime.datetime.strptime(times["starts"][c['name']],'%Y-%m-%d %H:%M:%S.%f'))
+                        time_end = datetime.datetime.timestamp(datetime.datetime.strptime(times["ends"][c['name']],'%Y-%m-%d %H:%M:%S.%f'))
                         times_start[orig_name].append(time_start)
                         times_end[orig_name].append(time_end)
                         #times_start[time_start] = i
@@ -2733,7 +3522,7 @@ def run_evaluation(experiments, show_query_statistics=False, skip_component_metr
                 if len(times_start[c]) > 0:
                     time_start = min(times_start[c])
                     time_end = max(times_end[c])
-                    time_span = time_end-time_start
+                    time_span = round(time_end-time_start, 3)
                     if time_span == 0:
                         # if it is very fast (by error?), we still need a positive number
                         time_span = 1
@@ -2749,6 +3538,21 @@ def run_evaluation(experiments, show_query_statistics=False, skip_component_metr
                 df.index.name = 'DBMS'
                 df = df.reindex(index=tools.natural_sort(df.index))
                 print(df)
+        if 'throughput_test' in evaluation['general']:
+            print("### Throughput Test")
+            throughput_test = {}
+            for c, test in evaluation['general']['throughput_test'].items():
+                throughput_test[c] = {
+                    'scale factor': test['scale_factor'],
+                    'streams': test['streams'],
+                    'power test [s]': test['power']['span_s'],
+                    'power': test['power'].get('metric'),
+                    'throughput test [s]': test['throughput'].get('span_s'),
+                    'throughput': test['throughput'].get('metric'),
+                    'composite': test.get('composite')}
+            df = pd.DataFrame.from_dict(throughput_test, orient='index')
+            df.index.name = 'DBMS'
+            print(df.round(2))
         print("Experiment {} has been finished".format(experiments.code))
         return evaluate
 
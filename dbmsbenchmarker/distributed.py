@@ -0,0 +1,340 @@
+"""
+    Distributed execution of parallel streams for the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import socket
+import threading
+import json
+import base64
+import tarfile
+import tempfile
+import shutil
+import io
+import os
+import logging
+import multiprocessing as mp
+
+
+def parseAddress(address):
+    """
+    Splits an address HOST:PORT.
+
+    :param address: String HOST:PORT
+    :return: Tuple (host, port)
+    """
+    host, port = address.rsplit(':', 1)
+    return (host, int(port))
+
+def send(sock, message):
+    """
+    Sends a message as a single line of JSON.
+
+    :param sock: Socket
+    :param message: Dict
+    :return: returns nothing
+    """
+    sock.sendall((json.dumps(message)+'\n').encode('utf-8'))
+
+def receive(stream):
+    """
+    Receives a message sent by send().
+
+    :param stream: File-like object of the socket
+    :return: Dict, None if the connection has been closed
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+def extractResult(data, folder):
+    """
+    Extracts a result subfolder received from an agent (tar, gzip) into the result folder.
+    Archives arrive over plain TCP, so members must be regular files or folders inside the result folder.
+
+    :param data: Bytes of the archive
+    :param folder: Result folder
+    :return: returns nothing
+    """
+    root = os.path.realpath(folder)
+    with tarfile.open(fileobj=io.BytesIO(data), mode='r:gz') as tar:
+        members = tar.getmembers()
+        for member in members:
+            target = os.path.realpath(os.path.join(root, member.name))
+            if not (member.isfile() or member.isdir()) or os.path.isabs(member.name) or os.path.commonpath([root, target]) != root:
+                raise ValueError("Unsafe member {} in result archive".format(member.name))
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(folder, members=members, filter='data')
+        else:
+            tar.extractall(folder, members=members)
+
+
+
+
+class barrier():
+    """
+    Start barrier of streams, that is held by the coordinator.
+    Objects are small and picklable, so they can be handed to the stream processes of an agent.
+    The interface matches multiprocessing.Barrier, so run_cli does not have to distinguish.
+    """
+    def __init__(self, address, name, timeout=600):
+        """
+        Construct a new 'barrier' object.
+
+        :param address: Tuple (host, port) of the coordinator
+        :param name: Name of the barrier, i.e. the connection the streams belong to
+        :param timeout: Default maximum number of seconds to wait, so a stream that died before arriving does not block the others forever
+        :return: returns nothing
+        """
+        self.address = tuple(address)
+        self.name = name
+        self.timeout = timeout
+    def wait(self, timeout=None):
+        """
+        Registers at the coordinator and blocks until all streams have arrived.
+
+        :param timeout: Maximum number of seconds to wait, default is the timeout of the barrier
+        :return: returns nothing
+        """
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            with socket.create_connection(self.address, timeout=timeout) as sock:
+                send(sock, {'type': 'arrive', 'name': self.name})
+                message = receive(sock.makefile('r', encoding='utf-8'))
+        except socket.timeout:
+            raise threading.BrokenBarrierError("Barrier {} timed out after {} seconds".format(self.name, timeout))
+        if message is None:
+            raise threading.BrokenBarrierError("Coordinator closed barrier {}".format(self.name))
+        if message['type'] != 'release':
+            raise threading.BrokenBarrierError("Coordinator refused barrier {}: {}".format(self.name, message.get('message', '')))
+
+
+
+
+class coordinator():
+    """
+    Coordinator of streams that run on several hosts.
+    Agents connect to the coordinator and keep a control connection open.
+    For each connection (DBMS) the coordinator
+    - assigns the streams (stream ids) round robin to the agents, together with arguments and config files
+    - holds the start barrier of the streams
+    - receives the result subfolders of the streams (tar, base64 encoded) into the result folder
+    Messages are single lines of JSON.
+    """
+    def __init__(self, address, numAgents):
+        """
+        Construct a new 'coordinator' object.
+        Starts listening, but does not wait for agents yet.
+
+        :param address: String HOST:PORT to listen on
+        :param numAgents: Number of agents to wait for
+        :return: returns nothing
+        """
+        self.logger = logging.getLogger('dbmsbenchmarker')
+        self.address = parseAddress(address)
+        self.numAgents = int(numAgents)
+        self.agents = []
+        self.barriers = {}
+        self.lock = threading.Lock()
+        self.agents_connected = threading.Condition(self.lock)
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.address)
+        self.server.listen(128)
+        self.thread = threading.Thread(target=self.accept, daemon=True)
+        self.thread.start()
+    def accept(self):
+        """
+        Accepts connections of agents and of streams arriving at a barrier.
+        Runs in a background thread.
+
+        :return: returns nothing
+        """
+        while True:
+            try:
+                sock, client = self.server.accept()
+            except OSError:
+                # server has been closed
+                return
+            threading.Thread(target=self.handle, args=(sock, client), daemon=True).start()
+    def handle(self, sock, client):
+        """
+        Handles the first message of a new connection.
+
+        :param sock: Socket of the connection
+        :param client: Address of the peer
+        :return: returns nothing
+        """
+        stream = sock.makefile('r', encoding='utf-8')
+        message = receive(stream)
+        if message is None:
+            sock.close()
+            return
+        with self.lock:
+            if message['type'] == 'hello':
+                self.logger.debug("Agent {} connected from {}".format(message['host'], client))
+                self.agents.append({'socket': sock, 'stream': stream, 'host': message['host']})
+                self.agents_connected.notify_all()
+            elif message['type'] == 'arrive':
+                name = message['name']
+                if not name in self.barriers:
+                    self.logger.error("Stream from {} arrived at unknown barrier {}".format(client, name))
+                    try:
+                        send(sock, {'type': 'error', 'message': 'Unknown barrier {}'.format(name)})
+                    except OSError:
+                        pass
+                    sock.close()
+                    return
+                waiting = self.barriers[name]['waiting']
+                waiting.append(sock)
+                if len(waiting) >= self.barriers[name]['parties']:
+                    # release all streams at once
+                    for s in waiting:
+                        try:
+                            send(s, {'type': 'release'})
+                        except OSError as e:
+                            self.logger.warning("Could not release stream: {}".format(e))
+                        s.close()
+                    self.barriers[name]['waiting'] = []
+    def waitForAgents(self, timeout=None):
+        """
+        Blocks until all agents have connected.
+
+        :param timeout: Maximum number of seconds to wait
+        :return: True if all agents are connected
+        """
+        with self.lock:
+            return self.agents_connected.wait_for(lambda: len(self.agents) >= self.numAgents, timeout)
+    def runStreams(self, command_args, numStreams, result_folder, connections_config, queries_config):
+        """
+        Runs streams of a connection at the agents and collects their results.
+
+        :param command_args: Dict of arguments of run_cli for the streams
+        :param numStreams: Number of streams in total
+        :param result_folder: Folder the result subfolders of the streams are stored in
+        :param connections_config: Content of connections.config
+        :param queries_config: Content of queries.config
+        :return: Number of received result subfolders
+        """
+        name = command_args['connection']
+        with self.lock:
+            self.barriers[name] = {'parties': numStreams, 'waiting': []}
+        streams = list(range(1, numStreams+1))
+        for i, agent in enumerate(self.agents):
+            send(agent['socket'], {
+                'type': 'assign',
+                'streams': streams[i::len(self.agents)],
+                'args': command_args,
+                'connections.config': connections_config,
+                'queries.config': queries_config,
+            })
+        numResults = 0
+        for agent in self.agents:
+            while True:
+                message = receive(agent['stream'])
+                if message is None:
+                    self.logger.error("Agent {} has disconnected".format(agent['host']))
+                    break
+                if message['type'] == 'result':
+                    try:
+                        extractResult(base64.b64decode(message['data']), result_folder)
+                    except (ValueError, tarfile.TarError) as e:
+                        self.logger.error("Discarded results {} of agent {}: {}".format(message['name'], agent['host'], e))
+                        continue
+                    numResults = numResults + 1
+                    self.logger.debug("Received results {} of agent {}".format(message['name'], agent['host']))
+                elif message['type'] == 'done':
+                    break
+        return numResults
+    def close(self):
+        """
+        Dismisses the agents and stops listening.
+
+        :return: returns nothing
+        """
+        for agent in self.agents:
+            try:
+                send(agent['socket'], {'type': 'bye'})
+                agent['socket'].close()
+            except OSError:
+                pass
+        self.server.close()
+
+
+
+
+class agent():
+    """
+    Agent running streams on behalf of a coordinator.
+    Streams run as local processes, results are written to a temporary folder and uploaded after all streams of the agent are finished.
+    """
+    def __init__(self, address):
+        """
+        Construct a new 'agent' object.
+
+        :param address: String HOST:PORT of the coordinator
+        :return: returns nothing
+        """
+        self.logger = logging.getLogger('dbmsbenchmarker')
+        self.address = parseAddress(address)
+    def run(self, run_cli):
+        """
+        Connects to the coordinator and runs assigned streams until dismissed.
+
+        :param run_cli: Function running a single stream, i.e. benchmarker.run_cli
+        :return: Number of streams that have been run
+        """
+        numStreams = 0
+        with socket.create_connection(self.address) as sock:
+            stream = sock.makefile('r', encoding='utf-8')
+            send(sock, {'type': 'hello', 'host': socket.gethostname()})
+            while True:
+                message = receive(stream)
+                if message is None or message['type'] == 'bye':
+                    break
+                if message['type'] != 'assign':
+                    continue
+                folder = tempfile.mkdtemp(prefix='dbmsbenchmarker_agent_')
+                try:
+                    for filename in ['connections.config', 'queries.config']:
+                        with open(folder+'/'+filename, 'w') as f:
+                            f.write(message[filename])
+                    command_args = message['args']
+                    command_args['config_folder'] = folder
+                    command_args['result_folder'] = folder
+                    command_args['barrier'] = barrier(self.address, command_args['connection'])
+                    pool_args = []
+                    for stream_id in message['streams']:
+                        command_args['stream_id'] = stream_id
+                        pool_args.append((dict(command_args),))
+                    self.logger.debug("Running streams {} of {}".format(message['streams'], command_args['connection']))
+                    if len(pool_args) > 0:
+                        with mp.Pool(processes=len(pool_args)) as pool:
+                            pool.starmap(run_cli, pool_args)
+                    numStreams = numStreams + len(pool_args)
+                    # upload result subfolders
+                    for name in sorted(os.listdir(folder)):
+                        if not os.path.isdir(folder+'/'+name):
+                            continue
+                        data = io.BytesIO()
+                        with tarfile.open(fileobj=data, mode='w:gz') as tar:
+                            tar.add(folder+'/'+name, arcname=name)
+                        send(sock, {'type': 'result', 'name': name, 'data': base64.b64encode(data.getvalue()).decode('ascii')})
+                finally:
+                    shutil.rmtree(folder, ignore_errors=True)
+                send(sock, {'type': 'done'})
+        return numStreams
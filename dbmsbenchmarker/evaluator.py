@@ -31,6 +31,7 @@ import sys
 import math
 import pprint
 import ast
+import re
 from scipy import stats
 import numpy as np
 
@@ -263,7 +264,7 @@ class evaluator():
         for i in range(1, len(self.benchmarker.queries)+1):
             evaluation['query'][i] = {}
             evaluation['query'][i]['config'] = self.benchmarker.queries[i-1]
-            queryObject = tools.query(self.benchmarker.queries[i-1])
+            queryObject = tools.query.fromDict(self.benchmarker.queries[i-1])
             evaluation['query'][i]['title'] = queryObject.title
             evaluation['query'][i]['active'] = queryObject.active
             evaluation['query'][i]['dbms'] = {}
@@ -297,7 +298,7 @@ class evaluator():
             numQuery = i
             if self.benchmarker.timerExecution.checkForSuccessfulBenchmarks(numQuery):
                 #evaluation['queryNumber']=numQuery
-                query = tools.query(self.benchmarker.queries[numQuery-1])
+                query = tools.query.fromDict(self.benchmarker.queries[numQuery-1])
                 # format duration
                 evaluation['query'][numQuery]['duration'] = self.benchmarker.protocol['query'][str(numQuery)]['duration']
                 for c, d in self.benchmarker.protocol['query'][str(numQuery)]['durations'].items():
@@ -420,6 +421,35 @@ class evaluator():
                     tps[c][m] = math.pow(tps[c][m], 1.0 / num[c][m])
                     evaluation['dbms'][c]['metrics'][m] = tps[c][m]
             #print(evaluation['dbms'][c]['metrics'])
+        # harness overhead: time the benchmarker (client) spent on its own work per phase
+        harness_total = tools.overhead()
+        harness_dbms = {}
+        for i, q in evaluation['query'].items():
+            protocol_query = self.benchmarker.protocol['query'][str(i)]
+            if not 'overhead' in protocol_query:
+                continue
+            for c, o in protocol_query['overhead'].items():
+                if not c in q['dbms']:
+                    continue
+                q['dbms'][c]['harness_overhead'] = {'phases': tools.overhead.summarize(o['phases'])}
+                if len(o['runs_ns']) > 0:
+                    overhead_run_mean_ms = sum(o['runs_ns'])/len(o['runs_ns'])/1000000.0
+                    q['dbms'][c]['harness_overhead']['overhead_run_mean_ms'] = overhead_run_mean_ms
+                    if len(self.benchmarker.timerRun.stats) >= i and c in self.benchmarker.timerRun.stats[i-1] and self.benchmarker.timerRun.stats[i-1][c][1] > 0:
+                        q['dbms'][c]['harness_overhead']['share_of_run_percent'] = overhead_run_mean_ms/self.benchmarker.timerRun.stats[i-1][c][1]*100.0
+                if not c in harness_dbms:
+                    harness_dbms[c] = tools.overhead()
+                harness_dbms[c].merge(o['phases'])
+                harness_total.merge(o['phases'])
+        if 'overhead' in self.benchmarker.protocol:
+            harness_total.merge(self.benchmarker.protocol['overhead'])
+        if len(harness_total.phases) > 0:
+            evaluation['general']['harness_overhead'] = {
+                'phases': tools.overhead.summarize(harness_total.phases),
+                'total_wall_ms': harness_total.total()/1000000.0,
+                'dbms': {c: {'phases': tools.overhead.summarize(o.phases), 'total_wall_ms': o.total()/1000000.0} for c, o in harness_dbms.items()}}
+        if 'throughput_test' in self.benchmarker.protocol:
+            evaluation['general']['throughput_test'] = {c: throughputTestMetrics(self.benchmarker.protocol, c, test) for c, test in self.benchmarker.protocol['throughput_test'].items()}
         evaluation['general']['results'] = {}
         #del evaluation['dbms'][c]['metrics']
         #print(evaluation)
@@ -509,6 +539,48 @@ class evaluator():
             #else:
             #    print('  ' * indent + str(key) + ":" + str(value))
 
+def throughputTestMetrics(protocol, connectionname, test):
+    """
+    Computes composite metrics of a throughput test in the style of TPC-H from the timestamps in the protocol.
+    - power: 3600*SF / geometric mean of durations [s] of the queries of the power stream (a single run each) and of its refresh functions
+    - throughput: streams*queries*3600*SF / span [s] from start of the throughput test to the end of the last stream or refresh function
+    - composite: geometric mean of power and throughput
+
+    :param protocol: Merged protocol of the experiment
+    :param connectionname: Name of the connection, streams are <connectionname>-<stream>
+    :param test: Entry of protocol['throughput_test'] for this connection
+    :return: Dict of metrics, phases and streams
+    """
+    scale_factor = float(test['scale_factor'])
+    pattern = re.compile(re.escape(connectionname)+r'-(\d+)$')
+    streams = {int(pattern.match(c).group(1)): t for c, t in protocol['total'].items() if pattern.match(c) and 'timestamp_end' in t}
+    # the power stream is not part of the merged protocol, its durations are stored in the test
+    durations = list(test['power'].get('queries', {}).values())
+    num_queries = len(durations)
+    durations.extend([r['time_end']-r['time_start'] for r in test['power']['refresh'] if not 'error' in r])
+    result = {
+        'scale_factor': scale_factor,
+        'streams': test['streams'],
+        'queries': num_queries,
+        'power': {'time_start': test['power']['time_start'], 'time_end': test['power']['time_end'], 'refresh': test['power']['refresh']},
+        'throughput': {'time_start': test['throughput']['time_start'], 'refresh': test['throughput']['refresh']},
+        'stream': {s: {'time_start': t['timestamp_start'], 'time_end': t['timestamp_end'], 'span_s': t['timestamp_end']-t['timestamp_start']} for s, t in sorted(streams.items())},
+    }
+    result['power']['span_s'] = result['power']['time_end']-result['power']['time_start']
+    if len(durations) > 0 and min(durations) > 0:
+        result['power']['geometric_mean_s'] = math.exp(sum([math.log(d) for d in durations])/len(durations))
+        result['power']['metric'] = 3600.0*scale_factor/result['power']['geometric_mean_s']
+    # end of the last query stream or refresh function
+    ends = [t['timestamp_end'] for s, t in streams.items() if s > 0] + [r['time_end'] for r in test['throughput']['refresh']]
+    if len(ends) > 0:
+        result['throughput']['time_end'] = max(ends)
+        result['throughput']['span_s'] = result['throughput']['time_end']-result['throughput']['time_start']
+        if result['throughput']['span_s'] > 0:
+            result['throughput']['metric'] = test['streams']*num_queries*3600.0*scale_factor/result['throughput']['span_s']
+    if 'metric' in result['power'] and 'metric' in result['throughput']:
+        result['composite'] = math.sqrt(result['power']['metric']*result['throughput']['metric'])
+    return result
+
 def pretty(d, indent=0):
     for key, value in d.items():
         if isinstance(value, dict):
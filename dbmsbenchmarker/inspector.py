@@ -118,6 +118,9 @@ class inspector():
             filename_query = self.result_path+'/'+code+'/queries.config'
             filename_connections = self.result_path+'/'+code+'/connections.config'
             filename_protocol = self.result_path+'/'+code+'/protocol.json'
+            if not isfile(filename_protocol):
+                # protocol has not been written yet, but journal can be recovered
+                filename_protocol = self.result_path+'/'+code+'/protocol.journal'
             # skip incomplete result folders
             if isfile(filename_query) and isfile(filename_connections) and isfile(filename_protocol):
                 try:
@@ -508,8 +511,9 @@ class inspector():
         :return: List of monitoring metrics
         """
         filename = '/query_{component}_metric_{metric}.csv'.format(component=component, metric=metric)
-        if isfile(self.benchmarks.path+"/"+filename):
-            df = pd.read_csv(self.benchmarks.path+"/"+filename).T
+        df = monitor.metrics.loadMetricsDataframe(self.benchmarks.path+"/"+filename)
+        if df is not None:
+            df = df.T
             #print(df)
             df = df.reindex(index=natural_sort(df.index))
             return df.T
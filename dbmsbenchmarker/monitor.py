@@ -23,7 +23,7 @@ import matplotlib.pyplot as plt
 import csv
 import os.path
 import logging
-from dbmsbenchmarker import benchmarker, tools
+from dbmsbenchmarker import benchmarker, tools, store
 from numpy import nan
 # https://www.robustperception.io/productive-prometheus-python-parsing
 
@@ -219,7 +219,8 @@ class metrics():
             df = pd.read_csv(filename)
             return df
         else:
-            return None
+            # file might have been moved into consolidated store
+            return store.experimentstore.readFile(filename)
     def generatePlots(self):
         for q,d in self.benchmarker.protocol['query'].items():
             logging.debug("Hardware metrics for Q"+str(q))
@@ -367,7 +368,7 @@ class metrics():
             show_end_line = True
             show_first_connection_line = False
             # remove connection delay (metrics are collected, but nothing happens here)
-            queryObject = tools.query(self.benchmarker.queries[int(query)-1])
+            queryObject = tools.query.fromDict(self.benchmarker.queries[int(query)-1])
             if remove_delay:
                 df_all = df_all.iloc[int(queryObject.delay_connect):]
             # anonymize dbms
@@ -478,7 +479,7 @@ class metrics():
         if df_all is None:
             return pd.DataFrame()
         # remove connection delay (metrics are collected, but nothing happens here)
-        query = tools.query(self.benchmarker.queries[numQuery-1])
+        query = tools.query.fromDict(self.benchmarker.queries[numQuery-1])
         df_all = df_all.iloc[int(query.delay_connect):]
         #print(df_all)
         # remove extend
@@ -0,0 +1,225 @@
+"""
+    Simulated DBMS (null DBMS) for the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import math
+import time
+import zlib
+
+# DB-API (PEP 249) module attributes
+apilevel = '2.0'
+threadsafety = 1
+paramstyle = 'qmark'
+__version__ = '1.0'
+
+
+class Error(Exception):
+    pass
+
+class DatabaseError(Error):
+    pass
+
+class OperationalError(DatabaseError):
+    pass
+
+
+def connect(**config):
+    """
+    Connects to a simulated DBMS.
+    This does not send anything anywhere, statements are answered after a simulated latency.
+
+    :param config: Dict of settings, see connection
+    :return: Object of class connection
+    """
+    return connection(config)
+
+
+
+class latency():
+    """
+    Distribution of simulated latencies in ms.
+    The distribution is given as a dict
+    - {'distribution': 'fixed', 'value': 1.0}
+    - {'distribution': 'lognormal', 'median': 1.0, 'sigma': 0.5}
+    - {'distribution': 'bimodal', 'fast': 1.0, 'slow': 50.0, 'probability': 0.1, 'sigma': 0.0} (probability of slow, optional lognormal noise around both modes)
+    A number is a fixed latency.
+    """
+    def __init__(self, distribution, rng):
+        """
+        Construct a new 'latency' object.
+
+        :param distribution: Dict describing the distribution, number or None (no latency)
+        :param rng: Random generator (random.Random)
+        :return: returns nothing
+        """
+        if distribution is None:
+            distribution = {'distribution': 'fixed', 'value': 0}
+        elif not isinstance(distribution, dict):
+            distribution = {'distribution': 'fixed', 'value': float(distribution)}
+        self.distribution = distribution
+        self.type = distribution.get('distribution', 'fixed')
+        if not self.type in ['fixed', 'lognormal', 'bimodal']:
+            raise ValueError("Unknown latency distribution {}".format(self.type))
+        self.rng = rng
+    def noise(self, median, sigma):
+        if sigma > 0 and median > 0:
+            return self.rng.lognormvariate(math.log(median), sigma)
+        return median
+    def draw(self):
+        """
+        Draws a latency.
+
+        :return: Latency in ms
+        """
+        if self.type == 'fixed':
+            return float(self.distribution.get('value', 0))
+        if self.type == 'lognormal':
+            return self.noise(float(self.distribution.get('median', 1.0)), float(self.distribution.get('sigma', 0.5)))
+        # bimodal
+        if self.rng.random() < float(self.distribution.get('probability', 0.1)):
+            median = float(self.distribution.get('slow', 50.0))
+        else:
+            median = float(self.distribution.get('fast', 1.0))
+        return self.noise(median, float(self.distribution.get('sigma', 0.0)))
+    def wait(self):
+        """
+        Sleeps for a drawn latency.
+
+        :return: Latency in ms
+        """
+        duration = self.draw()
+        if duration > 0:
+            time.sleep(duration/1000.0)
+        return duration
+
+
+
+
+class connection():
+    """
+    Connection to a simulated DBMS.
+    Settings:
+    - connect, execute, fetch, commit: latency distributions (see latency), fetch is per 1000 rows
+    - rows, columns: shape of result sets of queries (SELECT, WITH, EXPLAIN, VALUES, SHOW)
+    - failure_rate: Probability of an execution to fail
+    - seed: Seed of the random generator, default is random
+    """
+    queries = ('SELECT', 'WITH', 'EXPLAIN', 'VALUES', 'SHOW')
+    def __init__(self, config):
+        """
+        Construct a new 'connection' object.
+
+        :param config: Dict of settings
+        :return: returns nothing
+        """
+        self.config = config
+        self.rng = random.Random(config.get('seed', None))
+        self.latency_execute = latency(config.get('execute', None), self.rng)
+        self.latency_fetch = latency(config.get('fetch', None), self.rng)
+        self.latency_commit = latency(config.get('commit', None), self.rng)
+        self.rows = int(config.get('rows', 1))
+        self.columns = int(config.get('columns', 1))
+        self.failure_rate = float(config.get('failure_rate', 0.0))
+        self.autocommit = True
+        self.closed = False
+        latency(config.get('connect', None), self.rng).wait()
+    def cursor(self):
+        if self.closed:
+            raise OperationalError("Connection is closed")
+        return cursor(self)
+    def commit(self):
+        self.latency_commit.wait()
+    def rollback(self):
+        self.latency_commit.wait()
+    def close(self):
+        self.closed = True
+
+
+
+
+class cursor():
+    """
+    Cursor of a simulated DBMS.
+    Result sets are generated deterministically from the statement, so they are equal for all connections and runs of the same statement.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1
+        self.result = []
+        self.position = 0
+    def execute(self, operation, parameters=None):
+        """
+        Simulates the execution of a statement.
+
+        :param operation: SQL statement
+        :param parameters: Optional values of bind variables
+        :return: returns nothing
+        """
+        connection = self.connection
+        if connection.closed:
+            raise OperationalError("Connection is closed")
+        connection.latency_execute.wait()
+        if connection.failure_rate > 0 and connection.rng.random() < connection.failure_rate:
+            raise DatabaseError("Simulated failure of statement")
+        self.position = 0
+        if operation.lstrip().upper().startswith(connection.queries):
+            base = zlib.crc32((operation+str(parameters)).encode('utf-8'))
+            self.description = [('C{}'.format(j+1), None, None, None, None, None, None) for j in range(connection.columns)]
+            self.result = [tuple((base+i*connection.columns+j) % 1000000 for j in range(connection.columns)) for i in range(connection.rows)]
+            self.rowcount = -1
+        else:
+            self.description = None
+            self.result = []
+            self.rowcount = 1
+    def executemany(self, operation, seq_of_parameters):
+        """
+        Simulates the execution of a statement for several sets of values, as a single round trip.
+
+        :param operation: SQL statement
+        :param seq_of_parameters: List of values of bind variables
+        :return: returns nothing
+        """
+        rows = list(seq_of_parameters)
+        self.execute(operation, rows[0] if len(rows) > 0 else None)
+        self.description = None
+        self.result = []
+        self.rowcount = len(rows)
+    def fetchmany(self, size=None):
+        """
+        Fetches rows of the result set, after a simulated latency per 1000 rows.
+
+        :param size: Number of rows, default is arraysize
+        :return: List of rows
+        """
+        if size is None:
+            size = self.arraysize
+        rows = self.result[self.position:self.position+size]
+        self.position += len(rows)
+        if len(rows) > 0:
+            duration = self.connection.latency_fetch.draw()*len(rows)/1000.0
+            if duration > 0:
+                time.sleep(duration/1000.0)
+        return rows
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if len(rows) > 0 else None
+    def fetchall(self):
+        return self.fetchmany(len(self.result)-self.position)
+    def close(self):
+        self.result = []
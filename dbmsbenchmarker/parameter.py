@@ -17,6 +17,8 @@
 """
 import random
 import time
+import math
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 import logging
@@ -57,6 +59,12 @@ defaultParameters = {}
 def generateParameters(parameters, number):
     logger = logging.getLogger('parameter')
     result = []
+    # distributions are generated for all runs at once
+    # the generator is seeded by the random module, so init_random_seed() makes them reproducible
+    vectorized = {k: v for k, v in parameters.items() if v['type'] in vectorizer.distributions}
+    if len(vectorized) > 0:
+        rng = np.random.default_rng(random.getrandbits(64))
+        values = {k: vectorizer(rng, v, number).values for k, v in vectorized.items()}
     for i in range(0, number):
         #print(k)
         result.append({})
@@ -64,7 +72,10 @@ def generateParameters(parameters, number):
             if not 'size' in v:
                 v['size'] = 1
             #print(i)
-            w = randomizer(v).value
+            if k in vectorized:
+                w = values[k][i]
+            else:
+                w = randomizer(v).value
             #print(w)
             if type(w) == list:
                 for j, value in enumerate(w):
@@ -86,8 +97,8 @@ class randomizer():
     def integer(self, parameter):
         l = parameter['range']
         size = parameter['size']
-        l2 = list(range(l[0],l[1]+1))
-        resultlist = random.sample(l2,size)
+        # sampling from a range does not materialize it and yields the same values as sampling from a list
+        resultlist = random.sample(range(l[0],l[1]+1),size)
         if size == 1:
             value = resultlist[0]
         else:
@@ -131,8 +142,7 @@ class randomizer():
     def hexcode(self, parameter):
         l = parameter['range']
         size = parameter['size']
-        l2 = list(range(l[0],l[1]+1))
-        resultlist = random.sample(l2,size)
+        resultlist = random.sample(range(l[0],l[1]+1),size)
         resultlist = [str(hex(i)).upper()[2:] for i in resultlist]
         if size == 1:
             value = resultlist[0]
@@ -145,3 +155,82 @@ class randomizer():
         k2 = random.randrange(len(d[k]))
         v = d[k][k2]
         return [k, v]
+
+
+
+
+class vectorizer():
+    """
+    Generates all values of a parameter for all runs by a single vectorized call of a numpy Generator.
+    Ranges are never materialized.
+    Distributions are given by the type of the parameter, the range is [low, high]:
+    - zipf: integers, low is the most frequent value, P(low+k-1) ~ 1/k^alpha (parameter 'alpha', default 1.2)
+    - normal: 'mean' (default center of range) and 'stddev' (default 1/6 of range), clipped to range
+    - exponential: low + exponential with 'scale' (default 1/5 of range), clipped to range
+    - hotspot: a fraction 'hot' (default 0.2) of the range at its start receives a share 'probability' (default 0.8) of the values
+    If both ends of the range are integers, values are integers.
+    'size' > 1 yields a list of values per run.
+    """
+    distributions = ['zipf', 'normal', 'exponential', 'hotspot']
+    # up to this number of values, zipf is drawn from its exact cumulative distribution
+    zipf_table_size = 1000000
+    def __init__(self, rng, parameter, number):
+        """
+        Construct a new 'vectorizer' object.
+
+        :param rng: numpy Generator
+        :param parameter: Dict of the parameter (type, range and options)
+        :param number: Number of runs
+        :return: returns nothing
+        """
+        self.rng = rng
+        low, high = parameter['range'][0], parameter['range'][1]
+        self.integral = isinstance(low, int) and isinstance(high, int)
+        size = parameter.get('size', 1)
+        shape = (number, size)
+        values = getattr(self, parameter['type'])(parameter, low, high, shape)
+        if self.integral:
+            values = np.clip(np.rint(values), low, high).astype(np.int64)
+        else:
+            values = np.clip(values, low, high)
+        # native python types
+        values = values.tolist()
+        self.values = [v[0] for v in values] if size == 1 else values
+    def zipf(self, parameter, low, high, shape):
+        alpha = float(parameter.get('alpha', 1.2))
+        n = int(high)-int(low)+1
+        if n <= self.zipf_table_size:
+            cdf = np.cumsum(1.0/np.power(np.arange(1, n+1, dtype=np.float64), alpha))
+            ranks = np.searchsorted(cdf, self.rng.random(shape)*cdf[-1], side='right')+1
+        else:
+            if alpha <= 1.0:
+                raise ValueError("zipf needs alpha > 1 for ranges of more than {} values".format(self.zipf_table_size))
+            # truncate by rejection
+            ranks = self.rng.zipf(alpha, shape)
+            outside = ranks > n
+            while outside.any():
+                ranks[outside] = self.rng.zipf(alpha, int(outside.sum()))
+                outside = ranks > n
+        return low + np.minimum(ranks, n) - 1
+    def normal(self, parameter, low, high, shape):
+        mean = parameter.get('mean', (low+high)/2.0)
+        stddev = parameter.get('stddev', (high-low)/6.0)
+        return self.rng.normal(mean, stddev, shape)
+    def exponential(self, parameter, low, high, shape):
+        scale = parameter.get('scale', (high-low)/5.0)
+        return low + self.rng.exponential(scale, shape)
+    def hotspot(self, parameter, low, high, shape):
+        hot = float(parameter.get('hot', 0.2))
+        probability = float(parameter.get('probability', 0.8))
+        if self.integral:
+            # hot values are low .. split-1
+            split = low + max(1, int(math.floor((high-low+1)*hot)))
+            values = np.where(self.rng.random(shape) < probability,
+                self.rng.integers(low, split, shape, endpoint=False),
+                self.rng.integers(min(split, high), high, shape, endpoint=True))
+        else:
+            split = low + (high-low)*hot
+            values = np.where(self.rng.random(shape) < probability,
+                self.rng.uniform(low, split, shape),
+                self.rng.uniform(split, high, shape))
+        return values
@@ -24,7 +24,7 @@ import matplotlib.pyplot as plt
 import os
 import csv
 import json
-from dbmsbenchmarker import tools, monitor, evaluator, benchmarker
+from dbmsbenchmarker import tools, monitor, evaluator, benchmarker, store
 #import datetime
 from datetime import datetime
 from tqdm import tqdm
@@ -103,9 +103,17 @@ class storer(reporter):
     Class for generating reports.
     This class saves a protocol in json and benchmarks as csv files.
     It also provides a load() method to restore previous benchmarks.
+    Updates of the protocol are appended to a journal (protocol.journal), which is compacted into protocol.json periodically.
     """
+    # number of journal entries before the journal is compacted into protocol.json
+    journal_compaction = 50
     def __init__(self, benchmarker):
         reporter.__init__(self, benchmarker)
+        self.journal_entries = 0
+        # measurements of all timers, bulk loaded from a consolidated store
+        self.store_timers = None
+        # connection index of binary timer files
+        self.timer_index = None
     def save(self, dataframe, filename):
         """
         Saves benchmark table of a query as csv file.
@@ -134,18 +142,31 @@ class storer(reporter):
         :param timer: Timer containing benchmark results
         :return: returns nothing
         """
-        self.writeProtocol()
+        self.writeJournal(numQuery)
         for t in timer:
             # are there benchmarks for this query?
             if not t.checkForSuccessfulBenchmarks(numQuery):
                 continue
             logging.debug("saveBenchmarkOfQuery {}, timer={} ".format(numQuery, t.name))
-            query = tools.query(self.benchmarker.queries[numQuery-1])
-            df = t.toDataFrame(numQuery)
-            # save as csv
-            self.save(
-                dataframe = df,
-                filename = self.benchmarker.path+'/query_'+str(numQuery)+'_'+t.name+'.csv')
+            query = tools.query.fromDict(self.benchmarker.queries[numQuery-1])
+            filename = self.benchmarker.path+'/query_'+str(numQuery)+'_'+t.name
+            if benchmarker.BENCHMARKER_STORAGE == 'npy':
+                # save as binary
+                tools.timer.saveArray(self.benchmarker.path, numQuery, t.name, t.times[numQuery-1])
+                if os.path.isfile(filename+'.csv'):
+                    os.remove(filename+'.csv')
+            else:
+                df = t.toDataFrame(numQuery)
+                # save as csv
+                self.save(
+                    dataframe = df,
+                    filename = filename+'.csv')
+                if os.path.isfile(filename+'.npy'):
+                    os.remove(filename+'.npy')
+        # checkpoints of finished benchmarks are not needed anymore
+        for connectionname in self.benchmarker.dbms.keys():
+            if self.benchmarker.timerExecution.checkForSuccessfulBenchmarks(numQuery, connectionname):
+                self.benchmarker.removeCheckpoint(numQuery, connectionname)
     def load(self, query, numQuery, timer):
         """
         Loads benchmark table of a given query from csv files per timer.
@@ -155,41 +176,93 @@ class storer(reporter):
         :param timer: Timer containing benchmark results
         :return: True if successful
         """
+        if self.store_timers is None and store.experimentstore.exists(self.benchmarker.path):
+            s = store.experimentstore(self.benchmarker.path)
+            self.store_timers = s.readTimers()
+            s.close()
+        if self.timer_index is None:
+            self.timer_index = tools.timer.loadIndex(self.benchmarker.path)
         for t in timer:
             # load execution benchmarks
             filename = self.benchmarker.path+'/query_'+str(numQuery)+'_'+t.name+'.csv'
-            if os.path.isfile(filename):
+            times = tools.timer.loadArrayAsDict(self.benchmarker.path, numQuery, t.name, self.timer_index)
+            if times is not None:
+                # binary
+                t.appendTimes(times, query)
+                logging.debug("Read binary timer {} of query {}".format(t.name, numQuery))
+            elif os.path.isfile(filename):
+                # files are newer than the store, e.g. when continuing
                 df = pd.read_csv(filename)
                 df_t = df.transpose()
                 d = df.to_dict(orient="list")
                 t.appendTimes(d, query)#.warmup)
                 logging.debug("Read "+filename)
+            elif self.store_timers is not None and t.name in self.store_timers.get(numQuery, {}):
+                t.appendTimes(self.store_timers[numQuery][t.name], query)
             else:
                 t.appendTimes({}, query)#.warmup)
                 # timer is missing
                 #logging.debug(filename + " not found")
                 #return False
         return True
+    def writeJournal(self, numQuery):
+        """
+        Appends protocol of a query to the journal of protocol updates as a single JSON line.
+        Top level entries other than the queries are small and appended completely.
+        The journal is compacted into protocol.json after journal_compaction entries.
+
+        :param numQuery: Number of query, that has been updated
+        :return: returns nothing
+        """
+        filename = self.benchmarker.path+'/protocol.journal'
+        harness = tools.overhead(benchmarker.BENCHMARKER_OVERHEAD)
+        token = harness.start()
+        entry = {k: v for k, v in self.benchmarker.protocol.items() if k != 'query'}
+        entry['query'] = {str(numQuery): self.benchmarker.protocol['query'][str(numQuery)]}
+        with open(filename, 'a') as f:
+            f.write(json.dumps(entry)+'\n')
+        harness.stop('protocol_journal', token)
+        if harness.active:
+            harness.merge(self.benchmarker.protocol.get('overhead', {}))
+            self.benchmarker.protocol['overhead'] = harness.phases
+        self.journal_entries += 1
+        if self.journal_entries >= self.journal_compaction:
+            self.writeProtocol()
     def writeProtocol(self):
         """
         Saves procol of benchmarker in JSON format.
+        This compacts the journal of protocol updates, i.e. the journal is removed afterwards.
 
         :return: returns nothing
         """
         filename = self.benchmarker.path+'/protocol.json'
-        with open(filename, 'w') as f:
+        harness = tools.overhead(benchmarker.BENCHMARKER_OVERHEAD)
+        token = harness.start()
+        # replace atomically, so there always is a complete protocol
+        with open(filename+'.tmp', 'w') as f:
             json.dump(self.benchmarker.protocol, f)
+        os.replace(filename+'.tmp', filename)
+        if os.path.isfile(self.benchmarker.path+'/protocol.journal'):
+            os.remove(self.benchmarker.path+'/protocol.journal')
+        self.journal_entries = 0
+        harness.stop('protocol_write', token)
+        if harness.active:
+            # overhead of writing shows up in the next protocol written
+            harness.merge(self.benchmarker.protocol.get('overhead', {}))
+            self.benchmarker.protocol['overhead'] = harness.phases
     def readProtocol(self, silent=False):
         """
         Loads procol of benchmarker in JSON format.
+        Replays the journal of protocol updates, if it has not been compacted.
 
         :param silent: No output of status
         :return: returns nothing
         """
+        # store might have changed
+        self.store_timers = None
+        self.timer_index = None
         try:
-            filename = self.benchmarker.path+'/protocol.json'
-            with open(filename, 'r') as f:
-                self.benchmarker.protocol = json.load(f)
+            self.benchmarker.protocol = tools.loadProtocol(self.benchmarker.path, self.benchmarker.protocol)
         except Exception as e:
             logging.debug("No protocol found")
         finally:
@@ -221,7 +294,7 @@ class printer(reporter):
         if not self.benchmarker.timerExecution.checkForSuccessfulBenchmarks(numQuery):
             return False
         # is query active?
-        query = tools.query(self.benchmarker.queries[numQuery-1])
+        query = tools.query.fromDict(self.benchmarker.queries[numQuery-1])
         if not query.active:
             return False
         # get data
@@ -300,7 +373,7 @@ class pickler(reporter):
             # are there benchmarks for this query?
             if not t.checkForSuccessfulBenchmarks(numQuery):
                 continue
-            query = tools.query(self.benchmarker.queries[numQuery-1])
+            query = tools.query.fromDict(self.benchmarker.queries[numQuery-1])
             # is timer active for this query?
             if not query.timer[t.name]['active']:
                 continue
@@ -380,7 +453,7 @@ class metricer(reporter):
             else:
                 range_runs = tqdm(self.benchmarker.protocol['query'].items())
             for numQuery, protocol in range_runs:
-                query = tools.query(self.benchmarker.queries[int(numQuery)-1])
+                query = tools.query.fromDict(self.benchmarker.queries[int(numQuery)-1])
                 if not query.active:
                     continue
                 self.generate(numQuery, [])
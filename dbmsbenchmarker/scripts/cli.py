@@ -26,8 +26,12 @@ import shutil
 from dbmsbenchmarker import *
 
 
-def run_benchmarker():
-    # argparse
+def get_parser():
+    """
+    Returns the parser of the command line arguments of the benchmarker.
+
+    :return: Object of class argparse.ArgumentParser
+    """
     parser = argparse.ArgumentParser(description='A benchmark tool for RDBMS. It connects to a given list of RDBMS via JDBC and runs a given list benchmark queries. Optionally some reports are generated.')
     parser.add_argument('mode', help='run benchmarks and save results, or just read benchmark results from folder, or continue with missing benchmarks only', choices=['run', 'read', 'continue'])
     parser.add_argument('-d', '--debug', help='dump debug informations', action='store_true')
@@ -61,6 +65,18 @@ def run_benchmarker():
     parser.add_argument('-vn', '--verbose-none', help='stay completely silent', action='store_true', default=False)
     parser.add_argument('-ve', '--verbose-explain', help='run and print configured EXPLAIN statements after each benchmark query', action='store_true', default=False)
     parser.add_argument('-se', '--store-explain', help='run configured EXPLAIN statements after the first run of each benchmark query and store the result in the protocol', action='store_true', default=False)
+    parser.add_argument('-rl', '--run-log', help='flush recorded events of every run as binary records to a log file per client process (folder runlog)', action='store_true', default=False)
+    parser.add_argument('-mo', '--measure-overhead', help='measure client side overhead of the benchmarker per phase (query strings, pickling, query objects, result conversion and sorting, protocol writes)', action='store_true', default=False)
+    parser.add_argument('-cp', '--checkpoint', help='checkpoint every finished batch of runs, so continue resumes the missing runs of an aborted query', action='store_true', default=False)
+    parser.add_argument('-sto', '--storage', help='storage of timers, statistics, metrics and result sets: many small files, timers as binary npy files or a single SQLite file experiment.sqlite (also converts an existing result folder)', default='files', choices=['files', 'npy', 'sqlite'])
+    parser.add_argument('-sb', '--start-barrier', help='wait until START_BARRIER streams sharing the result folder have finished startup, then start all of them at once (file barrier for separately launched processes, -pp uses a process barrier automatically)', default=None)
+    parser.add_argument('-sbid', '--start-barrier-id', help='id of the launch of streams at the start barrier, only streams of the same launch are counted (tokens of earlier or aborted launches are ignored), default is START_TIME', default=None)
+    parser.add_argument('-co', '--coordinator', help='run as coordinator listening on HOST:PORT, distributes the NUMPROCESSES streams of each connection to agents and merges their results', default=None)
+    parser.add_argument('-na', '--num-agents', help='number of agents the coordinator waits for', default=1)
+    parser.add_argument('-ag', '--agent', help='run as agent of the coordinator at HOST:PORT, runs the streams assigned by the coordinator', default=None)
+    parser.add_argument('-tt', '--throughput-test', help='with -pp run a power test (single stream and refresh functions) followed by a throughput test (NUMPROCESSES concurrent streams and a refresh stream) per connection and compute composite metrics', action='store_true', default=False)
+    parser.add_argument('-lpt', '--longest-first', help='result folder of a previous experiment, queries are run longest processing time first by their durations there (unknown durations in configured order at the end), parallel streams (-pp) share the queries instead of running all of them', default=None)
+    parser.add_argument('-tr', '--trace', help='record connect, execute, fetch and result processing events of every run and export them as Chrome trace events or OTLP/JSON spans', default=None, choices=[None, 'chrome', 'otlp'])
     parser.add_argument('-pn', '--num-run', help='Parameter: Number of executions per query', default=0)
     parser.add_argument('-m', '--metrics', help='collect hardware metrics per query', action='store_true', default=False)
     parser.add_argument('-mps', '--metrics-per-stream', help='collect hardware metrics per stream', action='store_true', default=False)
@@ -71,6 +87,12 @@ def run_benchmarker():
     parser.add_argument('-fixdb', '--fix-database', help='replace database template with fixed name', default='')
     parser.add_argument('-fixs', '--fix-schema', help='replace schema template with fixed name', default='')
     #parser.add_argument('-pt', '--timeout', help='Parameter: Timeout in seconds', default=0)
+    return parser
+
+
+def run_benchmarker():
+    # argparse
+    parser = get_parser()
     #logger = logging.getLogger('dbmsbenchmarker')
     args = parser.parse_args()
     command_args = vars(args)
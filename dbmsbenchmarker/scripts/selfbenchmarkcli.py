@@ -0,0 +1,55 @@
+"""
+    Command line interface of the self benchmark of the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as
+    published by the Free Software Foundation, either version 3 of the
+    License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import argparse
+import json
+
+from dbmsbenchmarker import selfbenchmark
+
+
+def run_selfbenchmark():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description='Self benchmark of dbmsbenchmarker. Runs a synthetic workload against simulated DBMS, measures the benchmarker and the evaluation of results and writes a JSON report.')
+    parser.add_argument('-q', '--num-queries', help='number of queries of the synthetic result folder', default=10, type=int)
+    parser.add_argument('-c', '--num-connections', help='number of connections of the synthetic result folder', default=2, type=int)
+    parser.add_argument('-n', '--num-run', help='number of runs per query of the synthetic result folder', default=10, type=int)
+    parser.add_argument('-s', '--num-streams', help='number of parallel streams per connection of the synthetic result folder', default=2, type=int)
+    parser.add_argument('-nc', '--num-clients', help='number of parallel clients of the singleRun benchmark', default=1, type=int)
+    parser.add_argument('-nr', '--num-run-client', help='number of runs per client of the singleRun benchmark', default=1000, type=int)
+    parser.add_argument('-rows', '--rows', help='number of rows of result sets', default=10, type=int)
+    parser.add_argument('-cols', '--columns', help='number of columns of result sets', default=5, type=int)
+    parser.add_argument('-l', '--latency', help='fixed latency of executions in ms', default=0.0, type=float)
+    parser.add_argument('-rep', '--repetitions', help='number of calls per evaluation step', default=3, type=int)
+    parser.add_argument('-r', '--result-folder', help='keep the synthetic result folder in RESULT_FOLDER, default is a temporary folder that is removed', default=None)
+    parser.add_argument('-o', '--output', help='name of JSON file of the report', default='selfbenchmark.json')
+    args = parser.parse_args()
+    report = selfbenchmark.run(
+        numQueries=args.num_queries,
+        numConnections=args.num_connections,
+        numRuns=args.num_run,
+        numStreams=args.num_streams,
+        numClients=args.num_clients,
+        numRunsClient=args.num_run_client,
+        rows=args.rows,
+        columns=args.columns,
+        latency=args.latency,
+        repetitions=args.repetitions,
+        result_folder=args.result_folder,
+        report_file=args.output)
+    print(json.dumps(report, indent=2))
+    print("Report written to {}".format(args.output))
@@ -0,0 +1,276 @@
+"""
+    Self benchmark of the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import json
+import time
+import shutil
+import tempfile
+import platform
+import statistics
+import tracemalloc
+import logging
+import multiprocessing as mp
+from timeit import default_timer
+
+from dbmsbenchmarker import benchmarker, tools, evaluator, inspector
+from dbmsbenchmarker.__version__ import __version__
+
+
+def nullConnection(name, rows=10, columns=5, latency=0.0, seed=None):
+    """
+    Returns the connection data of a simulated DBMS, see nulldbms.
+
+    :param name: Name of the connection
+    :param rows: Number of rows of result sets
+    :param columns: Number of columns of result sets
+    :param latency: Fixed latency of executions in ms
+    :param seed: Seed of the random generator
+    :return: Dict of connection data
+    """
+    return {
+        'name': name,
+        'active': True,
+        'NULL': {
+            'execute': latency,
+            'rows': rows,
+            'columns': columns,
+            'seed': seed,
+        },
+    }
+
+def nullQuery(numQuery, numRuns):
+    """
+    Returns a query of the self benchmark.
+    Result sets are fetched and compared, so all steps of a run are covered.
+
+    :param numQuery: Number of query, 1...
+    :param numRuns: Number of runs
+    :return: Dict of query
+    """
+    return {
+        'title': "Synthetic query {}".format(numQuery),
+        'query': "SELECT {} AS q".format(numQuery),
+        'active': True,
+        'numRun': numRuns,
+        'timer': {
+            'datatransfer': {
+                'active': True,
+                'compare': 'result',
+            },
+            'connection': {
+                'active': True,
+            },
+        },
+    }
+
+def writeConfig(config_folder, numQueries, numConnections, numRuns, rows=10, columns=5, latency=0.0):
+    """
+    Writes connections.config and queries.config of a synthetic workload against simulated DBMS.
+
+    :param config_folder: Folder the config files are written to
+    :param numQueries: Number of queries
+    :param numConnections: Number of connections
+    :param numRuns: Number of runs per query
+    :param rows: Number of rows of result sets
+    :param columns: Number of columns of result sets
+    :param latency: Fixed latency of executions in ms
+    :return: returns nothing
+    """
+    os.makedirs(config_folder, exist_ok=True)
+    connections = [nullConnection('Null-{}'.format(i+1), rows, columns, latency, seed=i) for i in range(numConnections)]
+    queries = {
+        'name': 'Self benchmark',
+        'intro': 'Synthetic workload of {} queries x {} connections x {} runs'.format(numQueries, numConnections, numRuns),
+        'queries': [nullQuery(i+1, numRuns) for i in range(numQueries)],
+    }
+    with open(config_folder+'/connections.config', 'w') as f:
+        f.write(str(connections))
+    with open(config_folder+'/queries.config', 'w') as f:
+        f.write(str(queries))
+
+def measure(function, repetitions=1):
+    """
+    Measures the wall clock time of calls of a function.
+
+    :param function: Function without arguments
+    :param repetitions: Number of calls
+    :return: Dict of durations in seconds (list, median, min)
+    """
+    seconds = []
+    for i in range(repetitions):
+        start = default_timer()
+        function()
+        end = default_timer()
+        seconds.append(end - start)
+    return {'seconds': seconds, 'median': statistics.median(seconds), 'min': min(seconds)}
+
+def runClient(connectiondata, queryConfig, numRuns):
+    """
+    Runs a query against a simulated DBMS on the path of benchmarker.singleRun() in a single client.
+
+    :param connectiondata: Dict of connection data
+    :param queryConfig: Dict of query
+    :param numRuns: Number of runs
+    :return: List of number of runs, number of errors and duration in seconds
+    """
+    inputConfig = [benchmarker.singleRunInput(i, queryConfig['query'], queryConfig) for i in range(numRuns)]
+    start = default_timer()
+    results = benchmarker.singleRun(connectiondata, inputConfig, list(range(numRuns)), connectiondata['name'], 1, None, [], BENCHMARKER_VERBOSE_PROCESS=False, BENCHMARKER_VERBOSE_NONE=True)
+    end = default_timer()
+    errors = len([r for r in results if len(r.error) > 0])
+    return [numRuns, errors, end - start]
+
+def measureSingleRun(numRuns, numClients=1, rows=10, columns=5, latency=0.0):
+    """
+    Measures runs per second of benchmarker.singleRun() against a simulated DBMS.
+    Each client is a process of its own, all clients run at the same time.
+
+    :param numRuns: Number of runs per client
+    :param numClients: Number of clients
+    :param rows: Number of rows of result sets
+    :param columns: Number of columns of result sets
+    :param latency: Fixed latency of executions in ms
+    :return: Dict of results
+    """
+    pool_args = [(nullConnection('Null-{}'.format(i+1), rows, columns, latency, seed=i), nullQuery(1, numRuns), numRuns) for i in range(numClients)]
+    with mp.Pool(processes=numClients) as pool:
+        results = pool.starmap(runClient, pool_args)
+    runs_per_second = [runs/seconds if seconds > 0 else 0.0 for runs, errors, seconds in results]
+    return {
+        'clients': numClients,
+        'runs': numRuns,
+        'errors': sum([errors for runs, errors, seconds in results]),
+        'seconds': [seconds for runs, errors, seconds in results],
+        'runs_per_second': runs_per_second,
+        'runs_per_second_mean': statistics.mean(runs_per_second),
+        'runs_per_second_total': sum(runs_per_second),
+    }
+
+def generateResultFolder(result_folder, config_folder, numStreams):
+    """
+    Generates a result folder by running the workload of the config folder as parallel streams (-pp) per connection.
+    The folder contains the subfolders of the streams and their merged results.
+
+    :param result_folder: Folder the experiment is stored in
+    :param config_folder: Folder containing connections.config and queries.config
+    :param numStreams: Number of parallel streams per connection
+    :return: Code of the experiment
+    """
+    # the parser is imported here, as the command line scripts import the complete package
+    from dbmsbenchmarker.scripts import cli
+    os.makedirs(result_folder, exist_ok=True)
+    experiments_before = set(os.listdir(result_folder))
+    args = cli.get_parser().parse_args(['run', '-f', config_folder, '-r', result_folder, '-pp', '-p', str(numStreams), '-vn'])
+    benchmarker.run_cli(vars(args))
+    experiments = sorted([f for f in os.listdir(result_folder) if f.isdigit() and not f in experiments_before])
+    if len(experiments) == 0:
+        raise RuntimeError("No experiment has been generated in {}".format(result_folder))
+    return experiments[-1]
+
+def measureResultFolder(result_folder, code, repetitions=3):
+    """
+    Measures evaluation steps of a result folder generated by generateResultFolder():
+    - tools.merge_partial_results()
+    - evaluator.generate() (after reading the results by benchmarker.readBenchmarks())
+    - inspector.load_experiment(), time and peak memory (tracemalloc) of a separate call
+    - inspector.get_aggregated_experiment_statistics()
+
+    :param result_folder: Folder the experiment is stored in
+    :param code: Code of the experiment
+    :param repetitions: Number of calls per step
+    :return: Dict of results
+    """
+    report = {}
+    report['merge_partial_results'] = measure(lambda: tools.merge_partial_results(result_folder+"/", code), repetitions)
+    experiments = benchmarker.benchmarker(result_path=result_folder, code=code)
+    experiments.getConfig()
+    report['readBenchmarks'] = measure(experiments.readBenchmarks, 1)
+    experiments.overwrite = True
+    # first generation also stores the evaluation, that is loaded by the inspector
+    evaluate = evaluator.evaluator(experiments, load=False, force=True, silent=True, skip_component_metrics=True)
+    report['evaluator.generate'] = measure(evaluate.generate, repetitions)
+    evaluate = inspector.inspector(result_folder)
+    report['inspector.load_experiment'] = measure(lambda: evaluate.load_experiment(code), repetitions)
+    # memory is measured separately, as tracing slows down allocations
+    tracemalloc.start()
+    inspector.inspector(result_folder).load_experiment(code)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report['inspector.load_experiment']['memory_current_mb'] = current/1024.0/1024.0
+    report['inspector.load_experiment']['memory_peak_mb'] = peak/1024.0/1024.0
+    report['get_aggregated_experiment_statistics'] = measure(lambda: evaluate.get_aggregated_experiment_statistics(type='timer', name='run', query_aggregate='Mean', total_aggregate='Geo'), repetitions)
+    return report
+
+def run(numQueries=10, numConnections=2, numRuns=10, numStreams=2, numClients=1, numRunsClient=1000, rows=10, columns=5, latency=0.0, repetitions=3, result_folder=None, report_file=None):
+    """
+    Runs the self benchmark and writes a machine-readable report.
+    The scale of the synthetic result folder is queries x connections x runs x streams.
+
+    :param numQueries: Number of queries
+    :param numConnections: Number of connections
+    :param numRuns: Number of runs per query
+    :param numStreams: Number of parallel streams per connection
+    :param numClients: Number of clients of the singleRun benchmark
+    :param numRunsClient: Number of runs per client of the singleRun benchmark
+    :param rows: Number of rows of result sets
+    :param columns: Number of columns of result sets
+    :param latency: Fixed latency of executions in ms
+    :param repetitions: Number of calls per evaluation step
+    :param result_folder: Folder the experiment is kept in, default is a temporary folder that is removed afterwards
+    :param report_file: Name of JSON file the report is written to, None for no file
+    :return: Dict of report
+    """
+    logger = logging.getLogger('dbmsbenchmarker')
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scale': {
+            'queries': numQueries,
+            'connections': numConnections,
+            'runs': numRuns,
+            'streams': numStreams,
+            'rows': rows,
+            'columns': columns,
+            'latency_ms': latency,
+        },
+    }
+    logger.debug("Self benchmark of singleRun")
+    report['singleRun'] = measureSingleRun(numRunsClient, numClients, rows, columns, latency)
+    temporary = result_folder is None
+    if temporary:
+        result_folder = tempfile.mkdtemp(prefix='dbmsbenchmarker_selfbenchmark_')
+    config_folder = tempfile.mkdtemp(prefix='dbmsbenchmarker_selfbenchmark_config_')
+    try:
+        writeConfig(config_folder, numQueries, numConnections, numRuns, rows, columns, latency)
+        logger.debug("Self benchmark generates result folder in {}".format(result_folder))
+        start = default_timer()
+        code = generateResultFolder(result_folder, config_folder, numStreams)
+        end = default_timer()
+        report['run_cli'] = {'seconds': end - start, 'code': code}
+        report.update(measureResultFolder(result_folder, code, repetitions))
+    finally:
+        shutil.rmtree(config_folder, ignore_errors=True)
+        if temporary:
+            shutil.rmtree(result_folder, ignore_errors=True)
+    if report_file is not None:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
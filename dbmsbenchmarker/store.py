@@ -0,0 +1,247 @@
+"""
+    Consolidated storage of the results of an experiment for the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sqlite3
+import pickle
+import logging
+import math
+import re
+import io
+import os
+import pandas as pd
+from dbmsbenchmarker import tools
+
+
+class experimentstore():
+    """
+    Class for storing the results of an experiment in a single SQLite file (experiment.sqlite) in the result folder.
+    This replaces the many small files of a result folder:
+    - timers: query_<n>_<timer>.csv or .npy, one row per query, connection, timer and run
+    - statistics: query_<n>_<timer>_statistics.pickle, pickled DataFrame per query and timer
+    - metrics: query_<...>_metric_<...>.csv, CSV text per name of file
+    - results: query_<n>_resultset[_complete]_<connection>.pickle, pickled data per query and connection
+    Tables have indexes on (query, connection, timer) resp. the corresponding keys.
+    The protocol and the config files are not part of the store.
+    """
+    filename = 'experiment.sqlite'
+    pattern_timer = re.compile(r'^query_(\d+)_([a-z]+)\.csv$')
+    pattern_timer_binary = re.compile(r'^query_(\d+)_([a-z]+)\.npy$')
+    pattern_statistics = re.compile(r'^query_(\d+)_([a-z]+)_statistics\.pickle$')
+    pattern_metric = re.compile(r'^query_.+_metric_.+\.csv$')
+    pattern_result = re.compile(r'^query_(\d+)_resultset_(complete_)?(.+)\.pickle$')
+    def __init__(self, path):
+        """
+        Construct a new 'experimentstore' object.
+        Opens (and if necessary creates) the store in the result folder.
+
+        :param path: Result folder
+        :return: returns nothing
+        """
+        self.path = path
+        self.logger = logging.getLogger('dbmsbenchmarker')
+        self.connection = sqlite3.connect(path+'/'+self.filename)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS timers (query INTEGER, connection TEXT, timer TEXT, run INTEGER, value REAL);
+            CREATE INDEX IF NOT EXISTS idx_timers ON timers (query, connection, timer);
+            CREATE TABLE IF NOT EXISTS statistics (query INTEGER, timer TEXT, data BLOB);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_statistics ON statistics (query, timer);
+            CREATE TABLE IF NOT EXISTS metrics (name TEXT, data TEXT);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_metrics ON metrics (name);
+            CREATE TABLE IF NOT EXISTS results (query INTEGER, connection TEXT, complete INTEGER, data BLOB);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_results ON results (query, connection, complete);
+            """)
+    def close(self):
+        """
+        Commits and closes the store.
+
+        :return: returns nothing
+        """
+        self.connection.commit()
+        self.connection.close()
+    @staticmethod
+    def exists(path):
+        """
+        Checks if a result folder contains a store.
+
+        :param path: Result folder
+        :return: True if there is a store
+        """
+        return path is not None and os.path.isfile(path+'/'+experimentstore.filename)
+    def writeTimer(self, numQuery, timer, times):
+        """
+        Stores measurements of a timer for a query, replacing previous measurements.
+
+        :param numQuery: Number of query
+        :param timer: Name of timer
+        :param times: Dict of connection -> list of measurements per run
+        :return: returns nothing
+        """
+        self.connection.execute("DELETE FROM timers WHERE query=? AND timer=?", (int(numQuery), timer))
+        self.connection.executemany("INSERT INTO timers VALUES (?, ?, ?, ?, ?)", [(int(numQuery), connection, timer, numRun, value) for connection, values in times.items() for numRun, value in enumerate(values)])
+    def readTimers(self):
+        """
+        Bulk loads measurements of all timers by a single scan.
+
+        :return: Dict of query -> timer -> connection -> list of measurements per run
+        """
+        timers = {}
+        for numQuery, connection, timer, value in self.connection.execute("SELECT query, connection, timer, value FROM timers ORDER BY query, timer, connection, run"):
+            # SQLite stores NaN as NULL
+            timers.setdefault(numQuery, {}).setdefault(timer, {}).setdefault(connection, []).append(value if value is not None else math.nan)
+        return timers
+    def writeStatistics(self, numQuery, timer, dataframe):
+        """
+        Stores statistics of a timer for a query.
+
+        :param numQuery: Number of query
+        :param timer: Name of timer
+        :param dataframe: DataFrame of statistics
+        :return: returns nothing
+        """
+        self.connection.execute("INSERT OR REPLACE INTO statistics VALUES (?, ?, ?)", (int(numQuery), timer, pickle.dumps(dataframe)))
+    def readStatistics(self, numQuery, timer):
+        """
+        Loads statistics of a timer for a query.
+
+        :param numQuery: Number of query
+        :param timer: Name of timer
+        :return: DataFrame of statistics, None if not stored
+        """
+        row = self.connection.execute("SELECT data FROM statistics WHERE query=? AND timer=?", (int(numQuery), timer)).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+    def writeMetric(self, name, csv):
+        """
+        Stores a metrics table.
+
+        :param name: Name of the metrics file, for example query_1_metric_total_cpu_util.csv
+        :param csv: Content in CSV format
+        :return: returns nothing
+        """
+        self.connection.execute("INSERT OR REPLACE INTO metrics VALUES (?, ?)", (name, csv))
+    def readMetric(self, name):
+        """
+        Loads a metrics table.
+
+        :param name: Name of the metrics file
+        :return: DataFrame, None if not stored
+        """
+        row = self.connection.execute("SELECT data FROM metrics WHERE name=?", (name,)).fetchone()
+        return pd.read_csv(io.StringIO(row[0])) if row is not None else None
+    def writeResult(self, numQuery, connection, data, complete=False):
+        """
+        Stores a (pickled) result set.
+
+        :param numQuery: Number of query
+        :param connection: Name of connection
+        :param data: Pickled result set
+        :param complete: True for the result sets of all runs, False for the first run
+        :return: returns nothing
+        """
+        self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (int(numQuery), connection, int(complete), data))
+    def readResult(self, numQuery, connection, complete=False):
+        """
+        Loads a result set.
+
+        :param numQuery: Number of query
+        :param connection: Name of connection
+        :param complete: True for the result sets of all runs, False for the first run
+        :return: Result set, None if not stored
+        """
+        row = self.connection.execute("SELECT data FROM results WHERE query=? AND connection=? AND complete=?", (int(numQuery), connection, int(complete))).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+    @staticmethod
+    def readFile(filename):
+        """
+        Loads content of a file of a result folder, that might have been moved into the store.
+        Statistics and result sets are unpickled, metrics are returned as DataFrame.
+
+        :param filename: Name of file including result folder
+        :return: Content, None if neither the file nor an entry in the store exists
+        """
+        path, name = os.path.split(filename)
+        if os.path.isfile(filename):
+            if name.endswith('.pickle'):
+                with open(filename, 'rb') as f:
+                    return pickle.load(f)
+            return pd.read_csv(filename)
+        if not experimentstore.exists(path):
+            return None
+        store = experimentstore(path)
+        try:
+            match = experimentstore.pattern_statistics.match(name)
+            if match:
+                return store.readStatistics(match.group(1), match.group(2))
+            match = experimentstore.pattern_result.match(name)
+            if match:
+                return store.readResult(match.group(1), match.group(3), complete=match.group(2) is not None)
+            if experimentstore.pattern_metric.match(name):
+                return store.readMetric(name)
+            return None
+        finally:
+            store.close()
+    @staticmethod
+    def convert(path, remove=False):
+        """
+        Converts the files of an existing result folder into the store.
+        Entries of files converted before are replaced.
+
+        :param path: Result folder
+        :param remove: Remove converted files
+        :return: Number of converted files
+        """
+        store = experimentstore(path)
+        converted = []
+        try:
+            for name in sorted(os.listdir(path)):
+                filename = path+'/'+name
+                if not os.path.isfile(filename):
+                    continue
+                match = experimentstore.pattern_timer.match(name)
+                if match:
+                    times = pd.read_csv(filename).to_dict(orient="list")
+                    store.writeTimer(match.group(1), match.group(2), times)
+                    converted.append(filename)
+                    continue
+                match = experimentstore.pattern_timer_binary.match(name)
+                if match:
+                    store.writeTimer(match.group(1), match.group(2), tools.timer.loadArrayAsDict(path, match.group(1), match.group(2)))
+                    converted.append(filename)
+                    continue
+                match = experimentstore.pattern_statistics.match(name)
+                if match:
+                    with open(filename, 'rb') as f:
+                        store.writeStatistics(match.group(1), match.group(2), pickle.load(f))
+                    converted.append(filename)
+                    continue
+                match = experimentstore.pattern_result.match(name)
+                if match:
+                    with open(filename, 'rb') as f:
+                        store.writeResult(match.group(1), match.group(3), f.read(), complete=match.group(2) is not None)
+                    converted.append(filename)
+                    continue
+                if experimentstore.pattern_metric.match(name):
+                    with open(filename, 'r') as f:
+                        store.writeMetric(name, f.read())
+                    converted.append(filename)
+        finally:
+            # a single transaction for all files
+            store.close()
+        if remove:
+            for filename in converted:
+                os.remove(filename)
+        store.logger.debug("Converted {} files into {}".format(len(converted), path+'/'+experimentstore.filename))
+        return len(converted)
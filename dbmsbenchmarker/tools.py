@@ -24,13 +24,17 @@ import logging
 import math
 import re
 import ast
+import string
+import importlib
 from os import path
+import os
 import matplotlib.pyplot as plt
 import pickle
 import traceback
 import warnings
+import time
 
-from dbmsbenchmarker import inspector, benchmarker
+from dbmsbenchmarker import benchmarker
 
 # Set query timeout
 jaydebeapi.QUERY_TIMEOUT = 0
@@ -57,6 +61,8 @@ class timer():
     --- abortTimer() or finishTimer()
     """
     header_stats = ["DBMS [ms]", "n", "mean", "stdev", "cv %", "qcod %", "iqr", "median", "min", "max"]
+    # connection index of binary timer files (query -> timer -> list of connections)
+    index_filename = 'timers.index.json'
     def __init__(self, name):
         """
         Stores name of benchmark container (e.g. execution or data transfer)
@@ -320,6 +326,95 @@ class timer():
             return(existing and not all(v == 0 for v in self.times[numQuery-1][nameConnection]))
         else:
             return(existing and not all(v == 0 for k,c in self.times[numQuery-1].items() for v in c))
+    @staticmethod
+    def saveArray(path, numQuery, name, times):
+        """
+        Saves benchmarks of a given query and timer as a binary file query_<n>_<timer>.npy.
+        This is a float64 array with a row per connection (padded by NaN).
+        The order of connections is stored in the connection index of the result folder.
+
+        :param path: Result folder
+        :param numQuery: Number of query
+        :param name: Name of timer
+        :param times: Dict of connection -> list of benchmark times
+        :return: returns nothing
+        """
+        connections = list(times.keys())
+        numRuns = max([len(v) for v in times.values()], default=0)
+        array = np.full((len(connections), numRuns), np.nan)
+        for i, connection in enumerate(connections):
+            array[i, :len(times[connection])] = times[connection]
+        np.save('{path}/query_{numQuery}_{timer}.npy'.format(path=path, numQuery=numQuery, timer=name), array)
+        index = timer.loadIndex(path)
+        if not str(numQuery) in index:
+            index[str(numQuery)] = {}
+        index[str(numQuery)][name] = connections
+        # the index is replaced atomically, a partially written index would make all binary files unreadable
+        filename = path+'/'+timer.index_filename
+        filename_tmp = filename+'.{}.tmp'.format(os.getpid())
+        with open(filename_tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(filename_tmp, filename)
+    @staticmethod
+    def loadIndex(path):
+        """
+        Loads the connection index of binary timer files of a result folder.
+
+        :param path: Result folder
+        :return: Dict of query -> timer -> list of connections
+        """
+        filename = path+'/'+timer.index_filename
+        if not os.path.isfile(filename):
+            return {}
+        with open(filename, 'r') as f:
+            return json.load(f)
+    @staticmethod
+    def loadArray(path, numQuery, name, index=None):
+        """
+        Loads benchmarks of a given query and timer from a binary file.
+        The file is read at once as a float64 array, so there is no parsing of text.
+
+        :param path: Result folder
+        :param numQuery: Number of query
+        :param name: Name of timer
+        :param index: Connection index, if already loaded
+        :return: Tuple (list of connections, array with a row per connection), None if there is no file
+        """
+        filename = '{path}/query_{numQuery}_{timer}.npy'.format(path=path, numQuery=numQuery, timer=name)
+        if not os.path.isfile(filename):
+            return None
+        if index is None:
+            index = timer.loadIndex(path)
+        if not name in index.get(str(numQuery), {}):
+            logging.warning("Missing connection index for "+filename)
+            return None
+        return (index[str(numQuery)][name], np.load(filename))
+    @staticmethod
+    def loadArrayAsDict(path, numQuery, name, index=None):
+        """
+        Loads benchmarks of a given query and timer from a binary file in the format of times, i.e. dict of connection -> list.
+        The NaN padding at the end of rows is removed, so lists match those loaded from CSV files run for run.
+
+        :param path: Result folder
+        :param numQuery: Number of query
+        :param name: Name of timer
+        :param index: Connection index, if already loaded
+        :return: Dict of connection -> list of benchmark times, None if there is no file
+        """
+        loaded = timer.loadArray(path, numQuery, name, index)
+        if loaded is None:
+            return None
+        connections, array = loaded
+        # a single conversion of the array instead of one per row
+        rows = array.tolist()
+        times = {}
+        for i, connection in enumerate(connections):
+            row = rows[i]
+            numRuns = len(row)
+            while numRuns > 0 and math.isnan(row[numRuns-1]):
+                numRuns = numRuns - 1
+            times[connection] = row[:numRuns]
+        return times
     def tolist(self, numQuery):
         """
         Returns benchmarks of a given query as a list of lists.
@@ -367,13 +462,347 @@ class timer():
 
 
 
+class clientmonitor():
+    """
+    Samples utilization of the client host (i.e. the host running the benchmarker) during a benchmark.
+    CPU utilization is read from the aggregated cpu line of /proc/stat,
+    the run queue is the number of runnable processes (procs_running) excluding the sampling process itself.
+    Sampling is done by the main process while it waits for the query senders, so no additional thread is needed.
+    If /proc/stat is not available (non-Linux client), nothing is sampled.
+    Use this by
+    - m.start()
+    - lists = m.wait(async_result, timeout) or m.sample() in between sequential batches
+    - summary = m.stop()
+    """
+    def __init__(self, active=True, interval=0.5, threshold=0.9):
+        """
+        Construct a new 'clientmonitor' object.
+
+        :param active: Sample at all?
+        :param interval: Seconds between samples
+        :param threshold: CPU utilization (0..1) of client host, above which measurements count as saturated
+        :return: returns nothing
+        """
+        self.active = active and path.isfile('/proc/stat')
+        self.interval = interval
+        self.threshold = threshold
+        self.num_cpu = os.cpu_count()
+        self.first = None
+        self.last = None
+        self.utilization = []
+        self.runqueue = []
+    @staticmethod
+    def readProcStat():
+        """
+        Reads CPU time counters and number of runnable processes from /proc/stat.
+
+        :return: Tuple (busy jiffies, total jiffies, runnable processes)
+        """
+        busy = 0
+        total = 0
+        running = 0
+        with open('/proc/stat') as f:
+            for line in f:
+                if line.startswith('cpu '):
+                    # user nice system idle iowait irq softirq steal - guest is contained in user
+                    values = [int(v) for v in line.split()[1:9]]
+                    total = sum(values)
+                    busy = total - values[3] - values[4]
+                elif line.startswith('procs_running'):
+                    running = int(line.split()[1])
+        return (busy, total, running)
+    def start(self):
+        """
+        Starts sampling.
+
+        :return: returns nothing
+        """
+        if not self.active:
+            return
+        self.first = self.readProcStat()
+        self.last = self.first
+    def sample(self):
+        """
+        Takes a sample, i.e. utilization since last sample and current length of run queue.
+
+        :return: returns nothing
+        """
+        if not self.active or self.last is None:
+            return
+        now = self.readProcStat()
+        if now[1] > self.last[1]:
+            self.utilization.append((now[0]-self.last[0])/(now[1]-self.last[1]))
+        self.runqueue.append(max(0, now[2]-1))
+        self.last = now
+    def wait(self, result, timeout=None):
+        """
+        Waits for an AsyncResult of a pool and samples meanwhile.
+
+        :param result: AsyncResult
+        :param timeout: Timeout in seconds, None means no limit
+        :return: Result of AsyncResult.get()
+        """
+        if not self.active:
+            return result.get(timeout=timeout)
+        start = default_timer()
+        remaining = timeout
+        while not result.ready():
+            if timeout is not None:
+                remaining = timeout - (default_timer() - start)
+                if remaining <= 0:
+                    break
+                result.wait(min(self.interval, remaining))
+            else:
+                result.wait(self.interval)
+            self.sample()
+        if timeout is not None:
+            remaining = max(0, timeout - (default_timer() - start))
+        return result.get(timeout=remaining)
+    def stop(self):
+        """
+        Stops sampling and summarizes samples.
+        Mean utilization refers to the complete sampling period.
+        Measurements are saturated, if mean utilization reaches the threshold or the mean run queue exceeds the number of cores.
+
+        :return: Dict of summary, empty if nothing has been sampled
+        """
+        if not self.active or self.first is None:
+            return {}
+        self.sample()
+        if self.last[1] <= self.first[1]:
+            return {}
+        utilization_mean = (self.last[0]-self.first[0])/(self.last[1]-self.first[1])
+        runqueue_mean = sum(self.runqueue)/len(self.runqueue)
+        return {
+            'cpu_utilization_mean': utilization_mean,
+            'cpu_utilization_max': max(self.utilization) if len(self.utilization) else utilization_mean,
+            'runqueue_mean': runqueue_mean,
+            'runqueue_max': max(self.runqueue),
+            'num_cpu': self.num_cpu,
+            'samples': len(self.runqueue),
+            'threshold': self.threshold,
+            'saturated': utilization_mean >= self.threshold or runqueue_mean > self.num_cpu,
+        }
+    @staticmethod
+    def getProcessCap(numProcesses, summary):
+        """
+        Estimates the number of client processes that keeps the client host below the utilization threshold.
+        This assumes utilization of the client host scales linearly with the number of client processes.
+
+        :param numProcesses: Number of client processes used during sampling
+        :param summary: Dict of summary as returned by stop()
+        :return: Number of client processes, None if client has not been saturated
+        """
+        if len(summary) == 0 or not summary['saturated']:
+            return None
+        load = max(summary['cpu_utilization_mean'], summary['runqueue_mean']/summary['num_cpu'])
+        return max(1, min(numProcesses-1, math.floor(numProcesses*summary['threshold']/load)))
+
+
+
+
+class filebarrier():
+    """
+    Start barrier for streams that are launched as separate processes (maybe on different hosts sharing the result folder).
+    Each stream atomically creates a token file in the folder of the barrier and polls until all parties have arrived.
+    Since polling is done in intervals of milliseconds, streams are released within a few milliseconds of each other.
+    Tokens are kept until the results are merged, so each launch of streams uses a generation of its own (a subfolder),
+    and tokens of earlier or aborted launches in the same result folder do not release the barrier.
+    Use this by
+    - b = filebarrier(folder, parties, generation=id_of_launch)
+    - b.wait(token)
+    """
+    interval = 0.001
+    def __init__(self, folder, parties, timeout=600, generation=None):
+        """
+        Construct a new 'filebarrier' object.
+
+        :param folder: Folder of the barrier, is created if missing
+        :param parties: Number of streams to wait for
+        :param timeout: Maximum number of seconds to wait
+        :param generation: Id of the launch of streams, only tokens of this launch are counted. None means the folder itself.
+        :return: returns nothing
+        """
+        if generation is not None and len(str(generation)) > 0:
+            folder = folder+'/'+re.sub(r'[^A-Za-z0-9_.-]', '_', str(generation))
+        self.folder = folder
+        self.parties = int(parties)
+        self.timeout = timeout
+        os.makedirs(self.folder, exist_ok=True)
+    def wait(self, token=None):
+        """
+        Registers the calling stream at the barrier and blocks until all parties have arrived.
+
+        :param token: Name of the token file, must be unique per stream, default is host and process id
+        :return: Number of seconds spent waiting, None if the barrier timed out or the token exists already
+        """
+        if token is None:
+            token = '{}-{}'.format(os.uname()[1], os.getpid())
+        # O_EXCL makes registration atomic, also on shared folders
+        try:
+            fd = os.open(self.folder+'/'+str(token), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            logging.getLogger('dbmsbenchmarker').error("Start barrier {} already has a token {}. A stream with the same subfolder has registered before, maybe in an earlier launch. Use a new id of the start barrier for each launch.".format(self.folder, token))
+            return None
+        os.close(fd)
+        start = time.perf_counter()
+        interval = self.interval
+        while len(os.listdir(self.folder)) < self.parties:
+            if self.timeout is not None and time.perf_counter() - start > self.timeout:
+                logging.getLogger('dbmsbenchmarker').warning("Start barrier {} timed out after {} seconds".format(self.folder, self.timeout))
+                return None
+            time.sleep(interval)
+            # back off slowly for long waits, but stay in the range of milliseconds
+            interval = min(interval*1.1, 0.01)
+        return time.perf_counter() - start
+
+
+
+
+class overhead():
+    """
+    Container for measuring the overhead of the benchmarker itself (client side).
+    Each phase (e.g. formatting of query strings, pickling, result conversion) is timed by
+    wall clock (perf_counter_ns) and CPU time of the process (process_time_ns).
+    Measurements are aggregated per phase as dict {'wall_ns', 'cpu_ns', 'count', 'max_wall_ns'}.
+    Use this by
+    - t = o.start()
+    - doing the work
+    - o.stop('phase', t)
+    If not active, start() and stop() do nothing.
+    """
+    def __init__(self, active=True):
+        """
+        Construct a new 'overhead' object.
+
+        :param active: Measure at all?
+        :return: returns nothing
+        """
+        self.active = active
+        self.phases = {}
+    def start(self):
+        """
+        Starts measuring a phase.
+
+        :return: Token to be handed to stop()
+        """
+        if not self.active:
+            return None
+        return (time.perf_counter_ns(), time.process_time_ns())
+    def stop(self, phase, token):
+        """
+        Stops measuring a phase and adds the measurement to the aggregate of the phase.
+
+        :param phase: Name of the phase
+        :param token: Token returned by start()
+        :return: Wall clock time of the measurement in ns
+        """
+        if token is None:
+            return 0
+        wall_ns = time.perf_counter_ns() - token[0]
+        cpu_ns = time.process_time_ns() - token[1]
+        self.add(phase, wall_ns, cpu_ns)
+        return wall_ns
+    def add(self, phase, wall_ns, cpu_ns, count=1, max_wall_ns=None):
+        """
+        Adds a measurement to the aggregate of a phase.
+
+        :param phase: Name of the phase
+        :param wall_ns: Wall clock time in ns
+        :param cpu_ns: CPU time in ns
+        :param count: Number of measurements this represents
+        :param max_wall_ns: Maximum wall clock time of a single measurement, default is wall_ns
+        :return: returns nothing
+        """
+        if max_wall_ns is None:
+            max_wall_ns = wall_ns
+        if not phase in self.phases:
+            self.phases[phase] = {'wall_ns': 0, 'cpu_ns': 0, 'count': 0, 'max_wall_ns': 0}
+        self.phases[phase]['wall_ns'] += int(wall_ns)
+        self.phases[phase]['cpu_ns'] += int(cpu_ns)
+        self.phases[phase]['count'] += int(count)
+        self.phases[phase]['max_wall_ns'] = max(self.phases[phase]['max_wall_ns'], int(max_wall_ns))
+    def merge(self, phases):
+        """
+        Merges aggregates of phases (e.g. received from another process) into this container.
+
+        :param phases: Dict of aggregates per phase
+        :return: returns nothing
+        """
+        for phase, aggregate in phases.items():
+            self.add(phase, aggregate['wall_ns'], aggregate['cpu_ns'], aggregate['count'], aggregate['max_wall_ns'])
+    def total(self):
+        """
+        Returns total wall clock time of all phases in ns.
+
+        :return: Sum of wall clock times
+        """
+        return sum(aggregate['wall_ns'] for aggregate in self.phases.values())
+    @staticmethod
+    def summarize(phases):
+        """
+        Converts aggregates of phases to a human readable summary in ms.
+
+        :param phases: Dict of aggregates per phase
+        :return: Dict of phase -> {'wall_ms', 'cpu_ms', 'count', 'mean_wall_ms', 'max_wall_ms'}
+        """
+        summary = {}
+        for phase, aggregate in phases.items():
+            summary[phase] = {
+                'wall_ms': aggregate['wall_ns']/1000000.0,
+                'cpu_ms': aggregate['cpu_ns']/1000000.0,
+                'count': aggregate['count'],
+                'mean_wall_ms': aggregate['wall_ns']/1000000.0/aggregate['count'] if aggregate['count'] > 0 else 0.0,
+                'max_wall_ms': aggregate['max_wall_ns']/1000000.0,
+            }
+        return summary
+
+
+
+
 class query():
     template = None
+    # cached objects by (id of dict, template)
+    cache = {}
+    cache_size = 10000
     """
     Container for storing queries.
     This converts a dict read from json to an object.
     It also checks values and sets defaults.
+    Use fromDict() to get a shared, immutable object instead of constructing it again.
     """
+    @staticmethod
+    def fromDict(querydict):
+        """
+        Returns a cached immutable query object for a dict of a query.
+        The cache is keyed by the identity of the dict and the content of the template,
+        so reading a query file again or changing the template creates new objects.
+
+        :param querydict: Dict containing query infos
+        :return: Query object, must not be changed
+        """
+        key = (id(querydict), repr(query.template))
+        cached = query.cache.get(key)
+        # the dict is kept in the cache, so its id cannot be reused by another dict
+        if cached is None or cached[0] is not querydict:
+            if len(query.cache) >= query.cache_size:
+                query.cache.clear()
+            cached = (querydict, query(querydict))
+            cached[1].frozen = True
+            query.cache[key] = cached
+        return cached[1]
+    @staticmethod
+    def clearCache():
+        """
+        Removes all cached query objects.
+
+        :return: returns nothing
+        """
+        query.cache = {}
+    def __setattr__(self, name, value):
+        if self.__dict__.get('frozen', False):
+            raise AttributeError("Cached query objects must not be changed, attribute {}".format(name))
+        object.__setattr__(self, name, value)
     def __init__(self, querydict):
         """
         Creates object and stores data given in dict into object.
@@ -406,8 +835,13 @@ class query():
         self.timer['connection']['active'] = False
         self.timer['datatransfer'] = {}
         self.timer['datatransfer']['active'] = False
+        self.timer['commit'] = {}
+        self.timer['commit']['active'] = False
         self.delay_connect = 0
         self.delay_run = 0
+        self.bind = False
+        self.batch = None
+        self.transaction = None
         # legacy naming
         #self.timer['transfer'] = {}
         #self.timer['transfer']['active'] = self.timer['datatransfer']['active']#False
@@ -444,6 +878,18 @@ class query():
             self.cooldown = int(query['numCooldown'])
         if 'delay' in query:
             self.delay_run = float(query['delay'])
+        if 'bind' in query:
+            self.bind = query['bind']
+        if 'batch' in query and query['batch']:
+            # size 0 means a single batch, commit is one of auto, batch, run
+            batch = query['batch'] if isinstance(query['batch'], dict) else {}
+            self.batch = joinDicts({'size': 0, 'commit': 'auto'}, batch)
+        if 'transaction' in query and query['transaction']:
+            # statements 0 means all statements of a run, end is one of commit, rollback
+            transaction = query['transaction'] if isinstance(query['transaction'], dict) else {}
+            self.transaction = joinDicts({'statements': 0, 'end': 'commit'}, transaction)
+            # timerCommit
+            self.timer['commit'] = {'active': True}
         if 'title' in query:
             self.title = query['title']
         if 'DBMS' in query:
@@ -501,6 +947,73 @@ class query():
 
 
 
+def bindTemplate(template):
+    """
+    Converts a query template into a statement with bind variables.
+    Each placeholder {NAME} becomes a ? and quotes around a placeholder are removed, since the value is bound as is.
+    Placeholders must be complete values, i.e. not part of a string literal like '%{NAME}%'.
+
+    :param template: Query template, for example SELECT * FROM test WHERE name = '{NAME}'
+    :return: Tuple (statement, list of names of the placeholders in order of the bind variables)
+    """
+    parts = list(string.Formatter().parse(template))
+    statement = ''
+    names = []
+    for i, (literal, name, format_spec, conversion) in enumerate(parts):
+        if name is not None:
+            following = parts[i+1][0] if i+1 < len(parts) else ''
+            if len(literal) > 0 and literal[-1] == "'" and following.startswith("'"):
+                literal = literal[:-1]
+                parts[i+1] = (following[1:],) + parts[i+1][1:]
+            statement += literal
+            if statement.count("'") % 2 == 1:
+                raise ValueError("Placeholder {} is part of a string literal and cannot be bound: {}".format(name, template))
+            statement += '?'
+            names.append(name)
+        else:
+            statement += literal
+    return statement, names
+
+
+
+def convertParamstyle(statement, paramstyle):
+    """
+    Converts a statement with bind variables ? into the paramstyle of a DB-API module (PEP 249).
+    Question marks inside of string literals are kept.
+    Bind variables are named p1, p2, ... for the styles named and pyformat.
+
+    :param statement: SQL statement with bind variables ?
+    :param paramstyle: One of qmark, numeric, named, format, pyformat
+    :return: Statement in paramstyle
+    """
+    if paramstyle == 'qmark':
+        return statement
+    markers = {
+        'numeric': ':{}',
+        'named': ':p{}',
+        'format': '%s',
+        'pyformat': '%(p{})s',
+    }
+    if not paramstyle in markers:
+        raise ValueError("Unknown paramstyle {}".format(paramstyle))
+    # string literals are at odd positions
+    parts = re.split(r"('(?:[^']|'')*')", statement)
+    numParameter = 0
+    for i in range(len(parts)):
+        if paramstyle in ['format', 'pyformat']:
+            # statement is formatted by the driver
+            parts[i] = parts[i].replace('%', '%%')
+        if i % 2 == 1:
+            continue
+        pieces = parts[i].split('?')
+        parts[i] = pieces[0]
+        for piece in pieces[1:]:
+            numParameter += 1
+            parts[i] += markers[paramstyle].format(numParameter)+piece
+    return ''.join(parts)
+
+
+
 def formatDuration(ms):
     """
     Formats duration given in ms to HH:ii:ss and using "," for 1000s
@@ -529,6 +1042,8 @@ class dbms():
     It also checks values and sets defaults.
     """
     jars = []
+    # maximum number of prepared statements kept per connection
+    statements_size = 100
     currentAnonymChar = 65
     anonymizer = {}
     deanonymizer = {}
@@ -544,6 +1059,10 @@ class dbms():
         self.connectiondata = connectiondata
         self.connection = None
         self.cursor = None
+        # prepared statements of the current connection
+        self.statements = {}
+        # style of bind variables of the driver (PEP 249)
+        self.paramstyle = 'qmark'
         self.product = "unknown"
         self.version = "unknown"
         self.driver = "unknown"
@@ -606,7 +1125,7 @@ class dbms():
     def connect(self):
         """
         Connects to one single dbms.
-        Currently only JDBC is supported.
+        Supported are JDBC (via JayDeBeApi), DB-API modules (PEP 249), for example sqlite3, and the simulated DBMS of nulldbms.
 
         :return: returns nothing
         """
@@ -627,6 +1146,7 @@ class dbms():
                     print("JVM options:", jvm_options)
             else:
                 jvm_options = []
+            self.statements = {}
             self.connection = jaydebeapi.connect(
                 self.connectiondata['JDBC']['driver'],
                 self.connectiondata['JDBC']['url'],
@@ -648,25 +1168,49 @@ class dbms():
                 print("Product and version not implemented in JDBC driver {}".format(self.connectiondata['JDBC']['jar']))
             else:
                 pass
-            if 'init_SQL' in self.connectiondata:
-                try:
-                    query_init = self.connectiondata['init_SQL']
-                    if not benchmarker.BENCHMARKER_VERBOSE_NONE:
-                        print('init_SQL:', query_init)
-                    self.openCursor()
-                    if isinstance(query_init, list):
-                        for command in query_init:
-                            self.executeQuery(command)
-                    else:
-                        self.executeQuery(query_init)
-                    #init_result = self.fetchResult()
-                    self.closeCursor()
-                except Exception as e:
-                    print("Error when running init_SQL:", query_init, e)
-                    #print(init_result)
-            #self.connection.jconn.setAutoCommit(True)
+            self.paramstyle = 'qmark'
+        elif 'DBAPI' in self.connectiondata or 'NULL' in self.connectiondata:
+            if 'DBAPI' in self.connectiondata:
+                driverdata = self.connectiondata['DBAPI']
+            else:
+                # simulated DBMS, settings are passed to connect()
+                driverdata = {'module': 'dbmsbenchmarker.nulldbms', 'kwargs': self.connectiondata['NULL'], 'product': 'null'}
+            self.statements = {}
+            module = importlib.import_module(driverdata['module'])
+            self.connection = module.connect(
+                *driverdata.get('args', []),
+                **driverdata.get('kwargs', {}))
+            self.paramstyle = getattr(module, 'paramstyle', 'qmark')
+            # DB-API connections do not commit automatically, JDBC connections do
+            if driverdata.get('autocommit', True):
+                self.setAutoCommit(True)
+            self.product = driverdata.get('product', module.__name__)
+            self.driver = module.__name__
+            self.driverversion = str(getattr(module, '__version__', getattr(module, 'version', 'unknown')))
+            self.connectiondata['product'] = self.product
+            self.connectiondata['driver'] = self.driver
+            self.connectiondata['driverversion'] = self.driverversion
+            if not benchmarker.BENCHMARKER_VERBOSE_NONE:
+                print("Connected to {} using {} version {}".format(self.product, self.driver, self.driverversion))
         else:
             raise ValueError('No connection data for '+self.getName())
+        if 'init_SQL' in self.connectiondata:
+            try:
+                query_init = self.connectiondata['init_SQL']
+                if not benchmarker.BENCHMARKER_VERBOSE_NONE:
+                    print('init_SQL:', query_init)
+                self.openCursor()
+                if isinstance(query_init, list):
+                    for command in query_init:
+                        self.executeQuery(command)
+                else:
+                    self.executeQuery(query_init)
+                #init_result = self.fetchResult()
+                self.closeCursor()
+            except Exception as e:
+                print("Error when running init_SQL:", query_init, e)
+                #print(init_result)
+        #self.connection.jconn.setAutoCommit(True)
     def openCursor(self):
         """
         Opens cursor for current connection.
@@ -684,15 +1228,208 @@ class dbms():
         if self.cursor is not None:
             self.cursor.close()
             self.cursor = None
-    def executeQuery(self, queryString):
+    def executeQuery(self, queryString, parameters=None):
         """
         Executes a query for current connection and cursor.
 
         :param queryString: SQL query to be executed
+        :param parameters: Optional list of values of bind variables
         :return: returns nothing
         """
         if self.cursor is not None:
-            self.cursor.execute(queryString)
+            if parameters is None or len(parameters) == 0:
+                self.cursor.execute(queryString)
+            else:
+                self.cursor.execute(*self.bindParameters(queryString, parameters))
+    def bindParameters(self, statement, parameters):
+        """
+        Converts a statement with bind variables ? and its values into the paramstyle of the driver.
+
+        :param statement: SQL statement with bind variables ?
+        :param parameters: List of values of bind variables
+        :return: Tuple (statement, parameters) to be passed to execute() of a cursor
+        """
+        if self.paramstyle == 'qmark':
+            return statement, parameters
+        if self.paramstyle in ['named', 'pyformat']:
+            parameters = {'p{}'.format(i+1): value for i, value in enumerate(parameters)}
+        return convertParamstyle(statement, self.paramstyle), parameters
+    def executeStatement(self, statement, parameters):
+        """
+        Executes a statement with bind variables for current connection and cursor.
+        The statement is prepared once per connection and reused, so the DBMS does not parse and plan it again.
+        The result can be fetched by fetchResult().
+
+        :param statement: SQL statement with bind variables ?
+        :param parameters: List of values of bind variables
+        :return: returns nothing
+        """
+        if self.cursor is None:
+            return
+        if not 'JDBC' in self.connectiondata:
+            # DB-API drivers keep prepared statements themselves, for example the statement cache of sqlite3
+            self.executeQuery(statement, parameters)
+            return
+        if not statement in self.statements:
+            if len(self.statements) >= dbms.statements_size:
+                self.closeStatements()
+            self.statements[statement] = self.connection.jconn.prepareStatement(statement)
+        prepared = self.statements[statement]
+        # the result set of the previous run is closed, the prepared statement is kept
+        # (it is not handed to the cursor, so closing the cursor does not close it)
+        if self.cursor._rs is not None:
+            self.cursor._rs.close()
+        self.cursor._rs = None
+        self.cursor._meta = None
+        self.cursor._description = None
+        self.cursor._set_stmt_parms(prepared, parameters)
+        if prepared.execute():
+            self.cursor._rs = prepared.getResultSet()
+            self.cursor._meta = self.cursor._rs.getMetaData()
+            self.cursor.rowcount = -1
+        else:
+            self.cursor.rowcount = prepared.getUpdateCount()
+    def closeStatements(self):
+        """
+        Closes the prepared statements kept for current connection.
+
+        :return: returns nothing
+        """
+        for prepared in self.statements.values():
+            try:
+                prepared.close()
+            except Exception:
+                # connection may already be broken, statements are dropped anyway
+                logging.getLogger('dbmsbenchmarker').debug("Could not close prepared statement of {}".format(self.getName()), exc_info=True)
+        self.statements = {}
+    def executeBatch(self, statements, parameters=None, size=0, commit='auto'):
+        """
+        Executes statements as JDBC batches (addBatch / executeBatch) for current connection.
+        Without parameters each statement is a row of the batch.
+        With parameters each set of values is a row of the batch of a prepared statement, which is reused as in executeStatement().
+        A batch contains at most size rows of the same statement.
+        Commit control:
+        - auto: autocommit of the connection is kept
+        - batch: autocommit is switched off and each batch is committed
+        - run: autocommit is switched off and all batches are committed at the end
+        In case of an error the open transaction is rolled back.
+
+        :param statements: SQL statement or list of statements
+        :param parameters: None, list of rows (lists of values) for a single statement or list of rows, one per statement
+        :param size: Maximum number of rows per batch, 0 means a single batch
+        :param commit: One of auto, batch, run
+        :return: List of [number of rows, start, end] per batch, timer values in seconds
+        """
+        if self.cursor is None:
+            return []
+        # pairs of statement and row
+        if parameters is None:
+            statements = statements if isinstance(statements, list) else [statements]
+            rows = [(None, statement) for statement in statements]
+        elif isinstance(statements, list):
+            rows = list(zip(statements, parameters))
+        else:
+            rows = [(statements, row) for row in parameters]
+        # consecutive rows of the same statement, split by size
+        batches = []
+        for statement, row in rows:
+            if len(batches) == 0 or batches[-1][0] != statement or (size > 0 and len(batches[-1][1]) >= size):
+                batches.append((statement, []))
+            batches[-1][1].append(row)
+        if commit != 'auto':
+            self.setAutoCommit(False)
+        timings = []
+        statement_plain = None
+        try:
+            for statement, batch in batches:
+                start = default_timer()
+                if not 'JDBC' in self.connectiondata:
+                    # DB-API: rows of a prepared statement via executemany()
+                    if statement is None:
+                        for sql in batch:
+                            self.cursor.execute(sql)
+                    elif len(batch[0]) == 0:
+                        for row in batch:
+                            self.cursor.execute(statement)
+                    else:
+                        statement_bound = self.bindParameters(statement, batch[0])[0]
+                        self.cursor.executemany(statement_bound, [self.bindParameters(statement, row)[1] for row in batch])
+                elif statement is None:
+                    # plain statements
+                    if statement_plain is None:
+                        statement_plain = self.connection.jconn.createStatement()
+                    for sql in batch:
+                        statement_plain.addBatch(sql)
+                    statement_plain.executeBatch()
+                    statement_plain.clearBatch()
+                else:
+                    if not statement in self.statements:
+                        if len(self.statements) >= dbms.statements_size:
+                            self.closeStatements()
+                        self.statements[statement] = self.connection.jconn.prepareStatement(statement)
+                    prepared = self.statements[statement]
+                    for row in batch:
+                        self.cursor._set_stmt_parms(prepared, row)
+                        prepared.addBatch()
+                    prepared.executeBatch()
+                    prepared.clearBatch()
+                if commit == 'batch':
+                    self.commit()
+                end = default_timer()
+                timings.append([len(batch), start, end])
+            if commit == 'run':
+                start = default_timer()
+                self.commit()
+                end = default_timer()
+                # commit belongs to the last batch
+                if len(timings) > 0:
+                    timings[-1][2] = end
+        except Exception as e:
+            if commit != 'auto':
+                self.rollback()
+            raise e
+        finally:
+            if statement_plain is not None:
+                statement_plain.close()
+            if commit != 'auto':
+                self.setAutoCommit(True)
+        return timings
+    def setAutoCommit(self, autocommit):
+        """
+        Switches autocommit of current connection on or off.
+
+        :param autocommit: True or False
+        :return: returns nothing
+        """
+        if self.connection is None:
+            return
+        if 'JDBC' in self.connectiondata:
+            self.connection.jconn.setAutoCommit(autocommit)
+        elif callable(getattr(self.connection, 'autocommit', None)):
+            # for example pymysql
+            self.connection.autocommit(autocommit)
+        elif hasattr(self.connection, 'autocommit'):
+            # for example psycopg2, sqlite3 of Python 3.12
+            self.connection.autocommit = autocommit
+        elif hasattr(self.connection, 'isolation_level'):
+            # sqlite3 of older Python versions
+            self.connection.isolation_level = None if autocommit else ''
+    def commit(self):
+        """
+        Commits the open transaction of current connection.
+
+        :return: returns nothing
+        """
+        if self.connection is not None:
+            self.connection.commit()
+    def rollback(self):
+        """
+        Rolls back the open transaction of current connection.
+
+        :return: returns nothing
+        """
+        if self.connection is not None:
+            self.connection.rollback()
     def fetchResult(self):
         """
         Fetches result from current cursor.
@@ -710,6 +1447,7 @@ class dbms():
         :return: returns nothing
         """
         if self.connection is not None:
+            self.closeStatements()
             self.connection.close()
             self.connection = None
     def getName(self):
@@ -835,7 +1573,7 @@ class dataframehelper():
                 logging.debug("timer "+str(numTimer)+" is valid for query Q"+str(i+1))
                 df = benchmarker.statsToDataFrame(i+1, t)
                 #print(df)
-                queryObject = query(benchmarker.queries[i])
+                queryObject = query.fromDict(benchmarker.queries[i])
                 # no active dbms missing for this timer and query
                 numQueriesEvaluated = numQueriesEvaluated + 1
                 if numQuery is None:
@@ -923,7 +1661,7 @@ class dataframehelper():
                     continue
                 logging.debug("timer "+str(numTimer)+" is valid for query Q"+str(i+1))
                 df = benchmarker.statsToDataFrame(i+1, t)
-                queryObject = query(benchmarker.queries[i])
+                queryObject = query.fromDict(benchmarker.queries[i])
                 # at least one DBMS does not contribute (because of zero value)
                 bMissingFound = False
                 # mean value (i.e. sum of all values)
@@ -1433,7 +2171,7 @@ def findSuccessfulQueriesAllDBMS(benchmarker, numQuery, timer, dbms_filter=[]):
             # does this timer contribute?
             if not t.checkForBenchmarks(i+1):
                 continue
-            queryObject = query(benchmarker.queries[i])
+            queryObject = query.fromDict(benchmarker.queries[i])
             # is timer active for this query?
             if not t.name in queryObject.timer or not queryObject.timer[t.name]['active']:
                 continue
@@ -1653,8 +2391,246 @@ import json
 from os.path import isdir, isfile, join
 from os import listdir, stat
 import pandas as pd
-from shutil import copyfile
-from operator import itemgetter
+from shutil import copyfile, rmtree
+import multiprocessing as mp
+import itertools
+import hashlib
+import csv
+
+def balancedOrdering(numQueries, stream):
+    """
+    Ordering of queries of a stream following a Williams design (balanced latin square).
+    Over numQueries streams (2*numQueries for an odd number of queries) each query appears
+    in each position equally often and each query directly follows each other query equally often.
+    Stream ids larger than the number of rows of the design start over.
+
+    :param numQueries: Number of queries
+    :param stream: Id of stream, starting at 1
+    :return: List of numbers of queries (starting at 1)
+    """
+    # first row: 0, 1, n-1, 2, n-2, ...
+    first = [0]
+    low, high = 1, numQueries-1
+    while len(first) < numQueries:
+        first.append(low)
+        low = low + 1
+        if len(first) < numQueries:
+            first.append(high)
+            high = high - 1
+    rows = numQueries if numQueries % 2 == 0 else 2*numQueries
+    row = (int(stream)-1) % rows
+    ordering = [(q + row) % numQueries + 1 for q in first]
+    if row >= numQueries:
+        # odd number of queries: second square is mirrored
+        ordering.reverse()
+    return ordering
+
+def loadDurations(folder, connection=None):
+    """
+    Reads durations of queries (all runs) from the protocol of a previous experiment.
+    The duration of the given connection is used if present, otherwise the maximum over all connections.
+
+    :param folder: Result folder of the previous experiment
+    :param connection: Name of connection to prefer
+    :return: Dict of number of query -> duration [ms], queries without successful duration are missing
+    """
+    protocol = loadProtocol(folder)
+    durations = {}
+    for numQuery, query in protocol['query'].items():
+        known = {c: d for c, d in query.get('durations', {}).items() if d is not None and d > 0}
+        if connection is not None and connection in known:
+            durations[int(numQuery)] = known[connection]
+        elif len(known) > 0:
+            durations[int(numQuery)] = max(known.values())
+    return durations
+
+def scheduleLongestFirst(queries, durations, numStreams=1, stream=1):
+    """
+    Longest-processing-time-first scheduling of queries.
+    A single stream runs all queries, longest first.
+    Several streams share the queries: each query is assigned to the stream with the least total duration so far (LPT), which keeps the makespan within 4/3 of the optimum.
+    Queries with unknown duration keep their configured order and come last, distributed round robin to the streams.
+
+    :param queries: List of numbers of queries in configured order
+    :param durations: Dict of number of query -> duration
+    :param numStreams: Number of streams sharing the queries
+    :param stream: Id of stream, starting at 1
+    :return: List of numbers of queries of the stream
+    """
+    known = sorted([q for q in queries if q in durations], key=lambda q: durations[q], reverse=True)
+    unknown = [q for q in queries if not q in durations]
+    if numStreams <= 1:
+        return known + unknown
+    loads = [0.0]*numStreams
+    assigned = [[] for i in range(numStreams)]
+    for q in known:
+        i = loads.index(min(loads))
+        assigned[i].append(q)
+        loads[i] = loads[i] + durations[q]
+    for j, q in enumerate(unknown):
+        assigned[j % numStreams].append(q)
+    return assigned[(int(stream)-1) % numStreams]
+
+def applyJournalEntry(protocol, entry):
+    """
+    Applies an entry of the journal of protocol updates to a protocol.
+    Entries contain the complete protocol of a query and top level keys other than 'query', so applying is idempotent.
+
+    :param protocol: Dict of protocol
+    :param entry: Dict of journal entry
+    :return: returns nothing
+    """
+    for k, v in entry.items():
+        if k == 'query':
+            if not 'query' in protocol:
+                protocol['query'] = {}
+            protocol['query'].update(v)
+        else:
+            protocol[k] = v
+
+def loadProtocol(folder, protocol=None):
+    """
+    Loads protocol of a result folder.
+    The journal of protocol updates (protocol.journal) not yet compacted into protocol.json is replayed.
+
+    :param folder: Result folder
+    :param protocol: Protocol to start with, if there is no protocol.json yet
+    :return: Dict of protocol
+    """
+    filename = folder+'/protocol.json'
+    if protocol is None or isfile(filename):
+        with open(filename, 'r') as f:
+            protocol = json.load(f)
+    filename_journal = folder+'/protocol.journal'
+    if isfile(filename_journal):
+        with open(filename_journal, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # incomplete last line of an aborted run
+                    logging.getLogger('dbmsbenchmarker').warning("Incomplete entry in "+filename_journal)
+                    break
+                applyJournalEntry(protocol, entry)
+    return protocol
+
+def fingerprintResultset(resultset, precision=2):
+    """
+    Computes a fingerprint of a result set, that does not depend on the order of rows.
+    Titles are part of the fingerprint, so result sets differing in column names only are different.
+    Cells are rounded like for comparison of result sets, rows are sorted by their representation.
+
+    :param resultset: List of rows, first row contains titles
+    :param precision: Number of decimals for rounding floats
+    :return: Hex digest (SHA-224)
+    """
+    titles = list(resultset[0]) if len(resultset) > 0 else []
+    rows = sorted([[convert_to_rounded_float(item, precision) for item in row] for row in resultset[1:]], key=repr)
+    return hashlib.sha224(repr([titles, rows]).encode()).hexdigest()
+
+def concatCSVColumns(filenames, filename, unique=False):
+    """
+    Concatenates the columns of CSV files line by line into a single CSV file.
+    Files are streamed, shorter files are padded by empty cells.
+    If unique is set, only the first column of each name (connection) is kept.
+
+    :param filenames: List of names of CSV files to concatenate
+    :param filename: Name of resulting CSV file
+    :param unique: Drop columns whose name has already been written
+    :return: returns nothing
+    """
+    files = [open(f, 'r', newline='') for f in filenames]
+    try:
+        readers = [csv.reader(f) for f in files]
+        headers = [next(reader, []) for reader in readers]
+        # positions of columns to keep per file
+        columns = []
+        seen = set()
+        for header in headers:
+            keep = []
+            for i, column in enumerate(header):
+                if unique and column in seen:
+                    continue
+                seen.add(column)
+                keep.append(i)
+            columns.append(keep)
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow([headers[i][j] for i in range(len(headers)) for j in columns[i]])
+            for rows in itertools.zip_longest(*readers):
+                writer.writerow([(rows[i][j] if rows[i] is not None and j < len(rows[i]) else '') for i in range(len(rows)) for j in columns[i]])
+    finally:
+        for f in files:
+            f.close()
+
+def merge_partial_resultsets(folder, numQuery, list_connections):
+    """
+    Compares result sets of a query of all partial results (streams) by fingerprints.
+    This is called per query in a pool of processes.
+
+    :param folder: Result folder containing the partial results in subfolders
+    :param numQuery: Number of query
+    :param list_connections: List of subfolders
+    :return: Dict with keys dataStorage (None if not found), warnings and resultSets (per connection) for the protocol
+    """
+    logger = logging.getLogger('dbmsbenchmarker')
+    merged = {'dataStorage': None, 'warnings': {}, 'resultSets': {}}
+    data_first = None
+    fingerprints_first = None
+    connection_first = None
+    for connection in list_connections:
+        try:
+            filename = '{folder}/{connection}/query_{numQuery}_resultset_complete_{connection}.pickle'.format(folder=folder, connection=connection, numQuery=numQuery)
+            logger.debug("Looking for {}".format(filename))
+            if isfile(filename):
+                # result set of all runs, first row contains titles
+                with open(filename, 'rb') as f:
+                    data = pickle.load(f)
+                fingerprints = [fingerprintResultset(resultset) if len(resultset) > 0 else None for resultset in data]
+                if data_first is None:
+                    merged['dataStorage'] = data
+                    merged['warnings'][connection] = ''
+                    data_first = data
+                    fingerprints_first = fingerprints
+                    connection_first = connection
+                else:
+                    different = False
+                    for numRun, fingerprint in enumerate(fingerprints):
+                        if fingerprint is None:
+                            continue
+                        if numRun >= len(fingerprints_first) or fingerprint != fingerprints_first[numRun]:
+                            logger.debug("different")
+                            merged['warnings'][connection] = 'Different at run #'+str(numRun+1)
+                            merged['resultSets'][connection] = data
+                            merged['resultSets'][connection_first] = data_first
+                            different = True
+                            break
+                    if not different:
+                        merged['resultSets'][connection] = []
+                        merged['warnings'][connection] = ""
+            else:
+                # result set of first run only
+                filename = '{folder}/{connection}/query_{numQuery}_resultset_{connection}.pickle'.format(folder=folder, connection=connection, numQuery=numQuery)
+                if isfile(filename):
+                    df = pd.read_pickle(filename)
+                    result_as_list = [[i[0] for i in list(df.columns)]]
+                    result_as_list.extend(df.values.tolist())
+                    fingerprint = fingerprintResultset(result_as_list)
+                    if fingerprints_first is None:
+                        fingerprints_first = [fingerprint]
+                        merged['dataStorage'] = [result_as_list] # list, because this is (only) first run
+                        merged['warnings'][connection] = ""
+                    elif fingerprint != fingerprints_first[0]:
+                        merged['warnings'][connection] = 'Different'
+                        merged['resultSets'][connection] = [result_as_list] # list, because this is (only) first run
+                    else:
+                        merged['resultSets'][connection] = []
+                        merged['warnings'][connection] = ""
+        except Exception as e:
+            print("Exception when merging result sets: {}".format(e))
+            merged['warnings'][connection] = 'Missing'
+            traceback.print_exc()
+    return merged
 
 #result_path = '/results/'
 #code = '1613110870'
@@ -1663,8 +2639,10 @@ def merge_partial_results(result_path, code):
     logger = logging.getLogger('dbmsbenchmarker')
     # result folder
     folder = result_path+code
-    # connection subfolders 
-    list_connections = [f for f in listdir(folder) if isdir(join(folder, f))]
+    # folder of file barrier of streams, if any, is not needed anymore
+    rmtree(join(folder, 'barrier'), ignore_errors=True)
+    # connection subfolders, i.e. subfolders containing a protocol (not plans, barrier, runlog, ...)
+    list_connections = [f for f in listdir(folder) if isdir(join(folder, f)) and (isfile(join(folder, f, 'protocol.json')) or isfile(join(folder, f, 'protocol.journal')))]
     def joinDicts(d1, d2):
         result = d1.copy()
         for k, v in d2.items():
@@ -1713,9 +2691,7 @@ def merge_partial_results(result_path, code):
     # load partial protocols
     protocols = []
     for connection in list_connections:
-        filename = '{folder}/{connection}/protocol.json'.format(folder=folder, connection=connection)
-        with open(filename, 'r') as f:
-            protocols.append(json.load(f))
+        protocols.append(loadProtocol('{folder}/{connection}'.format(folder=folder, connection=connection), {}))
     # merged protocol
     protocol = {}
     protocol['query'] = {}
@@ -1733,175 +2709,18 @@ def merge_partial_results(result_path, code):
         if 'ordering' in p:
             protocol['ordering'] = joinDicts(protocol['ordering'], p['ordering'])
     filename_protocol = '{folder}/protocol.json'.format(folder=folder)
-    with open(filename_protocol, 'w') as f:
-        json.dump(protocol, f)
     # compare result sets
     if not benchmarker.BENCHMARKER_VERBOSE_NONE:
         print("Merge result sets")
-    for numQuery, query in protocol['query'].items():
-        #if int(numQuery) > 3:
-        #    exit()
-        #print(query)
-        data_first = None
-        df_first = None
-        connection_first = None
-        titles_result = []
-        for connection in list_connections:
-            try:
-                filename = '{folder}/{connection}/query_{numQuery}_resultset_complete_{connection}.pickle'.format(folder=folder, connection=connection, numQuery=numQuery)
-                logger.debug("Looking for {}".format(filename))
-                if isfile(filename):
-                    # result set of all runs
-                    #print(connection+": ", end='')#, df)
-                    with open(filename, 'r') as f:
-                        data = pickle.load( open( filename, "rb" ) )
-                        if data_first is None:
-                            protocol['query'][numQuery]['dataStorage'] = data.copy()
-                            protocol['query'][numQuery]['warnings'][connection] = ''
-                            if len(protocol['query'][numQuery]['dataStorage'][0]) > 0:
-                                titles_result = protocol['query'][numQuery]['dataStorage'][0][0]
-                            #print(protocol['query'][numQuery]['dataStorage'][0])
-                            data_first = data.copy()
-                            #print(data_first)
-                            connection_first = connection
-                        else:
-                            different = False
-                            for numRun, resultset in enumerate(data):
-                                #print("numRun {}".format(numRun), end='')
-                                result = data[numRun].copy()
-                                # remove titles
-                                if len(data[numRun]) > 0:
-                                    titles_result = data[numRun][0]#list(range(len(result[0])))
-                                else:
-                                    continue
-                                #print(titles_result)
-                                #print("####", data[numRun])
-                                result.pop(0)
-                                #print("****1", result)
-                                # convert datatypes
-                                #precision = query.restrict_precision
-                                precision = 2
-                                #result = [[round(float(item), int(precision)) if convertToFloat(item) == float else convertToInt(item) if convertToInt(item) == item else item for item in sublist] for sublist in result]
-                                result = [[convert_to_rounded_float(item, int(precision)) for item in sublist] for sublist in result]
-                                #print("****2", result)
-                                if len(result) > 0:
-                                    df = pd.DataFrame(sorted(result, key=itemgetter(*list(range(0,len(result[0]))))), columns=titles_result)
-                                else:
-                                    df = pd.DataFrame([], columns=titles_result)
-                                #df = pd.DataFrame(result)
-                                #new_header = df.iloc[0] #grab the first row for the header
-                                #df = df[1:] #take the data less the header row
-                                #df.columns = new_header #set the header row as the df header
-                                #print(df)
-                                #df.reset_index(inplace=True, drop=True)
-                                #print(df)
-                                storage = data_first[numRun].copy()
-                                # remove titles
-                                titles_storage = data_first[numRun][0]#list(range(len(storage[0])))
-                                #print(titles_storage)
-                                storage.pop(0)
-                                # convert datatypes
-                                #precision = query.restrict_precision
-                                precision = 2
-                                #storage = [[round(float(item), int(precision)) if convertToFloat(item) == float else convertToInt(item) if convertToInt(item) == item else item for item in sublist] for sublist in storage]
-                                storage = [[convert_to_rounded_float(item, int(precision)) for item in sublist] for sublist in storage]
-                                if len(storage) > 0:
-                                    df_first = pd.DataFrame(sorted(storage, key=itemgetter(*list(range(0,len(storage[0]))))), columns=titles_storage)
-                                else:
-                                    df_first = pd.DataFrame([], columns=titles_storage)
-                                #if df.empty and df_first.empty:
-                                #    logger.debug("all empty")
-                                #    continue
-                                #df_first = pd.DataFrame(data_first[numRun])
-                                #new_header = df_first.iloc[0] #grab the first row for the header
-                                #df_first = df_first[1:] #take the data less the header row
-                                #df_first.columns = new_header #set the header row as the df header
-                                #df_first.reset_index(inplace=True, drop=True)
-                                #print(numQuery, connection, df_first, df)
-                                # Check for duplicate column names
-                                duplicates = df.columns[df.columns.duplicated()]
-                                if not duplicates.empty:
-                                    logger.debug("Duplicate column names found in Q{} (cannot compare results uniquely): {}".format(numQuery, duplicates.tolist()))
-                                    #print("Duplicate column names found in Q{} (cannot compare results uniquely): {}".format(numQuery, duplicates.tolist()))
-                                    protocol['query'][numQuery]['warnings'][connection] = 'Not sortable at run #'+str(numRun+1)
-                                    protocol['query'][numQuery]['resultSets'][connection] = data
-                                    protocol['query'][numQuery]['resultSets'][connection_first] = data_first
-                                    different = True
-                                    break
-                                else:
-                                    duplicates = df_first.columns[df_first.columns.duplicated()]
-                                    if not duplicates.empty:
-                                        logger.debug("Duplicate column names found in Q{} (cannot compare results uniquely): {}".format(numQuery, duplicates.tolist()))
-                                        #print("Duplicate column names found in Q{} (cannot compare results uniquely): {}".format(numQuery, duplicates.tolist()))
-                                        protocol['query'][numQuery]['warnings'][connection] = 'Not sortable at run #'+str(numRun+1)
-                                        protocol['query'][numQuery]['resultSets'][connection] = data
-                                        protocol['query'][numQuery]['resultSets'][connection_first] = data_first
-                                        different = True
-                                        break
-                                df_1 = inspector.getDifference12(df_first, df)
-                                df_2 = inspector.getDifference12(df, df_first)
-                                #print("result", result)
-                                #print("storage", storage)
-                                if result == storage:
-                                    logger.debug("same")
-                                    pass
-                                #    #exit()
-                                #if numQuery=='3':
-                                #    print(df_first)
-                                #    print(df)
-                                if not df_1.empty or not df_2.empty:
-                                    logger.debug("different")#, df_1, df_2)
-                                    #print("result", result)
-                                    #print("storage", storage)
-                                    #exit()
-                                    protocol['query'][numQuery]['warnings'][connection] = 'Different at run #'+str(numRun+1)
-                                    #result_as_list = [[i for i in list(df.columns)]]
-                                    #result_as_list.extend(df.values.tolist())
-                                    #print(result_as_list)
-                                    #exit()
-                                    protocol['query'][numQuery]['resultSets'][connection] = data
-                                    protocol['query'][numQuery]['resultSets'][connection_first] = data_first
-                                    different = True
-                                    break
-                            if not different:
-                                #print("OK")
-                                protocol['query'][numQuery]['resultSets'][connection] = []
-                                protocol['query'][numQuery]['warnings'][connection] = ""
-                else:
-                    # result set of first run only
-                    filename = '{folder}/{connection}/query_{numQuery}_resultset_{connection}.pickle'.format(folder=folder, connection=connection, numQuery=numQuery)
-                    #print(connection+": ", end='')#, df)
-                    if isfile(filename):
-                        with open(filename, 'r') as f:
-                            df = pd.read_pickle(filename)
-                            #print(connection)#, df)
-                            if df_first is None:
-                                df_first = df.copy()
-                                #print("first\n", df_first)
-                                result_as_list = [[i[0] for i in list(df_first.columns)]]
-                                result_as_list.extend(df_first.values.tolist())
-                                protocol['query'][numQuery]['dataStorage'] = [result_as_list] # list, because this is (only) first run
-                                protocol['query'][numQuery]['warnings'][connection] = ""
-                            else:
-                                df_1 = inspector.getDifference12(df_first, df)
-                                df_2 = inspector.getDifference12(df, df_first)
-                                if not df_1.empty or not df_2.empty:
-                                    #print("different\n", df)
-                                    protocol['query'][numQuery]['warnings'][connection] = 'Different'
-                                    result_as_list = [[i[0] for i in list(df.columns)]]
-                                    result_as_list.extend(df.values.tolist())
-                                    protocol['query'][numQuery]['resultSets'][connection] = [result_as_list] # list, because this is (only) first run
-                                else:
-                                    #print("OK")
-                                    protocol['query'][numQuery]['resultSets'][connection] = []
-                                    protocol['query'][numQuery]['warnings'][connection] = ""
-            except Exception as e:
-                print("Exception when merging result sets: {}".format(e))
-                #print("missing")
-                protocol['query'][numQuery]['warnings'][connection] = 'Missing'
-                traceback.print_exc()
-            finally:
-                pass
+    # in parallel per query
+    list_queries = list(protocol['query'].keys())
+    with mp.Pool(processes=max(1, min(mp.cpu_count(), len(list_queries)))) as pool:
+        list_merged = pool.starmap(merge_partial_resultsets, [(folder, numQuery, list_connections) for numQuery in list_queries])
+    for numQuery, merged in zip(list_queries, list_merged):
+        if merged['dataStorage'] is not None:
+            protocol['query'][numQuery]['dataStorage'] = merged['dataStorage']
+        protocol['query'][numQuery]['warnings'].update(merged['warnings'])
+        protocol['query'][numQuery]['resultSets'].update(merged['resultSets'])
     #print("warnings", protocol['query']['3']['warnings'])
     #print("storage", protocol['query']['3']['dataStorage'])
     #print("result", protocol['query']['3']['resultSets']['MySQL'])
@@ -1912,39 +2731,46 @@ def merge_partial_results(result_path, code):
     if not benchmarker.BENCHMARKER_VERBOSE_NONE:
         print("Merge timers")
     # load partial timers, join and save
-    timer = ['connection', 'execution', 'datatransfer']
+    timers = ['connection', 'execution', 'datatransfer', 'commit']
     numQuery = 1
     for numQuery, query in protocols[0]['query'].items():
-        for t in timer:
-            connection = list_connections[0]
+        for t in timers:
+            filenames = []
             d = {}
+            binary = False
             for connection in list_connections:
                 # load execution benchmarks
                 filename = '{folder}/{connection}/query_{numQuery}_{timer}.csv'.format(folder=folder, connection=connection, numQuery=numQuery, timer=t)
-                if isfile(filename):
-                    df1 = pd.read_csv(filename)
-                    df1_t = df1.transpose()
-                    d1 = df1.to_dict(orient="list")
-                else:
-                    continue
-                d = joinDicts(d,d1)
-            if len(d) > 0:
-                df = pd.DataFrame(d)
-                # convert to csv
-                csv = df.to_csv(index_label=False,index=False,lineterminator='\n')
-                # save
+                d1 = timer.loadArrayAsDict('{folder}/{connection}'.format(folder=folder, connection=connection), numQuery, t)
+                if d1 is not None:
+                    binary = True
+                    d = joinDicts(d,d1)
+                elif isfile(filename):
+                    filenames.append(filename)
+            if binary:
+                # keep binary format of streams
+                for filename in filenames:
+                    d = joinDicts(d, pd.read_csv(filename).to_dict(orient="list"))
+                timer.saveArray(folder, numQuery, t, d)
+                logger.debug("Merged timer {}".format(t))
+            elif len(filenames) > 0:
+                # columns are connections, so concatenate columns
                 filename = '{folder}/query_{numQuery}_{timer}.csv'.format(folder=folder, numQuery=numQuery, timer=t)
-                csv_file = open(filename, "w")
-                csv_file.write(csv)
-                csv_file.close()
+                concatCSVColumns(filenames, filename)
                 logger.debug("Merged timer {}".format(filename))
     # merge metrics
-    # copy partial metrics
+    # copy partial metrics, metrics of the same name (aggregated per query) are concatenated
+    files_metrics = {}
     for connection in list_connections:
         folder_connection = folder+'/'+connection
-        files_metrics = [f for f in listdir(folder_connection) if isfile(join(folder_connection, f)) and 'metric' in f]
-        #print(folder_connection, files_metrics)
-        if not benchmarker.BENCHMARKER_VERBOSE_NONE:
-            print("Copy Metrics", folder_connection)
-        for file in files_metrics:
-            copyfile(folder_connection+'/'+file, folder+'/'+file)
+        for file in listdir(folder_connection):
+            if isfile(join(folder_connection, file)) and 'metric' in file:
+                files_metrics.setdefault(file, []).append(folder_connection+'/'+file)
+    if not benchmarker.BENCHMARKER_VERBOSE_NONE:
+        print("Copy Metrics")
+    for file, filenames in files_metrics.items():
+        if len(filenames) == 1 or not file.endswith('.csv'):
+            copyfile(filenames[0], folder+'/'+file)
+        else:
+            # streams of the same connection have the same columns, keep the first one
+            concatCSVColumns(filenames, folder+'/'+file, unique=True)
@@ -0,0 +1,340 @@
+"""
+    Classes for recording and exporting run events of the Python Package DBMS Benchmarker
+    Copyright (C) 2020  Patrick Erdelt
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as
+    published by the Free Software Foundation, either version 3 of the
+    License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import hashlib
+import logging
+import struct
+import os
+from dbmsbenchmarker import tools
+
+
+class recorder():
+    """
+    Class for recording run events in a ring buffer of fixed-size binary records.
+    This replaces printing inside the loop of benchmark runs.
+    A record consists of number of query, number of run, phase, start, end (wall clock, seconds since epoch) and size.
+    If a filename is given, the buffer is flushed in bulk to this (per worker) log file whenever it is full and at the end of a batch.
+    Otherwise the oldest records are overwritten.
+    """
+    phases = ['connect', 'execute', 'fetch', 'result', 'error']
+    phase_codes = {phase: code for code, phase in enumerate(phases)}
+    record_format = struct.Struct('<IIBddq')
+    def __init__(self, capacity=1024, filename=None):
+        """
+        Construct a new 'recorder' object.
+
+        :param capacity: Number of records the buffer can hold
+        :param filename: Name of the log file the buffer is flushed to, None means no file
+        :return: returns nothing
+        """
+        self.capacity = capacity
+        self.buffer = bytearray(self.record_format.size*capacity)
+        self.position = 0
+        self.wrapped = False
+        self.filename = filename
+        # position up to which records have been handed to consume()
+        self.consumed = 0
+    def record(self, numQuery, numRun, phase, start, end, size=0):
+        """
+        Adds a record to the buffer.
+
+        :param numQuery: Number of the query, 1...
+        :param numRun: Number of benchmark run, 0...
+        :param phase: One of recorder.phases
+        :param start: Start timestamp in seconds
+        :param end: End timestamp in seconds
+        :param size: Size in bytes, if any
+        :return: returns nothing
+        """
+        if self.position == self.capacity:
+            if self.filename is not None:
+                self.flush()
+            else:
+                self.position = 0
+                self.wrapped = True
+                self.consumed = 0
+        self.record_format.pack_into(self.buffer, self.position*self.record_format.size, int(numQuery), int(numRun), self.phase_codes[phase], start, end, int(size))
+        self.position = self.position + 1
+    def records(self):
+        """
+        Returns records currently in the buffer, oldest first.
+
+        :return: List of tuples (numQuery, numRun, phase, start, end, size)
+        """
+        if self.wrapped and self.filename is None:
+            data = self.buffer[self.position*self.record_format.size:] + self.buffer[:self.position*self.record_format.size]
+        else:
+            data = self.buffer[:self.position*self.record_format.size]
+        return [(numQuery, numRun, self.phases[phase], start, end, size) for numQuery, numRun, phase, start, end, size in self.record_format.iter_unpack(bytes(data))]
+    def consume(self):
+        """
+        Returns records added since the last call, oldest first, for consumers showing progress.
+        Records that have been flushed or overwritten in between are skipped.
+
+        :return: List of tuples (numQuery, numRun, phase, start, end, size)
+        """
+        data = self.buffer[self.consumed*self.record_format.size:self.position*self.record_format.size]
+        self.consumed = self.position
+        return [(numQuery, numRun, self.phases[phase], start, end, size) for numQuery, numRun, phase, start, end, size in self.record_format.iter_unpack(bytes(data))]
+    def flush(self):
+        """
+        Appends records of the buffer to the log file in bulk and empties the buffer.
+
+        :return: returns nothing
+        """
+        if self.filename is not None and self.position > 0:
+            with open(self.filename, 'ab') as f:
+                f.write(self.buffer[:self.position*self.record_format.size])
+        self.position = 0
+        self.wrapped = False
+        self.consumed = 0
+    @staticmethod
+    def read(filename):
+        """
+        Reads all records of a log file.
+
+        :param filename: Name of the log file
+        :return: List of tuples (numQuery, numRun, phase, start, end, size)
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        data = data[:len(data)-len(data)%recorder.record_format.size]
+        return [(numQuery, numRun, recorder.phases[phase], start, end, size) for numQuery, numRun, phase, start, end, size in recorder.record_format.iter_unpack(data)]
+    @staticmethod
+    def getFilename(path, connectionname, pid=None):
+        """
+        Returns name of the log file of a worker.
+
+        :param path: Result folder
+        :param connectionname: Name of the connection
+        :param pid: Process id of the worker, default is the current process
+        :return: Name of the log file
+        """
+        if pid is None:
+            pid = os.getpid()
+        return path+'/runlog/events_'+connectionname+'_'+str(pid)+'.bin'
+    @staticmethod
+    def readResultfolder(path):
+        """
+        Reads all run logs of a result folder.
+
+        :param path: Result folder
+        :return: Dict of connection name -> list of tuples (numQuery, numRun, phase, start, end, size, pid)
+        """
+        logs = {}
+        folder = path+'/runlog'
+        if not os.path.isdir(folder):
+            return logs
+        for filename in sorted(os.listdir(folder)):
+            if not filename.startswith('events_') or not filename.endswith('.bin'):
+                continue
+            connectionname, pid = filename[len('events_'):-len('.bin')].rsplit('_', 1)
+            if not connectionname in logs:
+                logs[connectionname] = []
+            logs[connectionname].extend([record + (int(pid),) for record in recorder.read(folder+'/'+filename)])
+        return logs
+    @staticmethod
+    def printRecords(records):
+        """
+        Console consumer of records. Prints durations and sizes per run.
+
+        :param records: List of tuples (numQuery, numRun, phase, start, end, size)
+        :return: returns nothing
+        """
+        for numQuery, numRun, phase, start, end, size in records:
+            workername = "numRun %i: " % (numRun+1)
+            if phase == 'connect':
+                print(workername+"connection [ms]: "+str(1000.0*(end - start)))
+            elif phase == 'execute':
+                print(workername+"execution [ms]: "+str(1000.0*(end - start)))
+            elif phase == 'fetch':
+                print(workername+"transfer [ms]: "+str(1000.0*(end - start)))
+                print(workername+"Size of result list retrieved: "+str(size)+" bytes")
+
+
+class tracer():
+    """
+    Class for exporting run events (connect, execute, fetch, result processing) as traces.
+    Events are collected by singleRun() and singleResult() and stored in the protocol
+    as query[n]['events'][connection] = [[numRun, phase, start, end, pid], ...],
+    start and end being wall clock timestamps in seconds since epoch.
+    If the protocol does not contain events, the run logs of the workers are used instead.
+    Supported formats are Chrome trace events (chrome://tracing, Perfetto)
+    and OTLP/JSON spans (OpenTelemetry collectors, Jaeger, Tempo).
+    """
+    formats = {
+        'chrome': 'trace.json',
+        'otlp': 'trace_otlp.json',
+    }
+    def __init__(self, protocol, code='', path=None):
+        """
+        Construct a new 'tracer' object.
+
+        :param protocol: Protocol of a benchmarker (dict)
+        :param code: Code of the experiment, used as trace id
+        :param path: Result folder, used for reading run logs
+        :return: returns nothing
+        """
+        self.protocol = protocol
+        self.code = str(code)
+        self.path = path
+        self.logger = logging.getLogger('tracer')
+    def getEvents(self):
+        """
+        Returns a flat list of all events found in the protocol.
+
+        :return: List of dicts with keys query, connection, run, phase, start, end, pid
+        """
+        events = []
+        for numQuery, protocol_query in self.protocol['query'].items():
+            if not 'events' in protocol_query:
+                continue
+            for connectionname, events_connection in protocol_query['events'].items():
+                for numRun, phase, start, end, pid in events_connection:
+                    events.append({
+                        'query': int(numQuery),
+                        'connection': connectionname,
+                        'run': int(numRun),
+                        'phase': phase,
+                        'start': float(start),
+                        'end': float(end),
+                        'pid': int(pid)})
+        if len(events) == 0 and self.path is not None:
+            for connectionname, records in recorder.readResultfolder(self.path).items():
+                for numQuery, numRun, phase, start, end, size, pid in records:
+                    if phase == 'error':
+                        continue
+                    events.append({
+                        'query': numQuery,
+                        'connection': connectionname,
+                        'run': numRun,
+                        'phase': phase,
+                        'start': start,
+                        'end': end,
+                        'pid': pid})
+        return events
+    def toChromeTrace(self):
+        """
+        Converts events to Chrome trace event format.
+        Each worker process is a separate track (pid), each connection a thread (tid) inside.
+
+        :return: Dict in Chrome trace event format
+        """
+        traceEvents = []
+        connections = {}
+        processes = set()
+        for event in sorted(self.getEvents(), key=lambda e: e['start']):
+            if not event['connection'] in connections:
+                connections[event['connection']] = len(connections)+1
+            tid = connections[event['connection']]
+            if not (event['pid'], tid) in processes:
+                processes.add((event['pid'], tid))
+                traceEvents.append({'name': 'thread_name', 'ph': 'M', 'pid': event['pid'], 'tid': tid, 'args': {'name': event['connection']}})
+            traceEvents.append({
+                'name': 'Q{} {}'.format(event['query'], event['phase']),
+                'cat': event['phase'],
+                'ph': 'X',
+                'ts': event['start']*1000000.0,
+                'dur': max(0.0, event['end']-event['start'])*1000000.0,
+                'pid': event['pid'],
+                'tid': tid,
+                'args': {'query': event['query'], 'connection': event['connection'], 'run': event['run']+1}})
+        for pid in sorted(set(p for p, t in processes)):
+            traceEvents.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'worker {}'.format(pid)}})
+        return {'traceEvents': traceEvents, 'displayTimeUnit': 'ms', 'otherData': {'code': self.code}}
+    def toOTLP(self):
+        """
+        Converts events to OTLP/JSON spans.
+        All events of a query at a connection are children of a common span covering the complete benchmark of that pair.
+
+        :return: Dict in OTLP/JSON format (ExportTraceServiceRequest)
+        """
+        def hexid(text, length):
+            return hashlib.sha256(text.encode('utf-8')).hexdigest()[:length]
+        def attribute(key, value):
+            if isinstance(value, int):
+                return {'key': key, 'value': {'intValue': str(value)}}
+            return {'key': key, 'value': {'stringValue': str(value)}}
+        traceId = hexid('dbmsbenchmarker-'+self.code, 32)
+        spans = []
+        parents = {}
+        for numEvent, event in enumerate(self.getEvents()):
+            pair = (event['query'], event['connection'])
+            if not pair in parents:
+                parents[pair] = {'spanId': hexid('{}-{}-{}'.format(self.code, *pair), 16), 'start': event['start'], 'end': event['end']}
+            parents[pair]['start'] = min(parents[pair]['start'], event['start'])
+            parents[pair]['end'] = max(parents[pair]['end'], event['end'])
+            spans.append({
+                'traceId': traceId,
+                # a run may have several events of the same phase (batches, commits), so the position of the event is part of the id
+                'spanId': hexid('{}-{}-{}-{}-{}-{}'.format(self.code, event['query'], event['connection'], event['run'], event['phase'], numEvent), 16),
+                'parentSpanId': parents[pair]['spanId'],
+                'name': event['phase'],
+                'kind': 3,
+                'startTimeUnixNano': str(int(event['start']*1000000000)),
+                'endTimeUnixNano': str(int(event['end']*1000000000)),
+                'attributes': [
+                    attribute('dbms.query', event['query']),
+                    attribute('dbms.connection', event['connection']),
+                    attribute('dbms.run', event['run']+1),
+                    attribute('process.pid', event['pid'])]})
+        for (numQuery, connectionname), parent in parents.items():
+            spans.append({
+                'traceId': traceId,
+                'spanId': parent['spanId'],
+                'name': 'Q{}'.format(numQuery),
+                'kind': 1,
+                'startTimeUnixNano': str(int(parent['start']*1000000000)),
+                'endTimeUnixNano': str(int(parent['end']*1000000000)),
+                'attributes': [
+                    attribute('dbms.query', numQuery),
+                    attribute('dbms.connection', connectionname)]})
+        return {'resourceSpans': [{
+            'resource': {'attributes': [attribute('service.name', 'dbmsbenchmarker'), attribute('dbms.experiment', self.code)]},
+            'scopeSpans': [{'scope': {'name': 'dbmsbenchmarker'}, 'spans': spans}]}]}
+    def export(self, path, format='chrome'):
+        """
+        Writes trace of events to a file in the given folder.
+
+        :param path: Folder to write trace file to
+        :param format: chrome or otlp
+        :return: Name of the written file
+        """
+        if not format in self.formats:
+            raise ValueError('Unknown trace format '+str(format))
+        filename = path+'/'+self.formats[format]
+        if format == 'chrome':
+            trace = self.toChromeTrace()
+        else:
+            trace = self.toOTLP()
+        with open(filename, 'w') as f:
+            json.dump(trace, f)
+        self.logger.debug("Wrote trace to "+filename)
+        return filename
+    @staticmethod
+    def exportResultfolder(path, format='chrome'):
+        """
+        Writes trace of events of an existing result folder.
+
+        :param path: Result folder containing protocol.json
+        :param format: chrome or otlp
+        :return: Name of the written file
+        """
+        protocol = tools.loadProtocol(path)
+        code = path.rstrip('/').split('/')[-1]
+        return tracer(protocol, code, path).export(path, format)